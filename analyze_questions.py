@@ -2,18 +2,26 @@
 """
 Script to analyze questions.json and webtext.md to find missing questions
 """
+import argparse
 import json
 import re
 import sys
 from pathlib import Path
 
+import instrumentation
+from bank_cache import load_bank
+from instrumentation import count, stage
+from webtext_parser import NumberingTracker, iter_question_blocks
+
 def analyze_existing_questions(json_file):
     """Analyze the existing questions.json file"""
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
+    return analyze_bank_numbers(load_bank(json_file).questions)
+
+def analyze_bank_numbers(questions):
+    """Report the numbering of an already-loaded list of question records"""
+    count("questions_scanned", len(questions))
     question_numbers = []
-    for question in data['questions']:
+    for question in questions:
         if 'number' in question:
             question_numbers.append(question['number'])
     
@@ -35,54 +43,24 @@ def analyze_existing_questions(json_file):
 
 def analyze_webtext_questions(webtext_file):
     """Analyze the webtext.md file to find all question numbers"""
-    with open(webtext_file, 'r', encoding='utf-8') as f:
-        content = f.read()
+    # Stream the source block by block instead of loading it whole
+    numbering = NumberingTracker()
+    for block in iter_question_blocks(webtext_file):
+        numbering.add(block.number)
     
-    # Find all question numbers
-    pattern = r'^(\d+)\.\s+'
-    matches = re.findall(pattern, content, re.MULTILINE)
-    
-    question_numbers = [int(match) for match in matches]
-    question_numbers.sort()
+    return report_webtext_numbering(numbering)
+
+def report_webtext_numbering(numbering):
+    """Report question numbers already collected from the webtext"""
+    question_numbers = sorted(numbering.numbers)
     
     print(f"\nWebtext analysis:")
-    print(f"Total question entries found: {len(question_numbers)}")
-    if question_numbers:
-        print(f"Question numbers range: {min(question_numbers)} - {max(question_numbers)}")
-        print(f"Unique questions: {len(set(question_numbers))}")
-        
-        # Check for duplicates
-        seen = set()
-        duplicates = set()
-        for num in question_numbers:
-            if num in seen:
-                duplicates.add(num)
-            else:
-                seen.add(num)
-        
-        if duplicates:
-            print(f"Duplicate question numbers: {sorted(duplicates)}")
+    numbering.report()
     
     return question_numbers
 
-def main():
-    json_file = "/Users/michallatal/Desktop/it/it-quiz-app/src/data/questions.json"
-    webtext_file = "/Users/michallatal/Desktop/it/webtext.md"
-    
-    if not Path(json_file).exists():
-        print(f"Error: {json_file} not found")
-        return
-    
-    if not Path(webtext_file).exists():
-        print(f"Error: {webtext_file} not found")
-        return
-    
-    print("Analyzing questions.json...")
-    json_questions, missing_from_json = analyze_existing_questions(json_file)
-    
-    print("\nAnalyzing webtext.md...")
-    webtext_questions = analyze_webtext_questions(webtext_file)
-    
+def compare_numbers(json_questions, webtext_questions):
+    """Print which question numbers exist in only one of the two sources; returns those in webtext only"""
     print(f"\nComparison:")
     print(f"Questions in JSON: {len(set(json_questions))}")
     print(f"Questions in webtext: {len(set(webtext_questions))}")
@@ -98,6 +76,36 @@ def main():
     
     if in_json_not_webtext:
         print(f"Questions in JSON but not in webtext: {sorted(in_json_not_webtext)}")
+    
+    return sorted(in_webtext_not_json)
+
+def main():
+    parser = argparse.ArgumentParser(description="Find question numbers missing from questions.json")
+    instrumentation.add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    json_file = "/Users/michallatal/Desktop/it/it-quiz-app/src/data/questions.json"
+    webtext_file = "/Users/michallatal/Desktop/it/webtext.md"
+    
+    if not Path(json_file).exists():
+        print(f"Error: {json_file} not found")
+        return
+    
+    if not Path(webtext_file).exists():
+        print(f"Error: {webtext_file} not found")
+        return
+    
+    with instrumentation.profiled(args, "analyze_questions"):
+        print("Analyzing questions.json...")
+        with stage("analyze_bank"):
+            json_questions, missing_from_json = analyze_existing_questions(json_file)
+        
+        print("\nAnalyzing webtext.md...")
+        with stage("analyze_webtext"):
+            webtext_questions = analyze_webtext_questions(webtext_file)
+        
+        with stage("compare"):
+            compare_numbers(json_questions, webtext_questions)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
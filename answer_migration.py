@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Migrate legacy answer fields to the correctAnswer indices the app reads
+
+Older scripts (and the extractor) store the answer as option text in
+correct_answer (or answer): a string, a list of strings, or a placeholder such
+as "Multiple matching pairs". Each record gets a lookup from normalized option
+text to index, built once, and the whole bank is converted in one pass:
+    "MFA"             -> 3
+    ["RAM", "CPU"]    -> [0, 2]
+Records whose answer cannot be resolved, or that have none, are kept as they are and flagged
+with needs_review, so bank_schema.py keeps reporting them until they are fixed by hand.
+A record that already has a valid correctAnswer keeps it; a legacy field left next
+to it is dropped, or flagged the same way if it names different options.
+
+    python answer_migration.py [bank.json] [--write] [--output migrated.json]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+
+from backup_store import snapshot_bank
+from bank_stats import rebuild_stats
+from bank_writer import write_bank
+from instrumentation import count
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_BANK = ROOT / "src" / "data" / "questions.json"
+
+LEGACY_FIELDS = ("correct_answer", "answer")
+
+class Unresolved(NamedTuple):
+    position: int
+    number: Any
+    answer: Any
+    reason: str
+
+class MigrationReport(NamedTuple):
+    converted: int              # records whose legacy answer became correctAnswer
+    current: int                # records already on correctAnswer
+    unresolved: List[Unresolved]
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.converted or self.unresolved)
+
+def normalize_option(text: str) -> str:
+    return " ".join(text.lower().split()).rstrip(".")
+
+def option_lookup(options: List[Any]) -> Dict[str, int]:
+    """Normalized option text -> index (the first of any options that normalize the same)"""
+    lookup: Dict[str, int] = {}
+    for i, option in enumerate(options):
+        if isinstance(option, str):
+            lookup.setdefault(normalize_option(option), i)
+    return lookup
+
+def resolve_answer(answer: Any, options: List[Any], lookup: Optional[Dict[str, int]] = None) -> Tuple[Any, Optional[str]]:
+    """(correctAnswer, None) for a legacy answer, or (None, reason) if it cannot be resolved"""
+    if isinstance(answer, bool):
+        return None, f"not an option: {answer!r}"
+    if isinstance(answer, int):
+        return (answer, None) if 0 <= answer < len(options) else (None, f"index {answer} out of range")
+
+    lookup = option_lookup(options) if lookup is None else lookup
+    if isinstance(answer, str):
+        if not answer.strip():
+            return None, "empty answer"
+        index = lookup.get(normalize_option(answer))
+        return (index, None) if index is not None else (None, f"not an option: {answer!r}")
+
+    if isinstance(answer, list) and answer:
+        indices = []
+        for item in answer:
+            index = lookup.get(normalize_option(item)) if isinstance(item, str) else None
+            if index is None:
+                return None, f"not an option: {item!r}"
+            if index not in indices:
+                indices.append(index)
+        return sorted(indices), None
+
+    return None, f"unsupported answer {answer!r}"
+
+def has_valid_answer(question: Dict[str, Any]) -> bool:
+    """Whether question has a correctAnswer that indexes its options"""
+    answer = question.get('correctAnswer')
+    option_count = len(question.get('options') or [])
+    if type(answer) is int:
+        return 0 <= answer < option_count
+    return (type(answer) is list and bool(answer)
+            and all(type(i) is int and 0 <= i < option_count for i in answer))
+
+def answer_indices(answer: Any) -> List[int]:
+    """correctAnswer as a sorted list, so a single index and a one-item list compare equal"""
+    return sorted(set(answer)) if isinstance(answer, list) else [answer]
+
+def migrate_record(question: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    """The record with correctAnswer in place of its legacy field (same field order), or itself and a reason
+
+    A valid correctAnswer is never replaced: a stale legacy field next to it is dropped if it
+    agrees (or cannot be resolved), and kept with needs_review if it names other options.
+    """
+    field = next((f for f in LEGACY_FIELDS if f in question), None)
+    if field is not None and has_valid_answer(question):
+        legacy, _ = resolve_answer(question[field], question.get('options') or [])
+        if legacy is not None and answer_indices(legacy) != answer_indices(question['correctAnswer']):
+            reason = f"{field} {question[field]!r} disagrees with correctAnswer {question['correctAnswer']!r}"
+            if question.get('needs_review') is True:
+                return question, reason
+            return {**question, "needs_review": True}, reason
+        return {key: value for key, value in question.items() if key not in LEGACY_FIELDS}, None
+    if field is None:
+        if 'correctAnswer' in question:
+            return question, None
+        reason = "no answer"
+    else:
+        correct, reason = resolve_answer(question[field], question.get('options') or [])
+    if reason:
+        if question.get('needs_review') is True:
+            return question, reason
+        return {**question, "needs_review": True}, reason
+
+    migrated = {}
+    for key, value in question.items():
+        if key == field:
+            migrated['correctAnswer'] = correct
+        elif key not in LEGACY_FIELDS and key != 'correctAnswer':
+            migrated[key] = value
+    # Flags set by the extractor for unresolved answers no longer apply
+    if migrated.get('needs_review') is True:
+        del migrated['needs_review']
+    return migrated, None
+
+def migrate_questions(questions: List[Dict[str, Any]]) -> MigrationReport:
+    """Convert every record in place; records already on correctAnswer are left untouched"""
+    converted = current = 0
+    unresolved: List[Unresolved] = []
+    for pos, question in enumerate(questions):
+        if 'correctAnswer' in question and not any(f in question for f in LEGACY_FIELDS):
+            current += 1
+            continue
+        migrated, reason = migrate_record(question)
+        questions[pos] = migrated
+        if reason:
+            legacy = next((question[f] for f in LEGACY_FIELDS if f in question), None)
+            unresolved.append(Unresolved(pos, question.get('number'), legacy, reason))
+        else:
+            converted += 1
+    count("questions_scanned", len(questions))
+    return MigrationReport(converted, current, unresolved)
+
+def print_report(report: MigrationReport, limit: int = 20):
+    print(f"Answer migration: {report.converted} converted, {report.current} already current, "
+          f"{len(report.unresolved)} unresolved")
+    for item in report.unresolved[:limit]:
+        print(f"  Q{item.number} (#{item.position}): {item.reason}")
+    if len(report.unresolved) > limit:
+        print(f"  ... {len(report.unresolved) - limit} more")
+
+def migrate_bank(bank_file, output=None, write: bool = False, pretty: bool = True,
+                 backup_store=None) -> MigrationReport:
+    """Migrate bank_file; the result is written to output, or over bank_file (after a snapshot) when write is set"""
+    with open(bank_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    report = migrate_questions(data['questions'])
+    print_report(report)
+
+    if output:
+        write_bank(output, data, pretty=pretty)
+        print(f"Migrated bank written to: {output}")
+    elif write and report.changed:
+        snapshot = snapshot_bank(bank_file, note="before answer migration", store_root=backup_store)
+        print(f"Backup snapshot: {snapshot['snapshot']} ({snapshot['objects_written']} new objects)")
+        write_bank(bank_file, data, pretty=pretty)
+        rebuild_stats(bank_file, data)
+        print(f"Questions file updated: {bank_file}")
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert legacy correct_answer fields to correctAnswer indices")
+    parser.add_argument("bank", nargs="?", default=str(DEFAULT_BANK), help="question bank (default: %(default)s)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--write", action="store_true", help="update the bank in place (a backup snapshot is taken first)")
+    target.add_argument("--output", help="write the migrated bank here instead")
+    parser.add_argument("--compact", action="store_true", help="write minified JSON")
+    args = parser.parse_args()
+
+    try:
+        report = migrate_bank(args.bank, args.output, args.write, pretty=not args.compact)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Error during migration: {e}")
+        sys.exit(1)
+
+    if not args.write and not args.output and report.changed:
+        print("Dry run; use --write to update the bank or --output to write a copy")
+    if report.unresolved:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
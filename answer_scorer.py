@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Token-indexed answer scoring: rank each question's options against its explanation
+"""
+import re
+from bisect import bisect_left
+from typing import List, Dict, Any, Iterable, NamedTuple, Optional, Tuple
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Words that signal the explanation is affirming something near them
+POSITIVE_INDICATORS = frozenset(['is', 'are', 'provides', 'allows', 'correct', 'best', 'should', 'can'])
+
+STOPWORDS = frozenset(['a', 'an', 'the', 'of', 'to', 'and', 'or', 'in', 'on', 'for', 'with', 'by', 'as',
+                       'at', 'from', 'it', 'this', 'that', 'be', 'is', 'are'])
+
+# Below this confidence a question goes to manual review instead of getting a guessed answer
+REVIEW_THRESHOLD = 0.3
+
+# Token distance at which proximity to an indicator counts half
+PROXIMITY_SCALE = 5.0
+
+class AnswerRanking(NamedTuple):
+    """Options ranked best-first as (option_index, option, score), with a confidence in [0, 1]"""
+    ranked: List[Tuple[int, str, float]]
+    confidence: float
+    needs_review: bool
+
+    @property
+    def best(self) -> Optional[str]:
+        return self.ranked[0][1] if self.ranked else None
+
+class ExplanationIndex:
+    """Token positions of one explanation, built once and shared by all its options"""
+
+    def __init__(self, explanation: str):
+        self.tokens = TOKEN_RE.findall(explanation.lower())
+        self.positions: Dict[str, List[int]] = {}
+        indicators = []
+        for pos, token in enumerate(self.tokens):
+            self.positions.setdefault(token, []).append(pos)
+            if token in POSITIVE_INDICATORS:
+                indicators.append(pos)
+        self.indicators = indicators
+
+    def indicator_distance(self, pos: int) -> Optional[int]:
+        """Distance in tokens from pos to the nearest positive indicator"""
+        if not self.indicators:
+            return None
+        i = bisect_left(self.indicators, pos)
+        candidates = []
+        if i < len(self.indicators):
+            candidates.append(self.indicators[i] - pos)
+        if i > 0:
+            candidates.append(pos - self.indicators[i - 1])
+        return min(candidates)
+
+    def contains_phrase(self, tokens: List[str]) -> bool:
+        """True if tokens occur contiguously in the explanation"""
+        if not tokens:
+            return False
+        for start in self.positions.get(tokens[0], ()):
+            if self.tokens[start:start + len(tokens)] == tokens:
+                return True
+        return False
+
+def option_terms(option: str) -> List[str]:
+    tokens = TOKEN_RE.findall(option.lower())
+    content = [t for t in tokens if t not in STOPWORDS]
+    return content or tokens
+
+def rank_answers(options: List[str], explanation: str, threshold: float = REVIEW_THRESHOLD) -> AnswerRanking:
+    """Score every option by weighted token overlap with the explanation and proximity to positive indicators"""
+    if not options:
+        return AnswerRanking([], 0.0, True)
+
+    index = ExplanationIndex(explanation)
+    terms = [option_terms(option) for option in options]
+
+    # Tokens shared by many options ("RAID" in "RAID 0".."RAID 10") say little about which one is right
+    option_frequency: Dict[str, int] = {}
+    for option_tokens in terms:
+        for token in set(option_tokens):
+            option_frequency[token] = option_frequency.get(token, 0) + 1
+
+    scored = []
+    for i, (option, option_tokens) in enumerate(zip(options, terms)):
+        distinct = set(option_tokens)
+        total = sum(1.0 / option_frequency[t] for t in distinct)
+        matched = [t for t in distinct if t in index.positions]
+        if not total or not matched:
+            scored.append((i, option, 0.0))
+            continue
+
+        overlap = sum(1.0 / option_frequency[t] for t in matched) / total
+
+        distances = [index.indicator_distance(pos) for t in matched for pos in index.positions[t]]
+        distances = [d for d in distances if d is not None]
+        proximity = 1.0 / (1.0 + min(distances) / PROXIMITY_SCALE) if distances else 0.0
+
+        score = overlap * (0.5 + 0.5 * proximity)
+        if index.contains_phrase(TOKEN_RE.findall(option.lower())):
+            score += 0.25
+        scored.append((i, option, round(score, 4)))
+
+    ranked = sorted(scored, key=lambda item: (-item[2], item[0]))
+    top = ranked[0][2]
+    runner_up = ranked[1][2] if len(ranked) > 1 else 0.0
+    # Confident only when the winner is both strong and clearly ahead of the next option
+    confidence = min(1.0, top) * ((top - runner_up) / top) if top > 0 else 0.0
+    confidence = round(confidence, 4)
+
+    return AnswerRanking(ranked, confidence, confidence < threshold)
+
+def rank_answers_many(questions: Iterable[Dict[str, Any]], threshold: float = REVIEW_THRESHOLD) -> List[AnswerRanking]:
+    """Rank options for a batch of question records (uses 'options' and 'explanation')"""
+    return [rank_answers(q.get('options', []), q.get('explanation', ''), threshold) for q in questions]
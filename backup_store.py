@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Content-addressed backup store for question banks
+
+Each question record is stored once, zlib-compressed, under the SHA-256 of its JSON,
+in a single append-only pack file.
+A snapshot is a small manifest listing (key, hash) for every record plus the hash of
+the bank's metadata, so taking one only writes the records that changed.
+
+    python backup_store.py snapshot [bank.json] [--note TEXT]
+    python backup_store.py list
+    python backup_store.py diff <a> <b>
+    python backup_store.py restore <snapshot> [--output bank.json]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+from bank_stats import rebuild_stats
+from bank_writer import write_bank
+
+DEFAULT_BANK = Path(__file__).resolve().parent / "src" / "data" / "questions.json"
+
+def default_store_for(bank_file) -> Path:
+    return Path(bank_file).resolve().parent / "backups"
+
+def _encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def record_key(question: Dict[str, Any], position: int) -> Any:
+    """Identity of a record across snapshots: id, else number, else its position"""
+    for field in ('id', 'number'):
+        if field in question:
+            return question[field]
+    return position
+
+class BackupStore:
+    """objects.pack holds compressed blobs, objects.idx maps hash -> (offset, length), snapshots/ holds manifests"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.pack_file = self.root / "objects.pack"
+        self.index_file = self.root / "objects.idx"
+        self.snapshots = self.root / "snapshots"
+        self._index: Optional[Dict[str, Tuple[int, int]]] = None
+
+    # --- blobs -----------------------------------------------------------
+
+    @property
+    def index(self) -> Dict[str, Tuple[int, int]]:
+        if self._index is None:
+            self._index = {}
+            if self.index_file.exists():
+                with open(self.index_file, 'r', encoding='ascii') as f:
+                    for line in f:
+                        digest, offset, length = line.split()
+                        self._index[digest] = (int(offset), int(length))
+        return self._index
+
+    def put(self, value: Any) -> Tuple[str, bool]:
+        """Store value; returns (hash, written) where written is False if it was already stored"""
+        raw = _encode(value)
+        digest = hashlib.sha256(raw).hexdigest()
+        if digest in self.index:
+            return digest, False
+
+        blob = zlib.compress(raw, 9)
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Blob first, index line second: a crash in between only leaves unreferenced bytes in the pack
+        with open(self.pack_file, 'ab') as f:
+            offset = f.tell()
+            f.write(blob)
+        with open(self.index_file, 'a', encoding='ascii') as f:
+            f.write(f"{digest} {offset} {len(blob)}\n")
+        self.index[digest] = (offset, len(blob))
+        return digest, True
+
+    def get_many(self, digests: List[str]) -> List[Any]:
+        """Read several blobs with one open pack handle"""
+        values = []
+        with open(self.pack_file, 'rb') as f:
+            for digest in digests:
+                offset, length = self.index[digest]
+                f.seek(offset)
+                values.append(json.loads(zlib.decompress(f.read(length))))
+        return values
+
+    def get(self, digest: str) -> Any:
+        return self.get_many([digest])[0]
+
+    # --- snapshots -------------------------------------------------------
+
+    def snapshot(self, bank_file, note: str = "") -> Dict[str, Any]:
+        """Record the current state of bank_file; only new record versions are written"""
+        with open(bank_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        questions = data.get('questions', []) if isinstance(data, dict) else data
+        meta = {k: v for k, v in data.items() if k != 'questions'} if isinstance(data, dict) else None
+
+        written = 0
+        records = []
+        for position, question in enumerate(questions):
+            digest, new = self.put(question)
+            written += new
+            records.append([record_key(question, position), digest])
+
+        meta_hash = None
+        if meta is not None:
+            meta_hash, new = self.put(meta)
+            written += new
+
+        records_digest = hashlib.sha256(_encode([meta_hash, records])).hexdigest()
+        latest = self.latest()
+        if latest and latest.get('digest') == records_digest and latest.get('source') == str(Path(bank_file).resolve()):
+            latest['objects_written'] = 0
+            latest['reused'] = True
+            return latest
+
+        created = datetime.now()
+        snapshot_id = f"{created.strftime('%Y%m%dT%H%M%S')}-{records_digest[:8]}"
+        suffix = 1
+        while (self.snapshots / f"{snapshot_id}.json").exists():
+            suffix += 1
+            snapshot_id = f"{created.strftime('%Y%m%dT%H%M%S')}-{records_digest[:8]}-{suffix}"
+        manifest = {
+            "snapshot": snapshot_id,
+            "created": created.isoformat(timespec='seconds'),
+            "source": str(Path(bank_file).resolve()),
+            "note": note,
+            "digest": records_digest,
+            "meta": meta_hash,
+            "records": records,
+        }
+
+        self.snapshots.mkdir(parents=True, exist_ok=True)
+        path = self.snapshots / f"{manifest['snapshot']}.json"
+        tmp = path.with_suffix('.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp, path)
+
+        manifest['objects_written'] = written
+        return manifest
+
+    def _manifest_paths(self) -> List[Path]:
+        """Oldest first; snapshots taken within the same second are ordered by write time"""
+        if not self.snapshots.exists():
+            return []
+        return sorted(self.snapshots.glob("*.json"), key=lambda p: (p.name[:15], p.stat().st_mtime_ns))
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Manifests oldest first"""
+        manifests = []
+        for path in self._manifest_paths():
+            with open(path, 'r', encoding='utf-8') as f:
+                manifests.append(json.load(f))
+        return manifests
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        paths = self._manifest_paths()
+        if not paths:
+            return None
+        with open(paths[-1], 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def resolve(self, ref: str) -> Dict[str, Any]:
+        """Find a snapshot by full id, unique prefix, digest prefix or 'latest'"""
+        manifests = self.list()
+        if ref == "latest" and manifests:
+            return manifests[-1]
+        for m in manifests:
+            if m['snapshot'] == ref:
+                return m
+        matches = [m for m in manifests if m['snapshot'].startswith(ref) or m['digest'].startswith(ref)]
+        if len(matches) == 1:
+            return matches[0]
+        if not matches:
+            raise KeyError(f"No snapshot matches '{ref}'")
+        raise KeyError(f"'{ref}' is ambiguous: {', '.join(m['snapshot'] for m in matches)}")
+
+    def load(self, ref: str) -> Any:
+        """Rebuild the bank stored in a snapshot"""
+        manifest = self.resolve(ref)
+        questions = self.get_many([digest for _, digest in manifest['records']])
+        if manifest['meta'] is None:
+            return questions
+        data = self.get(manifest['meta'])
+        data['questions'] = questions
+        return data
+
+    def restore(self, ref: str, output=None) -> Path:
+        """Write a snapshot back to disk, snapshotting the file it replaces first; its stats sidecar is rebuilt"""
+        manifest = self.resolve(ref)
+        target = Path(output) if output else Path(manifest['source'])
+        if target.exists():
+            self.snapshot(target, note=f"before restore of {manifest['snapshot']}")
+        data = self.load(manifest['snapshot'])
+        write_bank(target, data, pretty=True)
+        rebuild_stats(target, data)
+        return target
+
+    def diff(self, ref_a: str, ref_b: str) -> Dict[str, Any]:
+        """Records added, removed and changed (with field names) between two snapshots"""
+        a, b = self.resolve(ref_a), self.resolve(ref_b)
+        records_a = {json.dumps(key): digest for key, digest in a['records']}
+        records_b = {json.dumps(key): digest for key, digest in b['records']}
+
+        added = [json.loads(k) for k in records_b if k not in records_a]
+        removed = [json.loads(k) for k in records_a if k not in records_b]
+        changed = []
+        for k, digest in records_b.items():
+            old = records_a.get(k)
+            if old is not None and old != digest:
+                before, after = self.get(old), self.get(digest)
+                fields = sorted(f for f in set(before) | set(after) if before.get(f) != after.get(f))
+                changed.append((json.loads(k), fields))
+
+        return {"a": a['snapshot'], "b": b['snapshot'], "added": added, "removed": removed,
+                "changed": changed, "meta_changed": a['meta'] != b['meta']}
+
+    def size(self) -> int:
+        return sum(p.stat().st_size for p in self.root.rglob('*') if p.is_file())
+
+def snapshot_bank(bank_file, note: str = "", store_root=None) -> Dict[str, Any]:
+    """Snapshot bank_file into its store (default: a backups/ directory next to it)"""
+    store = BackupStore(store_root or default_store_for(bank_file))
+    return store.snapshot(bank_file, note)
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed backups for question banks")
+    parser.add_argument("--store", help="store directory (default: backups/ next to the bank)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    snap = commands.add_parser("snapshot", help="snapshot a bank file")
+    snap.add_argument("bank", nargs="?", default=str(DEFAULT_BANK))
+    snap.add_argument("--note", default="")
+
+    commands.add_parser("list", help="list snapshots")
+
+    diff = commands.add_parser("diff", help="compare two snapshots")
+    diff.add_argument("a")
+    diff.add_argument("b")
+
+    restore = commands.add_parser("restore", help="write a snapshot back to disk")
+    restore.add_argument("snapshot")
+    restore.add_argument("--output", help="file to write (default: the snapshot's source)")
+
+    args = parser.parse_args()
+    bank = getattr(args, "bank", DEFAULT_BANK)
+    store = BackupStore(args.store or default_store_for(bank))
+
+    if args.command == "snapshot":
+        manifest = store.snapshot(bank, args.note)
+        if manifest.get('reused'):
+            print(f"Unchanged since snapshot {manifest['snapshot']}")
+        else:
+            print(f"Snapshot {manifest['snapshot']}: {len(manifest['records'])} records, "
+                  f"{manifest['objects_written']} new objects")
+        print(f"Store size: {store.size() / 1024:.1f} KB ({store.root})")
+
+    elif args.command == "list":
+        manifests = store.list()
+        if not manifests:
+            print(f"No snapshots in {store.root}")
+        for m in manifests:
+            note = f"  {m['note']}" if m['note'] else ""
+            print(f"{m['snapshot']}  {len(m['records']):>5} records  {Path(m['source']).name}{note}")
+
+    elif args.command == "diff":
+        try:
+            result = store.diff(args.a, args.b)
+        except KeyError as e:
+            print(f"Error: {e.args[0]}")
+            sys.exit(1)
+        print(f"{result['a']} -> {result['b']}")
+        print(f"Added: {len(result['added'])}  Removed: {len(result['removed'])}  Changed: {len(result['changed'])}"
+              + ("  (metadata changed)" if result['meta_changed'] else ""))
+        for key in result['added']:
+            print(f"  + {key}")
+        for key in result['removed']:
+            print(f"  - {key}")
+        for key, fields in result['changed']:
+            print(f"  ~ {key}: {', '.join(fields)}")
+
+    elif args.command == "restore":
+        try:
+            target = store.restore(args.snapshot, args.output)
+        except KeyError as e:
+            print(f"Error: {e.args[0]}")
+            sys.exit(1)
+        print(f"Restored {args.snapshot} to {target}")
+
+if __name__ == "__main__":
+    main()
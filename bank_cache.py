@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of parsed question banks plus their derived indexes
+
+The first load of a bank parses the JSON, builds the indexes and pickles everything
+to .cache/banks/. Later loads check the file's size and mtime against the cache
+entry; if they match, only the pickle is read. If the mtime moved but the SHA-256
+of the content did not (a checkout, a touch), the entry is re-stamped and reused.
+Any other change rebuilds the entry.
+
+    python bank_cache.py [bank.json]      # show the cache entry for a bank
+    python bank_cache.py --clear
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Dict, Any, NamedTuple, Optional, Set
+
+from instrumentation import count
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_BANK = ROOT / "src" / "data" / "questions.json"
+DEFAULT_CACHE_DIR = ROOT / ".cache" / "banks"
+
+# Bump when the cached layout or the derived indexes change
+CACHE_VERSION = 1
+
+class CachedBank(NamedTuple):
+    data: Any                                   # the parsed file, exactly as json.load returns it
+    sha256: str
+    by_number: Dict[int, Dict[str, Any]]        # first record for each number
+    topics: Dict[str, List[int]]                # topic -> numbers, in file order
+    numbers: Set[int]
+
+    @property
+    def questions(self) -> List[Dict[str, Any]]:
+        return self.data.get('questions', []) if isinstance(self.data, dict) else self.data
+
+def build_indexes(data: Any, sha256: str) -> CachedBank:
+    questions = data.get('questions', []) if isinstance(data, dict) else data
+    by_number: Dict[int, Dict[str, Any]] = {}
+    topics: Dict[str, List[int]] = {}
+    for q in questions:
+        if 'number' not in q:
+            continue
+        by_number.setdefault(q['number'], q)
+        topics.setdefault(q.get('topic', 'Unknown'), []).append(q['number'])
+    return CachedBank(data, sha256, by_number, topics, set(by_number))
+
+def cache_path(bank_file, cache_dir=DEFAULT_CACHE_DIR) -> Path:
+    source = str(Path(bank_file).resolve())
+    return Path(cache_dir) / f"{Path(bank_file).stem}-{hashlib.sha1(source.encode('utf-8')).hexdigest()[:12]}.pickle"
+
+def _read_entry(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+            count("bytes_read", f.tell())
+    except Exception:  # missing, truncated or written by an incompatible version
+        return None
+    return entry if isinstance(entry, dict) and entry.get('version') == CACHE_VERSION else None
+
+def _write_entry(path: Path, entry: Dict[str, Any]):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+def load_bank(bank_file, cache_dir=DEFAULT_CACHE_DIR, use_cache: bool = True) -> CachedBank:
+    """Parsed bank and indexes for bank_file, from the cache when it is still valid
+
+    Every call returns fresh objects, so callers may modify what they get.
+    """
+    stat = os.stat(bank_file)
+    path = cache_path(bank_file, cache_dir)
+    entry = _read_entry(path) if use_cache else None
+
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return CachedBank(*entry['bank'])
+
+    with open(bank_file, 'rb') as f:
+        raw = f.read()
+    count("bytes_read", len(raw))
+    sha256 = hashlib.sha256(raw).hexdigest()
+
+    if entry and entry['sha256'] == sha256:
+        bank = CachedBank(*entry['bank'])
+    else:
+        bank = build_indexes(json.loads(raw), sha256)
+
+    if use_cache:
+        # Stored as a plain tuple so the pickle does not depend on how this module was imported
+        try:
+            _write_entry(path, {"version": CACHE_VERSION, "source": str(Path(bank_file).resolve()),
+                                "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256,
+                                "bank": tuple(bank)})
+        except OSError:
+            pass  # read-only checkout: work uncached
+    return bank
+
+def clear_cache(cache_dir=DEFAULT_CACHE_DIR) -> int:
+    removed = 0
+    for path in Path(cache_dir).glob("*.pickle"):
+        path.unlink()
+        removed += 1
+    return removed
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the parsed-bank cache")
+    parser.add_argument("bank", nargs="?", default=str(DEFAULT_BANK))
+    parser.add_argument("--cache-dir", default=str(DEFAULT_CACHE_DIR))
+    parser.add_argument("--clear", action="store_true", help="delete every cache entry")
+    args = parser.parse_args()
+
+    if args.clear:
+        print(f"Removed {clear_cache(args.cache_dir)} cache entries from {args.cache_dir}")
+        return
+
+    path = cache_path(args.bank, args.cache_dir)
+    status = "fresh" if path.exists() else "missing"
+    if path.exists():
+        entry = _read_entry(path)
+        stat = os.stat(args.bank)
+        if not entry:
+            status = "unreadable"
+        elif (entry['size'], entry['mtime_ns']) != (stat.st_size, stat.st_mtime_ns):
+            status = "stale, file changed since it was cached"
+
+    start = time.perf_counter()
+    bank = load_bank(args.bank, args.cache_dir)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(f"Bank:    {args.bank}")
+    print(f"Cache:   {path} ({status})")
+    print(f"SHA-256: {bank.sha256}")
+    print(f"Loaded {len(bank.questions)} questions, {len(bank.numbers)} numbers, {len(bank.topics)} topics in {elapsed:.1f} ms")
+
+if __name__ == "__main__":
+    main()
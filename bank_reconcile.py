@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Reconcile question-bank variants: hash every normalized record once, index by file, diff
+
+Records are keyed by question number (repeats of a number get #2, #3, ... in file
+order) and normalized so that formatting-only differences vanish: whitespace is
+collapsed, ids are ignored, and correct_answer text, correctAnswer indices and the
+sample bank's answer field all become the list of correct option texts.
+Everything is a dictionary lookup, so the run is linear in the total record count.
+"""
+import argparse
+import hashlib
+import json
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+DATA_DIR = Path(__file__).resolve().parent / "src" / "data"
+
+# Fields that identify or encode a record rather than describe it
+IGNORED_FIELDS = {'id', 'correctAnswer', 'correct_answer', 'answer'}
+
+def _clean(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, list):
+        return [_clean(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _clean(v) for k, v in value.items()}
+    return value
+
+def normalized_answer(question: Dict[str, Any]) -> Any:
+    """Correct option texts whichever schema the record uses"""
+    options = question.get('options', [])
+    if 'correctAnswer' in question:
+        answer = question['correctAnswer']
+        indices = answer if isinstance(answer, list) else [answer]
+        try:
+            return [_clean(options[i]) for i in indices]
+        except (IndexError, TypeError):
+            return {"unresolved": answer}
+    for field in ('correct_answer', 'answer'):
+        if field in question:
+            answer = question[field]
+            if isinstance(answer, int) and not isinstance(answer, bool) and 0 <= answer < len(options):
+                return [_clean(options[answer])]
+            return _clean(answer) if isinstance(answer, list) else [_clean(answer)]
+    return None
+
+def normalize_record(question: Dict[str, Any]) -> Dict[str, Any]:
+    record = {k: _clean(v) for k, v in question.items() if k not in IGNORED_FIELDS}
+    record['answer'] = normalized_answer(question)
+    return record
+
+def record_hash(record: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(record, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+class BankIndex:
+    """One file's records: key -> (hash, normalized record)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.name = path.name
+        self.error: Optional[str] = None
+        self.records: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.error = str(e)
+            return
+
+        questions = data.get('questions', []) if isinstance(data, dict) else data
+        seen: Dict[Any, int] = {}
+        for position, question in enumerate(questions):
+            base = question.get('number', question.get('id', f"pos{position}"))
+            seen[base] = seen.get(base, 0) + 1
+            key = str(base) if seen[base] == 1 else f"{base}#{seen[base]}"
+            record = normalize_record(question)
+            self.records[key] = (record_hash(record), record)
+
+    @property
+    def hashes(self) -> Set[str]:
+        return {h for h, _ in self.records.values()}
+
+def diff_banks(base: BankIndex, other: BankIndex) -> Dict[str, Any]:
+    """Added/removed/changed keys from base to other, with field-level diffs for changed records"""
+    added = [k for k in other.records if k not in base.records]
+    removed = [k for k in base.records if k not in other.records]
+    changed = []
+    for key, (digest, record) in other.records.items():
+        previous = base.records.get(key)
+        if previous is None or previous[0] == digest:
+            continue
+        before = previous[1]
+        fields = {f: (before.get(f), record.get(f)) for f in sorted(set(before) | set(record)) if before.get(f) != record.get(f)}
+        changed.append((key, fields))
+    return {"added": added, "removed": removed, "changed": changed,
+            "unchanged": len(other.records) - len(added) - len(changed)}
+
+def shared_counts(banks: List[BankIndex]) -> Dict[Tuple[str, str], int]:
+    """Identical-record counts for every pair of files, via one hash -> files index"""
+    owners: Dict[str, Set[int]] = {}
+    for i, bank in enumerate(banks):
+        for digest in bank.hashes:
+            owners.setdefault(digest, set()).add(i)
+    counts: Dict[Tuple[str, str], int] = {}
+    for files in owners.values():
+        for i in files:
+            for j in files:
+                key = (banks[i].name, banks[j].name)
+                counts[key] = counts.get(key, 0) + 1
+    return counts
+
+def _short(value: Any, width: int = 60) -> str:
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+def print_overview(banks: List[BankIndex]):
+    width = max(len(b.name) for b in banks)
+    print(f"{'File':<{width}}  Records  Distinct")
+    for bank in banks:
+        if bank.error:
+            print(f"{bank.name:<{width}}  ERROR: {bank.error}")
+        else:
+            print(f"{bank.name:<{width}}  {len(bank.records):>7}  {len(bank.hashes):>8}")
+
+    valid = [b for b in banks if not b.error]
+    if len(valid) < 2:
+        return
+    counts = shared_counts(valid)
+    labels = [str(i + 1) for i in range(len(valid))]
+    print(f"\nIdentical records shared between files (after normalization):")
+    print(f"{'':<{width + 4}}" + "".join(f"{label:>6}" for label in labels))
+    for i, a in enumerate(valid):
+        print(f"{labels[i]:>2}. {a.name:<{width}}" + "".join(f"{counts.get((a.name, b.name), 0):>6}" for b in valid))
+
+def print_diff(base: BankIndex, other: BankIndex, result: Dict[str, Any], show_fields: bool):
+    print(f"\n{base.name} -> {other.name}: "
+          f"+{len(result['added'])} -{len(result['removed'])} ~{len(result['changed'])} ={result['unchanged']}")
+    if result['added']:
+        print(f"  Added: {', '.join(result['added'])}")
+    if result['removed']:
+        print(f"  Removed: {', '.join(result['removed'])}")
+    for key, fields in result['changed']:
+        print(f"  ~ #{key}: {', '.join(fields)}")
+        if show_fields:
+            for field, (before, after) in fields.items():
+                print(f"      {field}: {_short(before)} -> {_short(after)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare question-bank variants record by record")
+    parser.add_argument("files", nargs="*", help="bank files (default: every question bank in src/data)")
+    parser.add_argument("--base", help="file to diff the others against (default: questions.json if present, else the first file)")
+    parser.add_argument("--fields", action="store_true", help="show before/after values for changed fields")
+    parser.add_argument("--overview", action="store_true", help="only print the per-file summary and sharing matrix")
+    args = parser.parse_args()
+
+    paths = [Path(f) for f in args.files] or sorted(list(DATA_DIR.glob("*.json")) + list(DATA_DIR.glob("*.json.backup")))
+    banks = [BankIndex(p) for p in paths]
+    print_overview(banks)
+    if args.overview:
+        return
+
+    valid = [b for b in banks if not b.error]
+    if not valid:
+        return
+    if args.base:
+        base = next((b for b in valid if b.path == Path(args.base) or b.name == Path(args.base).name), None)
+        if base is None:
+            base = BankIndex(Path(args.base))
+            if base.error:
+                print(f"\nError: cannot read base {args.base}: {base.error}")
+                return
+    else:
+        base = next((b for b in valid if b.name == "questions.json"), valid[0])
+
+    for other in valid:
+        if other is not base:
+            print_diff(base, other, diff_banks(base, other), args.fields)
+
+if __name__ == "__main__":
+    main()
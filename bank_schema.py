@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Validate question banks against the schema the app expects (src/types/quiz.ts)
+
+The rules are compiled once per bank into plain sets and tuples (required fields,
+allowed topics and difficulties from exam_info, option count limits) and every
+record is then checked in a single pass, so a 100k-record bank validates in a
+fraction of a second. All violations are collected, not just the first.
+
+Rules:
+  - id, number, question, options, correctAnswer and topic are present
+  - options is a list of 4-6 strings; correctAnswer is an option index or a
+    non-empty list of distinct indices, all within range
+  - id and number are unique across the bank
+  - topic is one of exam_info.topics, difficulty one of exam_info.difficulty_levels
+  - explanation is a string; exhibit has string src and alt
+  - records still carrying the legacy correct_answer string are flagged
+
+    python bank_schema.py [bank.json ...] [--strict] [--limit 50]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Callable, NamedTuple, Optional
+
+from instrumentation import count
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_BANK = ROOT / "src" / "data" / "questions.json"
+
+REQUIRED_FIELDS = ("id", "number", "question", "options", "correctAnswer", "topic")
+OPTIONAL_FIELDS = ("explanation", "difficulty", "exhibit")
+EXHIBIT_FIELDS = ("src", "alt", "caption", "width", "height")
+MIN_OPTIONS, MAX_OPTIONS = 4, 6
+STR_ONLY, INT_ONLY = frozenset((str,)), frozenset((int,))
+
+class Violation(NamedTuple):
+    position: Optional[int]     # index in questions[]; None for bank-level problems
+    number: Any
+    field: str
+    message: str
+
+    def __str__(self):
+        where = "bank" if self.position is None else f"Q{self.number} (#{self.position})"
+        return f"{where}: {self.field}: {self.message}"
+
+def compile_validator(exam_info: Dict[str, Any], strict: bool = False) -> Callable[[List[Dict[str, Any]]], List[Violation]]:
+    """Build a validator for banks with this exam_info; strict also rejects fields outside the schema"""
+    required = frozenset(REQUIRED_FIELDS)
+    known = required | frozenset(OPTIONAL_FIELDS)
+    topics = frozenset(exam_info.get('topics') or ())
+    difficulties = frozenset(exam_info.get('difficulty_levels') or ())
+    option_range = range(MIN_OPTIONS, MAX_OPTIONS + 1)
+
+    def answer_problem(answer, option_count: int) -> str:
+        """Why an answer failed the fast check in validate()"""
+        if type(answer) is int:
+            return f"index {answer} out of range for {option_count} options"
+        if type(answer) is not list or not answer:
+            return f"expected an option index or a non-empty list of indices, got {answer!r}"
+        if not set(map(type, answer)) <= INT_ONLY:
+            return f"non-integer index in {answer!r}"
+        if len(set(answer)) != len(answer):
+            return f"repeated index in {answer!r}"
+        return f"indices {[i for i in answer if not 0 <= i < option_count]} out of range for {option_count} options"
+
+    def check_exhibit(exhibit) -> Optional[str]:
+        if type(exhibit) is not dict:
+            return f"expected an object, got {type(exhibit).__name__}"
+        if type(exhibit.get('src')) is not str or type(exhibit.get('alt')) is not str:
+            return "src and alt must be strings"
+        extra = exhibit.keys() - EXHIBIT_FIELDS
+        return f"unknown fields {sorted(extra)}" if extra else None
+
+    def validate(questions: List[Dict[str, Any]]) -> List[Violation]:
+        violations: List[Violation] = []
+        add = violations.append
+        ids: Dict[Any, int] = {}
+        numbers: Dict[Any, int] = {}
+
+        for pos, q in enumerate(questions):
+            if type(q) is not dict:
+                add(Violation(pos, None, "record", f"expected an object, got {type(q).__name__}"))
+                continue
+            number = q.get('number')
+            keys = q.keys()
+
+            if not required <= keys:
+                for field in REQUIRED_FIELDS:
+                    if field not in keys:
+                        hint = " (has legacy correct_answer)" if field == "correctAnswer" and "correct_answer" in keys else ""
+                        add(Violation(pos, number, field, "missing" + hint))
+            if 'correct_answer' in keys and 'correctAnswer' in keys:
+                add(Violation(pos, number, "correct_answer", "legacy field alongside correctAnswer"))
+            if strict and not keys <= known:
+                extra = keys - known - {'correct_answer'}
+                if extra:
+                    add(Violation(pos, number, "record", f"unknown fields {sorted(extra)}"))
+
+            record_id = q.get('id')
+            if type(record_id) is int:
+                if record_id in ids:
+                    add(Violation(pos, number, "id", f"duplicate id {record_id} (first at #{ids[record_id]})"))
+                else:
+                    ids[record_id] = pos
+            elif record_id is not None:
+                add(Violation(pos, number, "id", f"expected an integer, got {record_id!r}"))
+            if type(number) is int:
+                if number in numbers:
+                    add(Violation(pos, number, "number", f"duplicate number (first at #{numbers[number]})"))
+                else:
+                    numbers[number] = pos
+            elif number is not None:
+                add(Violation(pos, number, "number", f"expected an integer, got {number!r}"))
+
+            text = q.get('question')
+            if (type(text) is not str or not text or text.isspace()) and 'question' in keys:
+                add(Violation(pos, number, "question", "must be a non-empty string"))
+
+            # Type checks go through set(map(type, ...)) so the common valid record stays in C code
+            options = q.get('options')
+            option_count = 0
+            if type(options) is list and set(map(type, options)) <= STR_ONLY:
+                option_count = len(options)
+                if option_count not in option_range:
+                    add(Violation(pos, number, "options", f"{option_count} options, expected {MIN_OPTIONS}-{MAX_OPTIONS}"))
+            elif 'options' in keys:
+                add(Violation(pos, number, "options", "must be a list of strings"))
+
+            answer = q.get('correctAnswer')
+            if option_count and answer is not None:
+                if type(answer) is int:
+                    valid = 0 <= answer < option_count
+                else:
+                    valid = (type(answer) is list and answer and set(map(type, answer)) <= INT_ONLY
+                             and len(set(answer)) == len(answer) and min(answer) >= 0 and max(answer) < option_count)
+                if not valid:
+                    add(Violation(pos, number, "correctAnswer", answer_problem(answer, option_count)))
+
+            # Checked for str first: an unhashable value would make the set lookup raise
+            topic = q.get('topic')
+            if type(topic) is not str and 'topic' in keys:
+                add(Violation(pos, number, "topic", f"expected a string, got {topic!r}"))
+            elif topics and topic not in topics and 'topic' in keys:
+                add(Violation(pos, number, "topic", f"{topic!r} is not in exam_info.topics"))
+            difficulty = q.get('difficulty')
+            if type(difficulty) is not str and 'difficulty' in keys:
+                add(Violation(pos, number, "difficulty", f"expected a string, got {difficulty!r}"))
+            elif difficulties and difficulty not in difficulties and 'difficulty' in keys:
+                add(Violation(pos, number, "difficulty", f"{difficulty!r} is not in exam_info.difficulty_levels"))
+            explanation = q.get('explanation')
+            if type(explanation) is not str and 'explanation' in keys:
+                add(Violation(pos, number, "explanation", "must be a string"))
+            if 'exhibit' in keys:
+                problem = check_exhibit(q['exhibit'])
+                if problem:
+                    add(Violation(pos, number, "exhibit", problem))
+
+        count("questions_scanned", len(questions))
+        return violations
+
+    return validate
+
+def validate_bank(data: Dict[str, Any], strict: bool = False) -> List[Violation]:
+    """Every violation in a loaded bank, bank-level problems first"""
+    if not isinstance(data, dict) or not isinstance(data.get('questions'), list):
+        return [Violation(None, None, "questions", "bank has no questions list")]
+
+    exam_info = data.get('exam_info') if isinstance(data.get('exam_info'), dict) else {}
+    violations = []
+    if not exam_info:
+        violations.append(Violation(None, None, "exam_info", "missing"))
+    for field in ("topics", "difficulty_levels"):
+        if exam_info and not exam_info.get(field):
+            violations.append(Violation(None, None, f"exam_info.{field}", "missing; not checked"))
+    total = exam_info.get('total_questions')
+    if total is not None and total != len(data['questions']):
+        violations.append(Violation(None, None, "exam_info.total_questions",
+                                    f"says {total}, bank has {len(data['questions'])} records"))
+
+    return violations + compile_validator(exam_info, strict)(data['questions'])
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate question banks against the app's schema")
+    parser.add_argument("banks", nargs="*", default=[str(DEFAULT_BANK)], help="bank files (default: %(default)s)")
+    parser.add_argument("--strict", action="store_true", help="also reject fields the app does not know")
+    parser.add_argument("--limit", type=int, default=50, help="violations listed per bank (default: %(default)s, 0 = all)")
+    args = parser.parse_args()
+
+    failed = False
+    for bank_file in args.banks:
+        try:
+            with open(bank_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ {bank_file}: {e}")
+            failed = True
+            continue
+
+        start = time.perf_counter()
+        violations = validate_bank(data, args.strict)
+        elapsed = time.perf_counter() - start
+        records = len(data.get('questions') or []) if isinstance(data, dict) else 0
+
+        if not violations:
+            print(f"✅ {bank_file}: {records} records valid ({elapsed * 1000:.1f} ms)")
+            continue
+        failed = True
+        print(f"❌ {bank_file}: {len(violations)} violations in {records} records ({elapsed * 1000:.1f} ms)")
+        shown = violations if args.limit == 0 else violations[:args.limit]
+        for violation in shown:
+            print(f"  {violation}")
+        if len(shown) < len(violations):
+            print(f"  ... {len(violations) - len(shown)} more")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
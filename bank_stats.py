@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Precomputed question bank statistics, kept in a sidecar file next to the bank
+
+    src/data/questions.json  ->  src/data/stats/questions.json
+
+The sidecar holds the aggregates the summary and the app's /stats page show:
+record count, topic and difficulty distribution, question types, and numbering
+(range, gaps and duplicates). The expected range runs from 1 to the highest
+number in the bank. Merges and patches update it incrementally: every record
+they touch is subtracted as it was and added back as it is, and nothing else
+is read. Every other writer of the bank (migration, restore) rebuilds it with
+rebuild_stats(), since the app reads the sidecar without any check. Readers
+check the bank's size and mtime against the stamp stored in the sidecar; if
+they differ and the content hash does too, the stats are rebuilt from the
+bank in one pass.
+
+    python bank_stats.py [bank.json]            # show the sidecar, rebuilding it if stale
+    python bank_stats.py [bank.json] --rebuild
+"""
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from bank_cache import load_bank
+from bank_writer import write_bank
+from instrumentation import count
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_BANK = ROOT / "src" / "data" / "questions.json"
+
+# Bump when the sidecar layout changes; older sidecars are rebuilt
+STATS_VERSION = 1
+QUESTION_TYPES = ("single", "multiple", "matching")
+PREVIEW_LENGTH = 50
+
+def stats_path(bank_file) -> Path:
+    """Sidecar of a bank; kept in a subdirectory so tools globbing src/data/*.json do not take it for a bank"""
+    bank_file = Path(bank_file)
+    return bank_file.parent / "stats" / f"{bank_file.stem}.json"
+
+def file_hash(path) -> Optional[str]:
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+def bank_stamp(bank_file) -> Dict[str, Any]:
+    stat = os.stat(bank_file)
+    return {"sha256": file_hash(bank_file), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def question_type(question: Dict[str, Any]) -> str:
+    """single, multiple or matching, for records on correctAnswer or the legacy correct_answer"""
+    answer = question.get('correctAnswer', question.get('correct_answer', ''))
+    if isinstance(answer, list):
+        return "multiple" if len(answer) > 1 else "single"
+    if isinstance(answer, str) and 'match' in answer.lower():
+        return "matching"
+    return "matching" if 'match' in str(question.get('question', '')).lower() else "single"
+
+def _bump(counter: Dict[Any, int], key: Any, n: int):
+    value = counter.get(key, 0) + n
+    if value:
+        counter[key] = value
+    else:
+        counter.pop(key, None)
+
+class BankStats:
+    """Aggregates over a bank that can be updated one record at a time"""
+
+    def __init__(self):
+        self.total = 0
+        self.topics: Dict[str, int] = {}
+        self.difficulties: Dict[str, int] = {}
+        self.types: Dict[str, int] = {}
+        self.numbers: Dict[int, int] = {}           # number -> records carrying it
+        self.exhibits = 0
+        self.needs_review = 0
+
+    @classmethod
+    def from_questions(cls, questions: List[Dict[str, Any]]) -> "BankStats":
+        stats = cls()
+        for question in questions:
+            stats.add(question)
+        count("questions_scanned", len(questions))
+        return stats
+
+    @classmethod
+    def from_sidecar(cls, sidecar: Dict[str, Any]) -> "BankStats":
+        stats = cls()
+        stats.total = sidecar['total_questions']
+        stats.topics = dict(sidecar['topics'])
+        stats.difficulties = dict(sidecar['difficulties'])
+        stats.types = {t: n for t, n in sidecar['question_types'].items() if n}
+        stats.exhibits = sidecar['exhibits']
+        stats.needs_review = sidecar['needs_review']
+
+        # Every number in [first, highest] is held once unless listed as missing or duplicated
+        numbering = sidecar['numbering']
+        if numbering['highest'] is not None:
+            missing = set(numbering['missing'])
+            duplicates = {int(n): c for n, c in numbering['duplicates'].items()}
+            stats.numbers = {n: duplicates.get(n, 1)
+                             for n in range(min(1, numbering['lowest']), numbering['highest'] + 1) if n not in missing}
+        return stats
+
+    def add(self, question: Dict[str, Any], sign: int = 1):
+        self.total += sign
+        _bump(self.topics, question.get('topic', 'Unknown'), sign)
+        if 'difficulty' in question:
+            _bump(self.difficulties, question['difficulty'], sign)
+        _bump(self.types, question_type(question), sign)
+        if isinstance(question.get('number'), int):
+            _bump(self.numbers, question['number'], sign)
+        if question.get('exhibit'):
+            self.exhibits += sign
+        if question.get('needs_review') is True:
+            self.needs_review += sign
+
+    def remove(self, question: Dict[str, Any]):
+        self.add(question, -1)
+
+    def replace(self, before: Dict[str, Any], after: Dict[str, Any]):
+        self.remove(before)
+        self.add(after)
+
+    def numbering(self) -> Dict[str, Any]:
+        if not self.numbers:
+            return {"lowest": None, "highest": None, "expected": 0, "missing": [], "duplicates": {}}
+        lowest, highest = min(self.numbers), max(self.numbers)
+        first = min(1, lowest)
+        return {
+            "lowest": lowest,
+            "highest": highest,
+            "expected": highest - first + 1,
+            "missing": [n for n in range(first, highest + 1) if n not in self.numbers],
+            "duplicates": {str(n): c for n, c in sorted(self.numbers.items()) if c > 1},
+        }
+
+    def to_sidecar(self, stamp: Dict[str, Any], exam_info: Optional[Dict[str, Any]] = None,
+                   last_merge: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        exam_info = exam_info or {}
+        return {
+            "version": STATS_VERSION,
+            "bank": stamp,
+            "last_updated": exam_info.get('last_updated'),
+            "total_questions": self.total,
+            "topics": dict(sorted(self.topics.items(), key=lambda item: (-item[1], item[0]))),
+            "difficulties": dict(sorted(self.difficulties.items())),
+            "question_types": {t: self.types.get(t, 0) for t in QUESTION_TYPES},
+            "numbering": self.numbering(),
+            "exhibits": self.exhibits,
+            "needs_review": self.needs_review,
+            "last_merge": last_merge,
+        }
+
+def read_sidecar(bank_file) -> Optional[Dict[str, Any]]:
+    try:
+        with open(stats_path(bank_file), 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return sidecar if isinstance(sidecar, dict) and sidecar.get('version') == STATS_VERSION else None
+
+def describes(sidecar: Optional[Dict[str, Any]], bank_file, verify: bool = True) -> bool:
+    """Whether sidecar was computed from bank_file as it is now; with verify, a moved mtime is settled by the hash"""
+    if not sidecar:
+        return False
+    try:
+        stat = os.stat(bank_file)
+    except OSError:
+        return False
+    recorded = sidecar.get('bank') or {}
+    if recorded.get('size') == stat.st_size and recorded.get('mtime_ns') == stat.st_mtime_ns:
+        return True
+    return verify and recorded.get('size') == stat.st_size and recorded.get('sha256') == file_hash(bank_file)
+
+def open_stats(bank_file, questions: List[Dict[str, Any]]) -> BankStats:
+    """Stats for bank_file before a change, from its sidecar if current or else from questions (its records)"""
+    sidecar = read_sidecar(bank_file)
+    if describes(sidecar, bank_file):
+        return BankStats.from_sidecar(sidecar)
+    return BankStats.from_questions(questions)
+
+def write_stats(bank_file, stats: BankStats, exam_info: Optional[Dict[str, Any]] = None,
+                last_merge: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Write the sidecar for bank_file as it is on disk now; last_merge is carried over if not given"""
+    if last_merge is None:
+        last_merge = (read_sidecar(bank_file) or {}).get('last_merge')
+    sidecar = stats.to_sidecar(bank_stamp(bank_file), exam_info, last_merge)
+    path = stats_path(bank_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_bank(path, sidecar)
+    return sidecar
+
+def merge_record(inserted: List[Dict[str, Any]], merged_on: Optional[str]) -> Dict[str, Any]:
+    """The last_merge entry for a merge that inserted these records"""
+    return {
+        "date": merged_on,
+        "inserted": [{"number": q.get('number'), "topic": q.get('topic', 'Unknown'),
+                      "preview": str(q.get('question', ''))[:PREVIEW_LENGTH]} for q in inserted],
+    }
+
+def rebuild_stats(bank_file, data: Any) -> Dict[str, Any]:
+    """Recompute the sidecar of bank_file from data (what was just written to it) in one pass"""
+    questions = data.get('questions', []) if isinstance(data, dict) else data
+    exam_info = data.get('exam_info') if isinstance(data, dict) else None
+    return write_stats(bank_file, BankStats.from_questions(questions), exam_info)
+
+def load_stats(bank_file, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """The sidecar for bank_file, rebuilt (from data if given, else the file) and rewritten if stale"""
+    sidecar = read_sidecar(bank_file)
+    if describes(sidecar, bank_file):
+        return sidecar
+    return rebuild_stats(bank_file, load_bank(bank_file).data if data is None else data)
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or rebuild the statistics sidecar of a question bank")
+    parser.add_argument("bank", nargs="?", default=str(DEFAULT_BANK), help="question bank (default: %(default)s)")
+    parser.add_argument("--rebuild", action="store_true", help="recompute the stats from the bank even if current")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        with open(args.bank, 'r', encoding='utf-8') as f:
+            sidecar = rebuild_stats(args.bank, json.load(f))
+    else:
+        sidecar = load_stats(args.bank)
+    print(f"Stats sidecar: {stats_path(args.bank)}")
+    print(json.dumps({k: v for k, v in sidecar.items() if k != 'bank'}, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
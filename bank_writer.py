@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Atomic streaming writer for question banks
+
+Records are serialized one at a time into a temp file in the target's directory,
+which is fsynced and renamed over the target, so readers only ever see the old
+file or the complete new one. Pretty mode produces the same text as
+json.dump(data, f, indent=2, ensure_ascii=False); compact mode has no whitespace.
+"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from instrumentation import count
+
+def _dumps(value: Any, pretty: bool) -> str:
+    if pretty:
+        return json.dumps(value, indent=2, ensure_ascii=False)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+def _indent(text: str, prefix: str) -> str:
+    return text.replace('\n', '\n' + prefix)
+
+def _write_records(f, records: Iterable[Any], pretty: bool, prefix: str) -> int:
+    """Stream a JSON array of records; returns how many were written"""
+    written = 0
+    for record in records:
+        if pretty:
+            f.write(('[\n' if written == 0 else ',\n') + prefix + '  ' + _indent(_dumps(record, True), prefix + '  '))
+        else:
+            f.write(('[' if written == 0 else ',') + _dumps(record, False))
+        written += 1
+    if written == 0:
+        f.write('[]')
+    else:
+        f.write('\n' + prefix + ']' if pretty else ']')
+    return written
+
+def _fsync_directory(directory: Path):
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # not supported on every platform (e.g. Windows)
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+@contextmanager
+def atomic_open(path, mode: str = 'w'):
+    """Open a temp file next to path; on a clean exit it is fsynced and renamed over path"""
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=None if 'b' in mode else 'utf-8') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        # Keep the target's permissions rather than mkstemp's 0600
+        if path.exists():
+            os.chmod(tmp_name, path.stat().st_mode & 0o777)
+        else:
+            os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+        count("bytes_written", path.stat().st_size)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(path.parent)
+
+def write_bytes(path, raw: bytes):
+    """Atomically replace path with already-serialized content"""
+    with atomic_open(path, 'wb') as f:
+        f.write(raw)
+
+def write_bank(path, data: Dict[str, Any], pretty: bool = True, questions: Optional[Iterable[Any]] = None) -> int:
+    """Atomically write a bank to path; returns the number of question records written
+
+    data supplies every top-level key in order. If questions is given it is streamed
+    in place of data['questions'], so a generator never has to be materialized.
+    A bank that is a plain list of records can be passed as data.
+    """
+    with atomic_open(path) as f:
+        if isinstance(data, list):
+            return _write_records(f, data if questions is None else questions, pretty, '')
+        keys = list(data) if 'questions' in data or questions is None else list(data) + ['questions']
+        f.write('{')
+        written = 0
+        for i, key in enumerate(keys):
+            if i:
+                f.write(',')
+            f.write(('\n  ' if pretty else '') + json.dumps(key, ensure_ascii=False) + (': ' if pretty else ':'))
+            if key == 'questions':
+                written = _write_records(f, data.get('questions', []) if questions is None else questions, pretty, '  ')
+            else:
+                f.write(_indent(_dumps(data[key], pretty), '  ') if pretty else _dumps(data[key], False))
+        f.write('\n}' if pretty and keys else '}')
+    return written
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Time each stage of the question pipeline on synthetic data of increasing size
+
+For every size a webtext.md and questions.json are generated (see synthetic_data.py)
+and these stages are timed separately: webtext analysis, building the block index,
+extract_single_question for every number missing from the bank, determine_topic and
+identify_correct_answer over every question, merge_questions of the missing records,
+and the summary (cold, then from the parsed-bank cache).
+
+Results go to benchmark_results/<timestamp>.json; --compare prints the ratio of
+each stage against an earlier results file.
+
+    python benchmark_suite.py [--sizes 1000 10000 100000] [--compare benchmark_results/old.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Callable, Optional
+
+import analyze_questions
+import extract_missing_questions_v2 as extractor
+import extraction_summary
+import merge_missing_questions
+from bank_cache import cache_path
+from bank_stats import stats_path
+from synthetic_data import generate_dataset
+from webtext_parser import build_question_index
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_RESULTS_DIR = ROOT / "benchmark_results"
+REGRESSION_RATIO = 1.25
+
+def timed(func: Callable[[], Any], repeat: int = 1) -> float:
+    """Best wall time of func over repeat runs, with its output suppressed"""
+    best = float('inf')
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+def _stage(seconds: float, items: int) -> Dict[str, Any]:
+    return {"seconds": round(seconds, 6), "items": items,
+            "us_per_item": round(seconds / items * 1e6, 2) if items else None}
+
+def benchmark_size(count: int, work_dir: Path, repeat: int = 1, seed: int = 42) -> Dict[str, Any]:
+    """Generate a dataset of count questions in work_dir and time every stage on it"""
+    generate_start = time.perf_counter()
+    webtext_file, bank_file, missing = generate_dataset(count, work_dir, seed)
+    generate_seconds = time.perf_counter() - generate_start
+
+    with open(bank_file, 'r', encoding='utf-8') as f:
+        questions = json.load(f)['questions']
+    content = webtext_file.read_text(encoding='utf-8')
+    stages: Dict[str, Dict[str, Any]] = {}
+
+    stages["webtext_analysis"] = _stage(
+        timed(lambda: analyze_questions.analyze_webtext_questions(str(webtext_file)), repeat), count)
+
+    index_holder = {}
+    stages["extract_index"] = _stage(
+        timed(lambda: index_holder.update(index=build_question_index(content)), repeat), count)
+    index = index_holder["index"]
+
+    extracted: List[Dict[str, Any]] = []
+    def extract_missing():
+        extracted[:] = [extractor.extract_single_question(index, n) for n in missing]
+    stages["extract_single_question"] = _stage(timed(extract_missing, repeat), len(missing))
+
+    texts = [q['question'] + " " + " ".join(q['options']) for q in questions]
+    stages["determine_topic"] = _stage(
+        timed(lambda: [extractor.determine_topic(t) for t in texts], repeat), len(texts))
+
+    stages["identify_correct_answer"] = _stage(
+        timed(lambda: [extractor.identify_correct_answer(q['options'], q['explanation'])
+                       for q in questions], repeat), len(questions))
+
+    # Merge the extracted records into a fresh copy of the bank each time
+    merge_bank = work_dir / "merge_bank.json"
+    def merge():
+        shutil.copyfile(bank_file, merge_bank)
+        merge_missing_questions.merge_questions(str(merge_bank), backup_store=work_dir / "backups",
+                                                new_questions=[q for q in extracted if q])
+    stages["merge_questions"] = _stage(timed(merge, repeat), len(missing))
+
+    cache_file, stats_file = cache_path(merge_bank), stats_path(merge_bank)
+    def cold_summary():
+        cache_file.unlink(missing_ok=True)
+        stats_file.unlink(missing_ok=True)
+        extraction_summary.generate_summary(str(merge_bank))
+    stages["summary"] = _stage(timed(cold_summary, repeat), count)
+    stages["summary_cached"] = _stage(timed(lambda: extraction_summary.generate_summary(str(merge_bank)), repeat), count)
+    cache_file.unlink(missing_ok=True)
+    stats_file.unlink(missing_ok=True)
+
+    return {
+        "questions": count,
+        "missing": len(missing),
+        "webtext_bytes": webtext_file.stat().st_size,
+        "bank_bytes": bank_file.stat().st_size,
+        "generate_seconds": round(generate_seconds, 3),
+        "stages": stages,
+    }
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "commit": commit, "topic_engine": extractor.TOPIC_ENGINE}
+
+def compare_results(current: Dict[str, Any], previous: Dict[str, Any]):
+    print(f"\nCompared with {previous.get('created')} (commit {previous['environment'].get('commit')}):")
+    for size, result in current['sizes'].items():
+        old = previous.get('sizes', {}).get(size)
+        if not old:
+            continue
+        print(f"  {size} questions:")
+        for stage, timing in result['stages'].items():
+            before = old['stages'].get(stage)
+            if not before or not before['seconds']:
+                continue
+            ratio = timing['seconds'] / before['seconds']
+            flag = "  ⚠️ slower" if ratio > REGRESSION_RATIO else ("  faster" if ratio < 1 / REGRESSION_RATIO else "")
+            print(f"    {stage:<24} {before['seconds']:>9.4f}s -> {timing['seconds']:>9.4f}s  x{ratio:.2f}{flag}")
+
+def print_results(results: Dict[str, Any]):
+    for size, result in results['sizes'].items():
+        print(f"\n{size} questions (webtext {result['webtext_bytes'] / 1024:.0f} KB, "
+              f"bank {result['bank_bytes'] / 1024:.0f} KB, {result['missing']} missing):")
+        for stage, timing in result['stages'].items():
+            per_item = f"{timing['us_per_item']:>10.1f} us/item" if timing['us_per_item'] is not None else ""
+            print(f"  {stage:<24} {timing['seconds']:>9.4f}s  {per_item}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the question pipeline on synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage; the best is kept (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmark_results/<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--keep", metavar="DIR", help="keep the generated data in DIR")
+    args = parser.parse_args()
+
+    results = {"created": datetime.now().isoformat(timespec='seconds'), "environment": environment(),
+               "repeat": args.repeat, "seed": args.seed, "sizes": {}}
+
+    with tempfile.TemporaryDirectory(prefix="qbench-") as tmp:
+        base = Path(args.keep) if args.keep else Path(tmp)
+        for count in args.sizes:
+            print(f"Benchmarking {count} questions...", flush=True)
+            results['sizes'][str(count)] = benchmark_size(count, base / str(count), args.repeat, args.seed)
+
+    print_results(results)
+
+    output = Path(args.output) if args.output else DEFAULT_RESULTS_DIR / f"{datetime.now().strftime('%Y%m%dT%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare_results(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
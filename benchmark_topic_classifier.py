@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled keyword classifier against the original substring loop
+"""
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from topic_classifier import TOPIC_KEYWORDS, KeywordTopicClassifier
+
+DEFAULT_QUESTIONS_FILE = Path(__file__).resolve().parent / "src" / "data" / "questions.json"
+
+def substring_determine_topic(content: str) -> str:
+    """The original determine_topic: one substring test per keyword per topic"""
+    content_lower = content.lower()
+
+    topic_scores = {}
+    for topic, keywords in TOPIC_KEYWORDS.items():
+        score = sum(1 for keyword in keywords if keyword in content_lower)
+        if score > 0:
+            topic_scores[topic] = score
+
+    if topic_scores:
+        return max(topic_scores, key=topic_scores.get)
+    else:
+        return "General IT"
+
+def time_calls(func, texts: List[str], rounds: int) -> float:
+    """Best wall time for one pass over texts, in seconds"""
+    best = float('inf')
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(texts)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    questions_file = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_QUESTIONS_FILE
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    with open(questions_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    questions = data['questions']
+    # Same text the extractor classifies: stem plus options
+    texts = [q['question'] + " " + " ".join(q.get('options', [])) for q in questions]
+    labels = [q.get('topic') for q in questions]
+
+    build_start = time.perf_counter()
+    classifier = KeywordTopicClassifier()
+    build_time = time.perf_counter() - build_start
+
+    legacy_time = time_calls(lambda batch: [substring_determine_topic(t) for t in batch], texts, rounds)
+    compiled_time = time_calls(classifier.classify_many, texts, rounds)
+
+    legacy = [substring_determine_topic(t) for t in texts]
+    compiled = classifier.classify_many(texts)
+
+    agree = sum(1 for a, b in zip(legacy, compiled) if a == b)
+    legacy_correct = sum(1 for a, label in zip(legacy, labels) if a == label)
+    compiled_correct = sum(1 for a, label in zip(compiled, labels) if a == label)
+
+    print(f"Questions: {len(texts)} (best of {rounds} rounds)")
+    print(f"Compile time: {build_time * 1000:.2f} ms")
+    print(f"Substring loop: {legacy_time * 1000:8.2f} ms  ({legacy_time / len(texts) * 1e6:6.1f} µs/question)")
+    print(f"Compiled regex: {compiled_time * 1000:8.2f} ms  ({compiled_time / len(texts) * 1e6:6.1f} µs/question)")
+    print(f"Speedup: {legacy_time / compiled_time:.2f}x")
+    print(f"\nAgreement with substring loop: {agree}/{len(texts)}")
+    print(f"Matches labeled topic: substring {legacy_correct}/{len(texts)}, compiled {compiled_correct}/{len(texts)}")
+
+    changed = [(q['number'], a, b, label) for q, a, b, label in zip(questions, legacy, compiled, labels) if a != b]
+    if changed:
+        print(f"\nSample of changed classifications (number: substring -> compiled [label]):")
+        for number, a, b, label in changed[:15]:
+            print(f"  Q{number}: {a} -> {b} [{label}]")
+
+if __name__ == "__main__":
+    main()
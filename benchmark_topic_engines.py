@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Compare accuracy and throughput of the keyword and TF-IDF topic engines on the labeled bank
+"""
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmark_topic_classifier import time_calls
+from tfidf_topic_classifier import DEFAULT_QUESTIONS_FILE, TfidfTopicClassifier, load_training_data, require_numpy
+from topic_classifier import KeywordTopicClassifier
+
+def cross_validate(texts, labels, topics, folds: int):
+    """Held-out accuracy of the TF-IDF engine: every record is scored by a model that never saw it"""
+    correct = 0
+    for fold in range(folds):
+        train = [i for i in range(len(texts)) if i % folds != fold]
+        test = [i for i in range(len(texts)) if i % folds == fold]
+        model = TfidfTopicClassifier.fit([texts[i] for i in train], [labels[i] for i in train], topics)
+        predicted = model.classify_many([texts[i] for i in test])
+        correct += sum(1 for i, topic in zip(test, predicted) if topic == labels[i])
+    return correct
+
+def main():
+    require_numpy()
+    questions_file = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_QUESTIONS_FILE
+    folds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    rounds = 20
+
+    texts, labels, topics = load_training_data(questions_file)
+    n = len(texts)
+
+    keyword = KeywordTopicClassifier()
+    keyword_correct = sum(1 for t, label in zip(keyword.classify_many(texts), labels) if t == label)
+    keyword_time = time_calls(keyword.classify_many, texts, rounds)
+
+    start = time.perf_counter()
+    model = TfidfTopicClassifier.fit(texts, labels, topics)
+    fit_time = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_file = Path(tmp) / "topic_model.npz"
+        model.save(model_file)
+        start = time.perf_counter()
+        TfidfTopicClassifier.load(model_file)
+        load_time = time.perf_counter() - start
+        model_size = model_file.stat().st_size
+
+    tfidf_time = time_calls(model.classify_many, texts, rounds)
+    tfidf_correct = cross_validate(texts, labels, topics, folds)
+
+    print(f"Labeled records: {n}, topics: {len(topics)}")
+    print(f"\n{'Engine':<10} {'Accuracy':>18} {'Batch time':>12} {'Per record':>12}")
+    print(f"{'keyword':<10} {keyword_correct:>4}/{n} ({keyword_correct / n * 100:5.1f}%) {keyword_time * 1000:>9.2f} ms {keyword_time / n * 1e6:>9.1f} µs")
+    print(f"{'tfidf':<10} {tfidf_correct:>4}/{n} ({tfidf_correct / n * 100:5.1f}%) {tfidf_time * 1000:>9.2f} ms {tfidf_time / n * 1e6:>9.1f} µs")
+    print(f"\nTF-IDF accuracy is {folds}-fold cross-validated on {Path(questions_file).name}")
+    print(f"TF-IDF fit: {fit_time * 1000:.1f} ms, model load: {load_time * 1000:.1f} ms, model size: {model_size / 1024:.1f} KB")
+
+if __name__ == "__main__":
+    main()
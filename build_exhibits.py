@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Build cache-friendly exhibit assets for the web app
+
+    public/data/exhibits/manifest.json
+    public/data/exhibits/<name>.<hash>.svg (+ .svg.gz, .svg.br)
+    public/data/exhibits/<name>-<width>w.<hash>.png|jpg|webp
+
+Every exhibit the bank references (exhibit.src, relative to public/) is read and
+deduplicated by content hash. SVGs are minified (comments, metadata and
+indentation outside <text> removed) and precompressed with gzip, and brotli
+when the module is installed. Raster images are recompressed and resized to
+each target width below their own with Pillow if it is installed; without it the
+original bytes are copied under a hashed name. File names carry the first
+characters of their SHA-256, so they can be served as immutable.
+
+The manifest's "exhibits" maps each question number to its files with
+dimensions, smallest first, so the app can pick a size and lazy-load it. Files
+no longer referenced are deleted.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import re
+import struct
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+from bank_cache import CachedBank, load_bank
+from bank_writer import write_bank, write_bytes
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_BANK = ROOT / "src" / "data" / "questions.json"
+DEFAULT_PUBLIC = ROOT / "public"
+DEFAULT_OUTPUT = DEFAULT_PUBLIC / "data" / "exhibits"
+DEFAULT_WIDTHS = (320, 640, 960)
+JPEG_QUALITY = 82
+MANIFEST_VERSION = 1
+
+MEDIA_TYPES = {".svg": "image/svg+xml", ".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg",
+               ".webp": "image/webp", ".gif": "image/gif"}
+PIL_FORMATS = {".png": "PNG", ".jpg": "JPEG", ".jpeg": "JPEG", ".webp": "WEBP"}
+
+SVG_TEXT_RE = re.compile(r'(<text\b.*?</text>)', re.DOTALL)
+SVG_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+SVG_DROP_RE = re.compile(r'<\?xml.*?\?>|<!DOCTYPE[^>]*>|<metadata\b.*?</metadata>', re.DOTALL)
+SVG_ROOT_RE = re.compile(r'<svg\b[^>]*>', re.DOTALL)
+SVG_NUMBER_ATTR_RE = r'\b{}\s*=\s*"\s*([\d.]+)(?:px)?\s*"'
+
+# --- SVG -------------------------------------------------------------------
+
+def minify_svg(text: str) -> str:
+    """Drop comments, prolog and metadata and collapse indentation; <text> elements are kept verbatim"""
+    text = SVG_DROP_RE.sub('', SVG_COMMENT_RE.sub('', text))
+    parts = SVG_TEXT_RE.split(text)
+    for i in range(0, len(parts), 2):   # even parts are outside <text>
+        part = re.sub(r'>\s+<', '><', parts[i])
+        parts[i] = re.sub(r'\s+', ' ', part)
+    return "".join(parts).strip()
+
+def svg_size(text: str) -> Tuple[Optional[int], Optional[int]]:
+    """Intrinsic size from the root element's width/height, else its viewBox"""
+    root = SVG_ROOT_RE.search(text)
+    if not root:
+        return None, None
+    tag = root.group(0)
+    width, height = (re.search(SVG_NUMBER_ATTR_RE.format(name), tag) for name in ("width", "height"))
+    if width and height:
+        return round(float(width.group(1))), round(float(height.group(1)))
+    view_box = re.search(r'\bviewBox\s*=\s*"\s*[-\d.]+[\s,]+[-\d.]+[\s,]+([\d.]+)[\s,]+([\d.]+)\s*"', tag)
+    if view_box:
+        return round(float(view_box.group(1))), round(float(view_box.group(2)))
+    return None, None
+
+# --- raster ----------------------------------------------------------------
+
+def image_size(raw: bytes) -> Tuple[Optional[int], Optional[int]]:
+    """Width and height from a PNG, GIF or JPEG header"""
+    if raw[:8] == b'\x89PNG\r\n\x1a\n' and len(raw) >= 24:
+        return struct.unpack('>II', raw[16:24])
+    if raw[:6] in (b'GIF87a', b'GIF89a') and len(raw) >= 10:
+        return struct.unpack('<HH', raw[6:10])
+    if raw[:2] == b'\xff\xd8':
+        i = 2
+        while i + 9 < len(raw):
+            if raw[i] != 0xFF:
+                i += 1
+                continue
+            marker = raw[i + 1]
+            length = struct.unpack('>H', raw[i + 2:i + 4])[0]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack('>HH', raw[i + 5:i + 9])
+                return width, height
+            i += 2 + length
+    return None, None
+
+def _encode_image(image, pil_format: str) -> bytes:
+    from io import BytesIO
+    out = BytesIO()
+    if pil_format == "JPEG":
+        image.convert("RGB").save(out, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    elif pil_format == "WEBP":
+        image.save(out, "WEBP", quality=JPEG_QUALITY, method=6)
+    else:
+        image.save(out, "PNG", optimize=True)
+    return out.getvalue()
+
+def raster_variants(raw: bytes, suffix: str, widths: Tuple[int, ...]) -> List[Tuple[bytes, int, int, bool]]:
+    """(bytes, width, height, resized) for the original size and each smaller target width"""
+    width, height = image_size(raw)
+    pil_format = PIL_FORMATS.get(suffix)
+    if Image is None or pil_format is None:
+        return [(raw, width, height, False)]
+
+    from io import BytesIO
+    with Image.open(BytesIO(raw)) as image:
+        image.load()
+        width, height = image.size
+        recompressed = _encode_image(image, pil_format)
+        variants = [(min(raw, recompressed, key=len), width, height, False)]
+        for target in sorted(set(widths)):
+            if target < width:
+                target_height = max(1, round(height * target / width))
+                resized = image.resize((target, target_height), Image.LANCZOS)
+                variants.append((_encode_image(resized, pil_format), target, target_height, True))
+    return variants
+
+# --- build -----------------------------------------------------------------
+
+def _write_asset(output_dir: Path, name: str, raw: bytes, suffix: str, compress: bool) -> Dict[str, Any]:
+    digest = hashlib.sha256(raw).hexdigest()
+    relative = f"{name}.{digest[:12]}{suffix}"
+    files = {relative: raw}
+    entry = {"file": relative, "bytes": len(raw), "sha256": digest}
+    if compress:
+        gz = gzip.compress(raw, compresslevel=9, mtime=0)
+        if len(gz) < len(raw):
+            files[relative + ".gz"] = gz
+            entry["gzip_bytes"] = len(gz)
+        if brotli is not None:
+            br = brotli.compress(raw, quality=11)
+            if len(br) < len(raw):
+                files[relative + ".br"] = br
+                entry["br_bytes"] = len(br)
+    # Content-addressed: an existing file with this name already holds these bytes
+    for relative_file, data in files.items():
+        path = output_dir / relative_file
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_bytes(path, data)
+    return entry
+
+def resolve_source(src: str, public_dir: Path) -> Optional[Path]:
+    """exhibit.src as a file under public_dir, or None if it points elsewhere"""
+    path = (public_dir / src.lstrip('/')).resolve()
+    try:
+        path.relative_to(public_dir.resolve())
+    except ValueError:
+        return None
+    return path
+
+def source_stamp(questions: List[Dict[str, Any]], public_dir=DEFAULT_PUBLIC) -> str:
+    """Hash of every referenced exhibit's path, size and mtime; changes when a source file does"""
+    public_dir = Path(public_dir)
+    stamp = hashlib.sha256()
+    for src in sorted({q['exhibit']['src'] for q in questions
+                       if isinstance(q.get('exhibit'), dict) and q['exhibit'].get('src')}):
+        source = resolve_source(src, public_dir)
+        try:
+            stat = source.stat() if source else None
+        except OSError:
+            stat = None
+        stamp.update(f"{src}\0{stat.st_size if stat else -1}\0{stat.st_mtime_ns if stat else -1}\n".encode())
+    return stamp.hexdigest()
+
+def build_asset(source: Path, output_dir: Path, widths: Tuple[int, ...]) -> Dict[str, Any]:
+    raw = source.read_bytes()
+    suffix = source.suffix.lower()
+    name = re.sub(r'[^a-z0-9]+', '-', f"{source.parent.name}-{source.stem}".lower()).strip('-')
+    asset = {"type": MEDIA_TYPES.get(suffix, "application/octet-stream"), "source_bytes": len(raw),
+             "source_sha256": hashlib.sha256(raw).hexdigest()}
+
+    if suffix == ".svg":
+        text = raw.decode('utf-8')
+        width, height = svg_size(text)
+        minified = minify_svg(text).encode('utf-8')
+        variants = [{**_write_asset(output_dir, name, min(raw, minified, key=len), suffix, compress=True),
+                     "width": width, "height": height}]
+    else:
+        variants = []
+        for data, width, height, resized in raster_variants(raw, suffix, widths):
+            variant_name = f"{name}-{width}w" if resized else name
+            variants.append({**_write_asset(output_dir, variant_name, data, suffix, compress=False),
+                             "width": width, "height": height})
+    variants.sort(key=lambda v: (v['width'] or 0))
+    asset.update(width=variants[-1]['width'], height=variants[-1]['height'], variants=variants)
+    return asset
+
+def build_exhibits(bank_file=DEFAULT_BANK, output_dir=DEFAULT_OUTPUT, public_dir=DEFAULT_PUBLIC,
+                   widths: Tuple[int, ...] = DEFAULT_WIDTHS, base_url: Optional[str] = None,
+                   bank: Optional[CachedBank] = None) -> Dict[str, Any]:
+    """Build every exhibit the bank references and write manifest.json; returns the manifest"""
+    output_dir, public_dir = Path(output_dir), Path(public_dir)
+    if bank is None:
+        bank = load_bank(bank_file)
+    if base_url is None:
+        try:
+            base_url = "/" + output_dir.resolve().relative_to(public_dir.resolve()).as_posix()
+        except ValueError:
+            base_url = ""
+
+    assets: Dict[str, Dict[str, Any]] = {}
+    by_source: Dict[Path, Optional[str]] = {}
+    exhibits: Dict[str, Dict[str, Any]] = {}
+    missing = []
+
+    for q in sorted(bank.questions, key=lambda q: (q.get('number') is None, q.get('number') or 0)):
+        exhibit = q.get('exhibit')
+        if not isinstance(exhibit, dict) or not exhibit.get('src'):
+            continue
+        # Repeated numbers are keyed "N#2", "N#3"... as in bank_reconcile
+        key, repeat = str(q.get('number')), 1
+        while key in exhibits:
+            repeat += 1
+            key = f"{q.get('number')}#{repeat}"
+        source = resolve_source(exhibit['src'], public_dir)
+        if source not in by_source:
+            asset_id = None
+            if source is not None and source.is_file():
+                asset = build_asset(source, output_dir, widths)
+                asset_id = asset['source_sha256'][:12]
+                # Identical files referenced under different paths share one asset
+                assets.setdefault(asset_id, {"sources": [], **asset})
+            by_source[source] = asset_id
+        asset_id = by_source[source]
+        if asset_id is None:
+            missing.append({"number": q.get('number'), "id": q.get('id'), "src": exhibit['src']})
+            continue
+        asset = assets[asset_id]
+        if exhibit['src'] not in asset['sources']:
+            asset['sources'].append(exhibit['src'])
+        exhibits[key] = {
+            "id": q.get('id'),
+            "asset": asset_id,
+            "src": f"{base_url}/{asset['variants'][-1]['file']}",
+            "width": asset['width'],
+            "height": asset['height'],
+            "variants": [{"src": f"{base_url}/{v['file']}", "width": v['width'], "height": v['height'], "bytes": v['bytes']}
+                         for v in asset['variants']],
+        }
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "source": Path(bank_file).name,
+        "source_sha256": bank.sha256,
+        "generated": datetime.now().isoformat(timespec='seconds'),
+        "base_url": base_url,
+        "compression": ["gzip"] + (["br"] if brotli is not None else []),
+        "resized": Image is not None,
+        "exhibits": exhibits,
+        "assets": assets,
+        "missing": missing,
+    }
+
+    manifest_file = output_dir / "manifest.json"
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = None
+    # Keep the old file (and its timestamp) if nothing but the build time would change
+    if previous and {**previous, "generated": None} == {**manifest, "generated": None}:
+        manifest = previous
+    else:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        write_bank(manifest_file, manifest, pretty=False)
+
+    referenced = {"manifest.json"}
+    for asset in assets.values():
+        for variant in asset['variants']:
+            referenced.update(variant['file'] + ext for ext in ("", ".gz", ".br"))
+    if output_dir.exists():
+        for path in output_dir.iterdir():
+            if path.is_file() and path.name not in referenced:
+                path.unlink()
+
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Build hashed, optimized exhibit assets and their manifest")
+    parser.add_argument("--bank", default=str(DEFAULT_BANK))
+    parser.add_argument("--public", default=str(DEFAULT_PUBLIC), help="directory exhibit.src paths are relative to")
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="asset directory (default: %(default)s)")
+    parser.add_argument("--widths", type=int, nargs="+", default=list(DEFAULT_WIDTHS),
+                        help="target widths for raster exhibits (default: %(default)s)")
+    args = parser.parse_args()
+
+    manifest = build_exhibits(args.bank, args.output, args.public, tuple(args.widths))
+
+    source_bytes = sum(a['source_bytes'] for a in manifest['assets'].values())
+    built_bytes = sum(a['variants'][-1]['bytes'] for a in manifest['assets'].values())
+    gzip_bytes = sum(a['variants'][-1].get('gzip_bytes', a['variants'][-1]['bytes']) for a in manifest['assets'].values())
+    print(f"Built {len(manifest['assets'])} exhibit assets for {len(manifest['exhibits'])} questions in {args.output}")
+    print(f"  Full size: {source_bytes / 1024:.1f} KB source -> {built_bytes / 1024:.1f} KB built, "
+          f"{gzip_bytes / 1024:.1f} KB gzipped")
+    if not manifest['resized']:
+        print("  Pillow is not installed: raster exhibits were copied without resizing")
+    for entry in manifest['missing']:
+        print(f"  ⚠️  Q{entry['number']}: {entry['src']} not found")
+
+if __name__ == "__main__":
+    main()
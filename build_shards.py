@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Build minified question shards for the web app: one per topic plus fixed-size chunks
+
+    public/data/shards/manifest.json
+    public/data/shards/topics/<topic-slug>.<hash>.json
+    public/data/shards/chunks/<index>.<hash>.json
+
+Each shard is a minified JSON array of question records. File names carry the first
+characters of the shard's SHA-256, so unchanged shards keep their URL (and any cached
+copy) across builds and can be served as immutable. The manifest lists every shard
+with its record count, numbers, byte size and full hash. Shards that neither the new
+manifest nor the one it replaces reference are deleted; the previous generation is
+kept so clients still holding the cached manifest can fetch its shards.
+"""
+import argparse
+import hashlib
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from bank_cache import CachedBank, load_bank
+from bank_writer import write_bank, write_bytes
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_BANK = ROOT / "src" / "data" / "questions.json"
+DEFAULT_OUTPUT = ROOT / "public" / "data" / "shards"
+# Same default as public/workers/json-parser.js
+DEFAULT_CHUNK_SIZE = 50
+MANIFEST_VERSION = 1
+
+def topic_slug(topic: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', topic.lower()).strip('-') or "topic"
+
+def _number_order(question: Dict[str, Any]):
+    number = question.get('number')
+    return (number is None, number if number is not None else 0)
+
+def _write_shard(output_dir: Path, subdir: str, name: str, questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    raw = json.dumps(questions, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    digest = hashlib.sha256(raw).hexdigest()
+    relative = f"{subdir}/{name}.{digest[:12]}.json"
+    path = output_dir / relative
+    # Content-addressed: an existing file with this name already holds these bytes
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_bytes(path, raw)
+    return {
+        "file": relative,
+        "count": len(questions),
+        "numbers": [q['number'] for q in questions if 'number' in q],
+        "bytes": len(raw),
+        "sha256": digest,
+    }
+
+def build_shards(bank_file=DEFAULT_BANK, output_dir=DEFAULT_OUTPUT, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 bank: Optional[CachedBank] = None) -> Dict[str, Any]:
+    """Write topic and chunk shards plus manifest.json; returns the manifest
+
+    bank is bank_file already loaded, if the caller has it.
+    """
+    output_dir = Path(output_dir)
+    if bank is None:
+        bank = load_bank(bank_file)
+    questions = sorted(bank.questions, key=_number_order)
+
+    by_topic: Dict[str, List[Dict[str, Any]]] = {}
+    for q in questions:
+        by_topic.setdefault(q.get('topic', 'Unknown'), []).append(q)
+
+    topics = []
+    slugs: Dict[str, int] = {}
+    for topic in sorted(by_topic):
+        slug = topic_slug(topic)
+        slugs[slug] = slugs.get(slug, 0) + 1
+        if slugs[slug] > 1:
+            slug = f"{slug}-{slugs[slug]}"
+        topics.append({"topic": topic, "slug": slug, **_write_shard(output_dir, "topics", slug, by_topic[topic])})
+
+    chunks = []
+    for index, start in enumerate(range(0, len(questions), chunk_size)):
+        chunks.append({"index": index, **_write_shard(output_dir, "chunks", f"{index:04d}", questions[start:start + chunk_size])})
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "source": Path(bank_file).name,
+        "source_sha256": bank.sha256,
+        "generated": datetime.now().isoformat(timespec='seconds'),
+        "exam_info": bank.data.get('exam_info') if isinstance(bank.data, dict) else None,
+        "total_questions": len(questions),
+        "chunk_size": chunk_size,
+        "topics": topics,
+        "chunks": chunks,
+    }
+
+    manifest_file = output_dir / "manifest.json"
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = None
+    # Keep the old file (and its timestamp) if nothing but the build time would change
+    if previous and {**previous, "generated": None} == {**manifest, "generated": None}:
+        return previous
+    output_dir.mkdir(parents=True, exist_ok=True)
+    write_bank(manifest_file, manifest, pretty=False)
+
+    referenced = {entry['file'] for entry in topics + chunks}
+    if isinstance(previous, dict):
+        referenced.update(entry.get('file') for entry in previous.get('topics', []) + previous.get('chunks', []))
+    for subdir in ("topics", "chunks"):
+        for path in (output_dir / subdir).glob("*.json"):
+            if f"{subdir}/{path.name}" not in referenced:
+                path.unlink()
+
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Build per-topic and fixed-size question shards for the web app")
+    parser.add_argument("--bank", default=str(DEFAULT_BANK))
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="shard directory (default: %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    manifest = build_shards(args.bank, args.output, args.chunk_size)
+
+    print(f"Built shards for {manifest['total_questions']} questions in {args.output}")
+    print(f"\nTopics ({len(manifest['topics'])}):")
+    for entry in manifest['topics']:
+        print(f"  {entry['topic']:<24} {entry['count']:>4} questions  {entry['bytes'] / 1024:>6.1f} KB  {entry['file']}")
+    print(f"\nChunks ({len(manifest['chunks'])} x {manifest['chunk_size']}):")
+    for entry in manifest['chunks']:
+        numbers = entry['numbers']
+        span = f"#{numbers[0]}-#{numbers[-1]}" if numbers else ""
+        print(f"  {entry['index']:>3}  {entry['count']:>4} questions  {entry['bytes'] / 1024:>6.1f} KB  {span:<12} {entry['file']}")
+
+if __name__ == "__main__":
+    main()
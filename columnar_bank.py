@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Compact columnar export of a question bank, with an mmap reader
+
+Layout (little-endian), every section 8-byte aligned:
+
+    header    b"QBC1", version u16, section count u16, record count u32
+    sections  name (4 bytes), offset u64, length u64 for each section
+    STRS      every distinct string, UTF-8, back to back
+    SOFF      u32 offsets into STRS; string i is STRS[SOFF[i]:SOFF[i+1]]
+    TOPC/DIFF u32 string ids: the interned topic and difficulty tables
+    RECS      one fixed-size row per record (see ROW)
+    OPTS      u32 string ids of every record's options
+    ANSW      u32 correctAnswer indices
+    NIDX      (number, row) i32 pairs sorted by number, for binary search
+    META      JSON of the bank's other top-level keys (exam_info, ...)
+
+Identical strings (options, explanations) are stored once. Fields a row cannot
+hold, such as legacy correct_answer text or exhibits, go in a per-record JSON
+string. The reader decodes only the strings of the records it is asked for.
+
+    python columnar_bank.py export [bank.json] [--output bank.qbc]
+    python columnar_bank.py show <number> [--file bank.qbc]
+    python columnar_bank.py verify [bank.json]
+"""
+import argparse
+import json
+import mmap
+import struct
+import sys
+from bisect import bisect_left
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+from bank_writer import write_bytes
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_BANK = ROOT / "src" / "data" / "questions.json"
+
+MAGIC = b"QBC1"
+VERSION = 1
+HEADER = struct.Struct('<4sHHI')
+SECTION = struct.Struct('<4sQQ')
+# number, id, topic, difficulty, answer kind, presence bits, question, explanation,
+# first option, option count, first answer, answer count, extra JSON (string ids are u32)
+ROW = struct.Struct('<iiHHBB2xIIIIIII')
+
+NONE = 0xFFFFFFFF          # missing string id
+NO_INT = -(1 << 31)        # missing number/id
+
+# answer kind
+ANSWER_NONE, ANSWER_INT, ANSWER_LIST = 0, 1, 2
+# presence bits; a missing field is not the same as an empty one
+HAS_NUMBER, HAS_ID, HAS_TOPIC, HAS_DIFFICULTY, HAS_QUESTION, HAS_EXPLANATION, HAS_OPTIONS = (1 << i for i in range(7))
+
+# Canonical key order used when rebuilding a record
+ROW_FIELDS = ('id', 'number', 'question', 'options', 'correctAnswer', 'explanation', 'topic', 'difficulty')
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and NO_INT < value < (1 << 31)
+
+class _StringTable:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.blob = bytearray()
+        self.offsets = [0]
+
+    def add(self, text: str) -> int:
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.offsets) - 1
+            self.blob += text.encode('utf-8')
+            self.offsets.append(len(self.blob))
+        return string_id
+
+def _intern(table: Dict[str, int], value: str) -> int:
+    return table.setdefault(value, len(table))
+
+def encode_columnar(data: Any) -> bytes:
+    """Serialize a bank (dict with 'questions', or a plain list) to the columnar format"""
+    questions = data.get('questions', []) if isinstance(data, dict) else data
+    meta = {k: v for k, v in data.items() if k != 'questions'} if isinstance(data, dict) else None
+
+    strings = _StringTable()
+    topics: Dict[str, int] = {}
+    difficulties: Dict[str, int] = {}
+    rows = bytearray()
+    options: List[int] = []
+    answers: List[int] = []
+    number_index: List[Tuple[int, int]] = []
+
+    for row_number, q in enumerate(questions):
+        extra = {k: v for k, v in q.items() if k not in ROW_FIELDS}
+        present = 0
+
+        number = q.get('number')
+        if _is_int(number):
+            present |= HAS_NUMBER
+            number_index.append((number, row_number))
+        elif 'number' in q:
+            extra['number'] = number
+        record_id = q.get('id')
+        if _is_int(record_id):
+            present |= HAS_ID
+        elif 'id' in q:
+            extra['id'] = record_id
+
+        string_ids = {}
+        for field, bit in (('question', HAS_QUESTION), ('explanation', HAS_EXPLANATION)):
+            if isinstance(q.get(field), str):
+                present |= bit
+                string_ids[field] = strings.add(q[field])
+            elif field in q:
+                extra[field] = q[field]
+
+        topic = difficulty = 0
+        if isinstance(q.get('topic'), str):
+            present |= HAS_TOPIC
+            topic = _intern(topics, q['topic'])
+        elif 'topic' in q:
+            extra['topic'] = q['topic']
+        if isinstance(q.get('difficulty'), str):
+            present |= HAS_DIFFICULTY
+            difficulty = _intern(difficulties, q['difficulty'])
+        elif 'difficulty' in q:
+            extra['difficulty'] = q['difficulty']
+
+        option_start, option_values = len(options), q.get('options')
+        if isinstance(option_values, list) and all(isinstance(o, str) for o in option_values):
+            present |= HAS_OPTIONS
+            options.extend(strings.add(o) for o in option_values)
+        elif 'options' in q:
+            extra['options'] = option_values
+
+        answer_start, answer, kind = len(answers), q.get('correctAnswer'), ANSWER_NONE
+        if _is_int(answer) and answer >= 0:
+            kind = ANSWER_INT
+            answers.append(answer)
+        elif isinstance(answer, list) and all(_is_int(a) and a >= 0 for a in answer):
+            kind = ANSWER_LIST
+            answers.extend(answer)
+        elif 'correctAnswer' in q:
+            extra['correctAnswer'] = answer
+
+        rows += ROW.pack(
+            number if present & HAS_NUMBER else NO_INT,
+            record_id if present & HAS_ID else NO_INT,
+            topic, difficulty, kind, present,
+            string_ids.get('question', NONE), string_ids.get('explanation', NONE),
+            option_start, len(options) - option_start, answer_start, len(answers) - answer_start,
+            strings.add(json.dumps(extra, ensure_ascii=False, separators=(',', ':'))) if extra else NONE,
+        )
+
+    if len(topics) > 0xFFFF or len(difficulties) > 0xFFFF:
+        raise ValueError("More than 65535 distinct topics or difficulties")
+
+    number_index.sort()
+    topic_ids = [strings.add(t) for t in topics]
+    difficulty_ids = [strings.add(d) for d in difficulties]
+    sections = [
+        (b"STRS", bytes(strings.blob)),
+        (b"SOFF", struct.pack(f'<{len(strings.offsets)}I', *strings.offsets)),
+        (b"TOPC", struct.pack(f'<{len(topic_ids)}I', *topic_ids)),
+        (b"DIFF", struct.pack(f'<{len(difficulty_ids)}I', *difficulty_ids)),
+        (b"RECS", bytes(rows)),
+        (b"OPTS", struct.pack(f'<{len(options)}I', *options)),
+        (b"ANSW", struct.pack(f'<{len(answers)}I', *answers)),
+        (b"NIDX", struct.pack(f'<{2 * len(number_index)}i', *(v for pair in number_index for v in pair))),
+        (b"META", json.dumps(meta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')),
+    ]
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, len(sections), len(questions)))
+    table_at = len(out)
+    out += bytes(SECTION.size * len(sections))
+    for i, (name, payload) in enumerate(sections):
+        out += bytes(-len(out) % 8)
+        SECTION.pack_into(out, table_at + i * SECTION.size, name, len(out), len(payload))
+        out += payload
+    return bytes(out)
+
+def export_columnar(bank_file=DEFAULT_BANK, output=None) -> Path:
+    with open(bank_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    output = Path(output) if output else Path(bank_file).with_suffix('.qbc')
+    write_bytes(output, encode_columnar(data))
+    return output
+
+class ColumnarBank:
+    """Read-only view of a .qbc file; sections are memoryviews over one mmap, nothing is parsed up front"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        magic, version, section_count, self.record_count = HEADER.unpack_from(self._view, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} columnar bank")
+        self.sections: Dict[str, memoryview] = {}
+        for i in range(section_count):
+            name, offset, length = SECTION.unpack_from(self._view, HEADER.size + i * SECTION.size)
+            self.sections[name.decode('ascii')] = self._view[offset:offset + length]
+
+        self._strings = self.sections['STRS']
+        self._offsets = self.sections['SOFF'].cast('I')
+        self._options = self.sections['OPTS'].cast('I')
+        self._answers = self.sections['ANSW'].cast('I')
+        self._number_index = self.sections['NIDX'].cast('i')
+        self.topics = [self.text(i) for i in self.sections['TOPC'].cast('I')]
+        self.difficulties = [self.text(i) for i in self.sections['DIFF'].cast('I')]
+
+    def close(self):
+        # Views must be released before the mmap can close
+        for name in ('_offsets', '_options', '_answers', '_number_index', '_strings'):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        for view in self.__dict__.pop('sections', {}).values():
+            view.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    # --- strings ---------------------------------------------------------
+
+    def raw_text(self, string_id: int) -> memoryview:
+        """UTF-8 bytes of a string, without copying"""
+        return self._strings[self._offsets[string_id]:self._offsets[string_id + 1]]
+
+    def text(self, string_id: int) -> str:
+        return str(self.raw_text(string_id), 'utf-8')
+
+    # --- lookups ---------------------------------------------------------
+
+    def meta(self) -> Any:
+        return json.loads(str(self.sections['META'], 'utf-8'))
+
+    def numbers(self) -> List[int]:
+        return sorted(set(self._number_index[0::2]))
+
+    def rows_for(self, number: int) -> List[int]:
+        """Row positions of every record with this number, in file order"""
+        numbers = self._number_index[0::2]
+        i = bisect_left(numbers, number)
+        rows = []
+        while i < len(numbers) and numbers[i] == number:
+            rows.append(self._number_index[2 * i + 1])
+            i += 1
+        return rows
+
+    def get(self, number: int) -> Optional[Dict[str, Any]]:
+        """First record with this number, decoding only that record"""
+        rows = self.rows_for(number)
+        return self.record(rows[0]) if rows else None
+
+    def get_all(self, number: int) -> List[Dict[str, Any]]:
+        return [self.record(row) for row in self.rows_for(number)]
+
+    def record(self, row: int) -> Dict[str, Any]:
+        (number, record_id, topic, difficulty, kind, present, question, explanation,
+         option_start, option_count, answer_start, answer_count, extra) = ROW.unpack_from(self.sections['RECS'], row * ROW.size)
+
+        values: Dict[str, Any] = {}
+        if present & HAS_ID:
+            values['id'] = record_id
+        if present & HAS_NUMBER:
+            values['number'] = number
+        if present & HAS_QUESTION:
+            values['question'] = self.text(question)
+        if present & HAS_OPTIONS:
+            values['options'] = [self.text(i) for i in self._options[option_start:option_start + option_count]]
+        if kind == ANSWER_INT:
+            values['correctAnswer'] = self._answers[answer_start]
+        elif kind == ANSWER_LIST:
+            values['correctAnswer'] = list(self._answers[answer_start:answer_start + answer_count])
+        if present & HAS_EXPLANATION:
+            values['explanation'] = self.text(explanation)
+        if present & HAS_TOPIC:
+            values['topic'] = self.topics[topic]
+        if present & HAS_DIFFICULTY:
+            values['difficulty'] = self.difficulties[difficulty]
+        if extra != NONE:
+            values.update(json.loads(self.text(extra)))
+        return values
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(self.record_count):
+            yield self.record(row)
+
+def verify(bank_file, output) -> List[str]:
+    """Differences between a bank and its columnar export (empty when they match)"""
+    with open(bank_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    questions = data.get('questions', []) if isinstance(data, dict) else data
+    problems = []
+    with ColumnarBank(output) as bank:
+        if len(bank) != len(questions):
+            problems.append(f"{len(bank)} records, expected {len(questions)}")
+        for row, (original, stored) in enumerate(zip(questions, bank)):
+            if original != stored:
+                problems.append(f"row {row} (number {original.get('number')}) differs")
+        if isinstance(data, dict) and bank.meta() != {k: v for k, v in data.items() if k != 'questions'}:
+            problems.append("top-level metadata differs")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar export of a question bank")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="write the columnar file")
+    export.add_argument("bank", nargs="?", default=str(DEFAULT_BANK))
+    export.add_argument("--output", help="output file (default: the bank with a .qbc suffix)")
+
+    show = commands.add_parser("show", help="print one record by number")
+    show.add_argument("number", type=int)
+    show.add_argument("--file", default=str(DEFAULT_BANK.with_suffix('.qbc')))
+
+    check = commands.add_parser("verify", help="export and check that every record round-trips")
+    check.add_argument("bank", nargs="?", default=str(DEFAULT_BANK))
+    check.add_argument("--output", help="output file (default: the bank with a .qbc suffix)")
+
+    args = parser.parse_args()
+
+    if args.command == "show":
+        with ColumnarBank(args.file) as bank:
+            records = bank.get_all(args.number)
+            if not records:
+                print(f"No question {args.number} in {args.file}")
+                sys.exit(1)
+            print(json.dumps(records if len(records) > 1 else records[0], indent=2, ensure_ascii=False))
+        return
+
+    output = export_columnar(args.bank, args.output)
+    json_size, qbc_size = Path(args.bank).stat().st_size, output.stat().st_size
+    print(f"Exported {args.bank} -> {output}")
+    print(f"Size: {json_size / 1024:.1f} KB JSON -> {qbc_size / 1024:.1f} KB columnar ({qbc_size / json_size:.0%})")
+
+    if args.command == "verify":
+        problems = verify(args.bank, output)
+        for problem in problems:
+            print(f"  ✗ {problem}")
+        print("✅ Every record round-trips" if not problems else f"❌ {len(problems)} problems")
+        if problems:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
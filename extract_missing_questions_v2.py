@@ -2,11 +2,34 @@
 """
 Enhanced script to extract missing questions from webtext.md with better parsing
 """
+import argparse
+import hashlib
 import json
+import os
 import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, Iterable, Union
+
+import instrumentation
+import merge_missing_questions
+from answer_scorer import rank_answers, rank_answers_many
+from bank_cache import load_bank
+from bank_writer import write_bank
+from instrumentation import stage
+from topic_classifier import TOPIC_ENGINES, get_topic_engine
+from webtext_parser import QuestionBlock, QuestionBlockIndex, NumberingTracker, build_question_index, iter_question_blocks, split_question_block
+
+# Topic classifier used by determine_topic: "keyword" (default) or "tfidf" (needs NumPy)
+TOPIC_ENGINE = "keyword"
+
+# Block hashes from the last incremental run (see run_incremental)
+DEFAULT_MANIFEST = Path(__file__).resolve().parent / ".extraction_manifest.json"
+MANIFEST_VERSION = 1
+# Re-extracted blocks of questions already in the bank, left for manual review (see run_incremental)
+DEFAULT_REVIEW = Path(__file__).resolve().parent / "incremental_review.json"
 
 def load_existing_questions(json_file: str) -> Tuple[Dict[str, Any], List[int]]:
     """Load existing questions and return data structure and existing question numbers"""
@@ -20,97 +43,92 @@ def load_existing_questions(json_file: str) -> Tuple[Dict[str, Any], List[int]]:
     
     return data, existing_numbers
 
-def extract_single_question(webtext_content: str, question_number: int) -> Optional[Dict[str, Any]]:
+def extract_single_question(webtext_content: Union[str, QuestionBlockIndex], question_number: int) -> Optional[Dict[str, Any]]:
     """Extract a single question from webtext with better parsing"""
     
-    # Find the question start and end
-    question_start_pattern = rf'^{question_number}\.\s+(.*?)$'
-    next_question_pattern = rf'^{question_number + 1}\.\s+'
+    index = webtext_content if isinstance(webtext_content, QuestionBlockIndex) else build_question_index(webtext_content)
+    question_lines = index.block_lines(question_number)
     
-    lines = webtext_content.split('\n')
-    start_idx = -1
-    end_idx = len(lines)
-    
-    # Find the start of this question
-    for i, line in enumerate(lines):
-        if re.match(question_start_pattern, line):
-            start_idx = i
-            break
-    
-    if start_idx == -1:
+    if not question_lines:
         return None
     
-    # Find the end (start of next question)
-    for i in range(start_idx + 1, len(lines)):
-        if re.match(r'^\d+\.\s+', lines[i]):
-            end_idx = i
-            break
+    return assign_answers([parse_question_block(question_lines, question_number)])[0]
+
+def extract_questions(webtext_content: Union[str, QuestionBlockIndex], numbers: Iterable[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+    """Extract a batch of questions, scanning the webtext only once"""
     
-    # Extract the question content
-    question_lines = lines[start_idx:end_idx]
+    index = webtext_content if isinstance(webtext_content, QuestionBlockIndex) else build_question_index(webtext_content)
     
-    if not question_lines:
-        return None
+    parsed = {
+        number: split_question_block(lines) if lines else None
+        for number, lines in index.blocks_for(numbers).items()
+    }
+    found = [(number, fields) for number, fields in parsed.items() if fields]
+    records = build_question_records([(number, *fields) for number, fields in found])
+    results: Dict[int, Optional[Dict[str, Any]]] = dict.fromkeys(parsed)
+    results.update((number, record) for (number, _), record in zip(found, records))
+    assign_answers(records)
     
-    # Parse the question
-    question_text = re.sub(question_start_pattern, r'\1', question_lines[0]).strip()
+    return results
+
+def parse_question_block(question_lines: List[str], question_number: int) -> Dict[str, Any]:
+    """Parse the lines of one question block (first line is the numbered stem)"""
     
-    # Clean the question text
-    question_text = re.sub(r'\s+', ' ', question_text).strip()
+    question_text, options, explanation = split_question_block(question_lines)
     
-    # Find options and explanation
-    options = []
-    explanation = ""
-    correct_answers = []
+    return build_question_records([(question_number, question_text, options, explanation)])[0]
+
+def extract_questions_from_file(webtext_file: str, numbers: Iterable[int], numbering: Optional[NumberingTracker] = None) -> Dict[int, Optional[Dict[str, Any]]]:
+    """Extract a batch of questions by streaming webtext_file one block at a time"""
     
-    i = 1
-    while i < len(question_lines):
-        line = question_lines[i].strip()
-        
-        if not line:
-            i += 1
-            continue
-        
-        # Check for explanation
-        if line.lower().startswith('explanation:'):
-            explanation = line[12:].strip()
-            # Continue reading explanation lines
-            i += 1
-            while i < len(question_lines):
-                next_line = question_lines[i].strip()
-                if not next_line or next_line.lower().startswith('other case'):
-                    break
-                explanation += " " + next_line
-                i += 1
-            break
-        
-        # Skip certain lines
-        if (line.lower().startswith('other case') or 
-            line.lower().startswith('case') or
-            line.startswith('(') and line.endswith(')') or
-            len(line) < 3):
-            i += 1
-            continue
-        
-        # This could be an option
-        # Simple heuristic: lines that are not too long and don't end with colon
-        if len(line) < 150 and not line.endswith(':') and not line.lower().startswith('explanation'):
-            options.append(line)
-        
-        i += 1
+    return extract_questions_from_blocks(iter_question_blocks(webtext_file), numbers, numbering)
+
+def extract_questions_from_blocks(blocks: Iterable[QuestionBlock], numbers: Optional[Iterable[int]], numbering: Optional[NumberingTracker] = None,
+                                  skip: Iterable[int] = ()) -> Dict[int, Optional[Dict[str, Any]]]:
+    """Extract a batch of questions from already-parsed blocks (first occurrence of each number wins)
+    
+    With numbers None, every number the blocks hold except skip is extracted as it comes.
+    """
+    
+    results: Dict[int, Optional[Dict[str, Any]]] = dict.fromkeys(numbers) if numbers is not None else {}
+    numbering = numbering if numbering is not None else NumberingTracker()
+    skip = set(skip)
+    wanted: List[Tuple[int, str, List[str], str]] = []
+    
+    with stage("parse_blocks"):
+        for block in blocks:
+            first = numbering.add(block.number)
+            if first and (block.number in results if numbers is not None else block.number not in skip):
+                # Only the parsed fields are kept; the block's raw lines are dropped here
+                wanted.append((block.number, block.stem, block.options, block.explanation))
+    with stage("classify_topics"):
+        for record in build_question_records(wanted):
+            results[record['number']] = record
+    with stage("rank_answers"):
+        assign_answers([q for q in results.values() if q])
+    
+    return results
+
+def build_question_records(fields: List[Tuple[int, str, List[str], str]]) -> List[Dict[str, Any]]:
+    """Turn a batch of parsed (number, stem, options, explanation) into records, classified in one call"""
     
-    # Determine topic
-    topic = determine_topic(question_text + " " + " ".join(options))
+    topics = determine_topics([topic_text(question_text, options, explanation)
+                               for _, question_text, options, explanation in fields])
+    return [build_question_record(*f, topic=topic) for f, topic in zip(fields, topics)]
+
+def build_question_record(question_number: int, question_text: str, options: List[str], explanation: str,
+                          topic: Optional[str] = None) -> Dict[str, Any]:
+    """Turn parsed block fields into a question record; topic is classified here unless given"""
     
-    # Try to identify correct answers from explanation or common patterns
-    correct_answer = identify_correct_answer(options, explanation, question_text)
+    if topic is None:
+        topic = determine_topic(topic_text(question_text, options, explanation))
     
     result = {
         "id": 1000 + question_number,  # Temporary ID
         "number": question_number,
         "question": question_text,
         "options": options[:4] if len(options) >= 4 else options,
-        "correct_answer": correct_answer,
+        "correct_answer": "",  # Filled in by assign_answers
         "explanation": explanation.strip(),
         "topic": topic,
         "difficulty": "medium"
@@ -118,84 +136,265 @@ def extract_single_question(webtext_content: str, question_number: int) -> Optio
     
     return result
 
+def topic_text(question_text: str, options: List[str], explanation: str) -> str:
+    """The text the topic engine classifies a question by"""
+    text = question_text + " " + " ".join(options)
+    if getattr(get_topic_engine(TOPIC_ENGINE), 'uses_explanation', False):
+        text += " " + explanation
+    return text
+
 def determine_topic(content: str) -> str:
     """Determine the topic category based on content analysis"""
-    content_lower = content.lower()
-    
-    topic_keywords = {
-        "Hardware": ["motherboard", "cpu", "processor", "ram", "memory", "hard drive", "ssd", "hdd", "gpu", "graphics", "pci", "sata", "usb", "power supply", "cooling", "fan", "heat sink", "raid"],
-        "Hardware Safety": ["esd", "electrostatic", "grounded", "static", "safety", "shock", "electrical"],
-        "Networking": ["network", "router", "switch", "tcp", "ip", "ethernet", "wifi", "wireless", "lan", "wan", "man", "pan", "dns", "dhcp", "ping", "tracert", "subnet", "cable", "dsl"],
-        "Operating Systems": ["windows", "linux", "macos", "boot", "bios", "uefi", "registry", "file system", "ntfs", "fat32", "kernel", "driver", "service", "acpi", "power state", "bootmgr", "winload"],
-        "Security": ["password", "encryption", "firewall", "antivirus", "malware", "authentication", "authorization", "certificate", "vpn", "security", "attack"],
-        "Troubleshooting": ["troubleshoot", "problem", "issue", "error", "debug", "diagnose", "fix", "repair", "symptom", "solution", "stages"],
-        "Mobile Devices": ["mobile", "tablet", "smartphone", "ios", "android", "cellular", "bluetooth", "wifi calling", "app", "touch"],
-        "Printers": ["printer", "print", "toner", "ink", "paper", "laser", "inkjet", "scanner", "fax"],
-        "Cloud Computing": ["cloud", "saas", "paas", "iaas", "virtual", "remote", "online", "internet"],
-        "Command Line": ["command", "cmd", "terminal", "shell", "cli", "tracert", "ping", "ipconfig", "netstat"]
-    }
-    
-    # Count matches for each topic
-    topic_scores = {}
-    for topic, keywords in topic_keywords.items():
-        score = sum(1 for keyword in keywords if keyword in content_lower)
-        if score > 0:
-            topic_scores[topic] = score
-    
-    if topic_scores:
-        return max(topic_scores, key=topic_scores.get)
-    else:
-        return "General IT"
+    return get_topic_engine(TOPIC_ENGINE).classify(content)
 
-def identify_correct_answer(options: List[str], explanation: str, question: str) -> str:
-    """Try to identify the correct answer from explanation or question context"""
-    
-    if not options:
-        return ""
+def determine_topics(texts: List[str]) -> List[str]:
+    """determine_topic for a batch of texts in one classifier call"""
+    return get_topic_engine(TOPIC_ENGINE).classify_many(texts) if texts else []
+
+def identify_correct_answer(options: List[str], explanation: str) -> str:
+    """Try to identify the correct answer from the explanation"""
     
-    explanation_lower = explanation.lower()
-    question_lower = question.lower()
+    ranking = rank_answers(options, explanation)
     
-    # Look for explicit mentions in explanation
-    for option in options:
-        option_lower = option.lower()
-        # Check if the option is mentioned positively in the explanation
-        if option_lower in explanation_lower:
-            # Look for positive indicators
-            option_pos = explanation_lower.find(option_lower)
-            if option_pos != -1:
-                surrounding_text = explanation_lower[max(0, option_pos-50):option_pos+50]
-                if any(word in surrounding_text for word in ['is', 'are', 'provides', 'allows', 'correct', 'best', 'should', 'can']):
-                    return option
+    # Low-confidence cases are left empty for manual review rather than guessing options[0]
+    return "" if ranking.needs_review else ranking.best
+
+def assign_answers(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Rank the options of a batch of extracted records and fill in correct_answer and review flags"""
     
-    # For matching questions or special cases, return the first option for manual review
-    if 'match' in question_lower or 'place' in question_lower or 'select' in question_lower:
-        return options[0] if options else ""
+    for record, ranking in zip(records, rank_answers_many(records)):
+        record['correct_answer'] = "" if ranking.needs_review else ranking.best
+        record['answer_confidence'] = ranking.confidence
+        record['needs_review'] = ranking.needs_review
     
-    # Default to first option for manual review
-    return options[0] if options else ""
+    return records
 
-def main():
-    json_file = "/Users/michallatal/Desktop/it/it-quiz-app/src/data/questions.json"
-    webtext_file = "/Users/michallatal/Desktop/it/webtext.md"
-    output_file = "/Users/michallatal/Desktop/it/it-quiz-app/missing_questions_v2.json"
-    
-    # Missing questions from analysis
-    missing_numbers = [25, 34, 52, 57, 58, 59, 60, 61, 62, 89, 90, 91, 92, 93, 94, 207, 220, 221, 230, 231, 232, 243, 347, 348, 349, 350]
+def _init_batch_worker(topic_engine: str):
+    """Runs once per worker process: select the topic engine and build its classifier up front"""
+    global TOPIC_ENGINE
+    TOPIC_ENGINE = topic_engine
+    get_topic_engine(topic_engine)
+
+def extract_source(webtext_file: str, skip_numbers: Iterable[int] = ()) -> Dict[str, Any]:
+    """Extract every question in one source dump (except skip_numbers); failures are returned, not raised"""
+    
+    started = time.perf_counter()
+    try:
+        numbering = NumberingTracker()
+        # One pass over the dump: numbers are collected and wanted blocks extracted as they come
+        extracted = extract_questions_from_blocks(iter_question_blocks(webtext_file), None, numbering, skip=skip_numbers)
+        results = dict(sorted(extracted.items()))
+    except Exception as e:
+        return {"source": webtext_file, "error": f"{type(e).__name__}: {e}", "seconds": time.perf_counter() - started}
+    
+    return {
+        "source": webtext_file,
+        "extracted": [q for q in results.values() if q and q['question']],
+        "failed": [n for n, q in results.items() if not (q and q['question'])],
+        "duplicates": numbering.duplicates,
+        "out_of_order": len(numbering.out_of_order),
+        "seconds": time.perf_counter() - started,
+    }
+
+def extract_batch(webtext_files: List[str], workers: Optional[int] = None, skip_numbers: Iterable[int] = (),
+                  topic_engine: Optional[str] = None) -> Dict[str, Any]:
+    """Extract many source dumps in a process pool; results are ordered by source, then number"""
+    
+    files = sorted(str(f) for f in webtext_files)
+    skip = sorted(set(skip_numbers))
+    per_source: Dict[str, Dict[str, Any]] = {}
+    
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                             initargs=(topic_engine or TOPIC_ENGINE,)) as pool:
+        futures = {pool.submit(extract_source, f, skip): f for f in files}
+        for done, future in enumerate(as_completed(futures), 1):
+            source = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:  # the worker process itself died
+                result = {"source": source, "error": f"{type(e).__name__}: {e}", "seconds": 0.0}
+            per_source[source] = result
+            
+            name = Path(source).name
+            if 'error' in result:
+                print(f"  [{done}/{len(files)}] ✗ {name}: {result['error']}")
+            else:
+                print(f"  [{done}/{len(files)}] ✓ {name}: {len(result['extracted'])} questions, "
+                      f"{len(result['failed'])} failed ({result['seconds']:.2f}s)")
+    elapsed = time.perf_counter() - started
+    
+    extracted = []
+    sources = []
+    for source in files:
+        result = per_source[source]
+        name = Path(source).name
+        if 'error' in result:
+            sources.append({"source": name, "error": result['error']})
+            continue
+        records = sorted(result['extracted'], key=lambda q: q['number'])
+        extracted.extend({**q, "source": name} for q in records)
+        sources.append({"source": name, "extracted": len(records), "failed": result['failed'],
+                        "duplicates": result['duplicates'], "out_of_order": result['out_of_order'],
+                        "seconds": round(result['seconds'], 3)})
+    
+    return {
+        "extracted_questions": extracted,
+        "sources": sources,
+        "failed_sources": [s['source'] for s in sources if 'error' in s],
+        "needs_review": [{"source": q['source'], "number": q['number']} for q in extracted if q['needs_review']],
+        "extraction_info": {
+            "total_extracted": len(extracted),
+            "total_sources": len(files),
+            "skipped_numbers": skip,
+            "topic_engine": topic_engine or TOPIC_ENGINE,
+            "seconds": round(elapsed, 3),
+        }
+    }
+
+def run_batch(source_dir: str, pattern: str, output_file: str, workers: Optional[int], skip_bank: Optional[str]):
+    files = sorted(f for f in Path(source_dir).glob(pattern) if f.is_file())
+    if not files:
+        print(f"No files matching {pattern} in {source_dir}")
+        return False
+    
+    skip_numbers: List[int] = []
+    if skip_bank:
+        _, existing = load_existing_questions(skip_bank)
+        skip_numbers = sorted(existing)
+    
+    print(f"Extracting {len(files)} source dumps with {workers or os.cpu_count()} workers...")
+    batch = extract_batch([str(f) for f in files], workers, skip_numbers)
+    write_bank(output_file, batch, pretty=True)
+    
+    info = batch['extraction_info']
+    print(f"\nBatch Summary:")
+    print(f"Sources: {info['total_sources']} ({len(batch['failed_sources'])} failed)")
+    print(f"Questions extracted: {info['total_extracted']} in {info['seconds']:.2f}s")
+    print(f"Answers needing manual review: {len(batch['needs_review'])}")
+    if batch['failed_sources']:
+        print(f"Failed sources: {batch['failed_sources']}")
+    print(f"\nResults saved to: {output_file}")
+    return not batch['failed_sources']
+
+def block_hashes(index: QuestionBlockIndex) -> Dict[int, str]:
+    """SHA-1 of the source lines of each question's block (the first block for repeated numbers)"""
     
-    print(f"Extracting {len(missing_numbers)} missing questions...")
+    return {number: hashlib.sha1("\n".join(index.lines[entry[1]:entry[2]]).encode('utf-8')).hexdigest()
+            for number, entry in index.blocks.items()}
+
+def load_manifest(manifest_file) -> Optional[Dict[str, Any]]:
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == MANIFEST_VERSION else None
+
+def plan_incremental(hashes: Dict[int, str], manifest: Optional[Dict[str, Any]], bank_numbers: Iterable[int]) -> Dict[str, List[int]]:
+    """Which blocks to re-extract: those whose hash changed since the manifest or that are new
+    
+    Without a manifest (first run) every block counts as unchanged and only numbers the bank lacks
+    are extracted; later runs do not retry those unless their block changes. Removed blocks are only
+    reported, never deleted from the bank. A topic engine change re-extracts nothing: records in the
+    bank keep their topics and later extractions use the new engine.
+    """
+    
+    in_bank = set(bank_numbers)
+    if manifest is None:
+        previous = dict(hashes)
+    else:
+        previous = {int(number): digest for number, digest in manifest['blocks'].items()}
     
-    with open(webtext_file, 'r', encoding='utf-8') as f:
-        webtext_content = f.read()
+    return {
+        "changed": sorted(n for n, digest in hashes.items() if n in previous and previous[n] != digest),
+        "added": sorted(n for n in hashes if n not in previous),
+        "removed": sorted(n for n in previous if n not in hashes),
+        "missing": sorted(n for n in hashes if n not in in_bank) if manifest is None else [],
+    }
+
+def write_review(review_file, records: List[Dict[str, Any]], source) -> List[Dict[str, Any]]:
+    """Add records to the review file, replacing earlier entries for the same numbers; returns all entries"""
+    
+    try:
+        with open(review_file, 'r', encoding='utf-8') as f:
+            previous = json.load(f).get('extracted_questions', [])
+    except (OSError, ValueError):
+        previous = []
+    by_number = {q['number']: q for q in previous}
+    by_number.update((q['number'], q) for q in records)
+    review = sorted(by_number.values(), key=lambda q: q['number'])
+    write_bank(review_file, {"source": str(source),
+                             "note": "Re-extracted blocks of questions already in the bank; apply changes by hand",
+                             "extracted_questions": review})
+    return review
+
+def run_incremental(webtext_file, bank_file, manifest_file=DEFAULT_MANIFEST, dry_run: bool = False,
+                    backup_store=None, review_file=DEFAULT_REVIEW) -> Dict[str, List[int]]:
+    """Re-extract only the blocks of webtext_file that changed since the last run
+    
+    Block hashes are kept in manifest_file. The first run only records them (plus extracts
+    numbers missing from the bank). Re-extracted questions the bank lacks are merged; those it
+    already has go to review_file, since an extracted record (first four options, a ranked
+    guess at the answer) is no substitute for a curated one. The bank's records are never
+    overwritten.
+    """
+    
+    with stage("index"):
+        index = build_question_index(Path(webtext_file).read_text(encoding='utf-8'))
+        hashes = block_hashes(index)
+    
+    manifest = load_manifest(manifest_file)
+    data = load_bank(bank_file).data
+    in_bank = {q['number'] for q in data['questions'] if 'number' in q}
+    plan = plan_incremental(hashes, manifest, in_bank)
+    
+    if manifest is None:
+        print(f"No block manifest at {manifest_file}; recording {len(hashes)} blocks as the baseline")
+    elif manifest.get('topic_engine') != TOPIC_ENGINE:
+        print(f"Topic engine changed ({manifest.get('topic_engine')} -> {TOPIC_ENGINE}); "
+              f"existing records keep their topics, new extractions use {TOPIC_ENGINE}")
+    for status in ("changed", "added", "removed", "missing"):
+        if plan[status]:
+            print(f"  {status.capitalize():<8}: {len(plan[status]):>4}  {plan[status][:20]}{' ...' if len(plan[status]) > 20 else ''}")
+    
+    wanted = sorted(plan['changed'] + plan['added'] + plan['missing'])
+    if not wanted:
+        print("No changed blocks; nothing to re-extract")
+    if dry_run:
+        return plan
+    
+    if wanted:
+        with stage("extract"):
+            results = extract_questions(index, wanted)
+        extracted = [q for q in results.values() if q and q['question']]
+        inserts = [q for q in extracted if q['number'] not in in_bank]
+        review = [q for q in extracted if q['number'] in in_bank]
+        print(f"Re-extracted {len(extracted)} of {len(wanted)} blocks: {len(inserts)} to merge, {len(review)} to review")
+        if review:
+            with stage("write_review"):
+                write_review(review_file, review, webtext_file)
+            print(f"Questions already in the bank written to {review_file}: {[q['number'] for q in review]}")
+        if inserts:
+            with stage("merge"):
+                merge_missing_questions.merge_questions(str(bank_file), backup_store=backup_store,
+                                                        new_questions=inserts, data=data)
+    
+    with stage("write_manifest"):
+        write_bank(manifest_file, {"version": MANIFEST_VERSION, "source": str(webtext_file), "topic_engine": TOPIC_ENGINE,
+                                   "blocks": {str(number): digest for number, digest in sorted(hashes.items())}},
+                   pretty=False)
+    return plan
+
+def report_extraction(results: Dict[int, Optional[Dict[str, Any]]], missing_numbers: List[int]) -> Dict[str, Any]:
+    """Print per-question and overall results of an extraction run; returns the output document"""
     
     extracted_questions = []
     failed_extractions = []
     
-    for question_number in sorted(missing_numbers):
+    for question_number, question_data in results.items():
         print(f"Extracting question {question_number}...")
         
-        question_data = extract_single_question(webtext_content, question_number)
-        
         if question_data and question_data['question']:
             extracted_questions.append(question_data)
             print(f"  ✓ {question_data['question'][:60]}...")
@@ -204,16 +403,21 @@ def main():
             failed_extractions.append(question_number)
             print(f"  ✗ Failed to extract question {question_number}")
     
+    needs_review = [q['number'] for q in extracted_questions if q['needs_review']]
+    
     print(f"\nExtraction Summary:")
     print(f"Successfully extracted: {len(extracted_questions)}")
     print(f"Failed: {len(failed_extractions)}")
     if failed_extractions:
         print(f"Failed questions: {failed_extractions}")
+    print(f"Answers needing manual review: {len(needs_review)}")
+    if needs_review:
+        print(f"Review questions: {needs_review}")
     
-    # Save results
     output_data = {
         "extracted_questions": extracted_questions,
         "failed_extractions": failed_extractions,
+        "needs_review": needs_review,
         "extraction_info": {
             "total_extracted": len(extracted_questions),
             "total_failed": len(failed_extractions),
@@ -223,18 +427,76 @@ def main():
         }
     }
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, indent=2, ensure_ascii=False)
-    
-    print(f"\nResults saved to: {output_file}")
-    
-    # Show samples
+    return output_data
+
+def print_extraction_samples(extracted_questions: List[Dict[str, Any]], limit: int = 5):
     print(f"\nSample extracted questions:")
-    for q in extracted_questions[:5]:
+    for q in extracted_questions[:limit]:
         print(f"\nQ{q['number']}: {q['question']}")
         print(f"Options ({len(q['options'])}): {q['options']}")
-        print(f"Correct: {q['correct_answer']}")
+        print(f"Correct: {q['correct_answer'] or '(needs review)'} (confidence {q['answer_confidence']:.2f})")
         print(f"Topic: {q['topic']}")
 
+def extract_missing():
+    """Extract the known missing questions from the default webtext.md"""
+    
+    json_file = "/Users/michallatal/Desktop/it/it-quiz-app/src/data/questions.json"
+    webtext_file = "/Users/michallatal/Desktop/it/webtext.md"
+    output_file = "/Users/michallatal/Desktop/it/it-quiz-app/missing_questions_v2.json"
+    
+    # Missing questions from analysis
+    missing_numbers = [25, 34, 52, 57, 58, 59, 60, 61, 62, 89, 90, 91, 92, 93, 94, 207, 220, 221, 230, 231, 232, 243, 347, 348, 349, 350]
+    
+    print(f"Extracting {len(missing_numbers)} missing questions...")
+    
+    numbering = NumberingTracker()
+    with stage("extract"):
+        results = extract_questions_from_file(webtext_file, sorted(missing_numbers), numbering)
+    if numbering.duplicates or numbering.out_of_order:
+        numbering.report()
+    
+    output_data = report_extraction(results, missing_numbers)
+    
+    with stage("write_output"):
+        write_bank(output_file, output_data, pretty=True)
+    
+    print(f"\nResults saved to: {output_file}")
+    
+    print_extraction_samples(output_data['extracted_questions'])
+
+def main():
+    global TOPIC_ENGINE
+    
+    parser = argparse.ArgumentParser(description="Extract missing questions from webtext.md")
+    parser.add_argument("--topic-engine", choices=TOPIC_ENGINES, default=TOPIC_ENGINE,
+                        help="topic classifier to use (default: %(default)s)")
+    parser.add_argument("--batch", metavar="DIR", help="extract every source dump in DIR in parallel")
+    parser.add_argument("--pattern", default="*.md", help="source dump file pattern for --batch (default: %(default)s)")
+    parser.add_argument("--workers", type=int, help="worker processes for --batch (default: one per CPU)")
+    parser.add_argument("--skip-existing", metavar="BANK", help="with --batch, skip numbers already in this bank")
+    parser.add_argument("--output", default="batch_extraction.json", help="output file for --batch (default: %(default)s)")
+    parser.add_argument("--incremental", metavar="BANK",
+                        help="re-extract only the blocks changed since the last run; merge new questions into BANK")
+    parser.add_argument("--webtext", default="/Users/michallatal/Desktop/it/webtext.md", help="source dump for --incremental")
+    parser.add_argument("--manifest", default=str(DEFAULT_MANIFEST), help="block hash manifest for --incremental (default: %(default)s)")
+    parser.add_argument("--review", default=str(DEFAULT_REVIEW),
+                        help="with --incremental, where re-extracted questions already in BANK go (default: %(default)s)")
+    parser.add_argument("--dry-run", action="store_true", help="with --incremental, only show which blocks changed")
+    instrumentation.add_profile_arguments(parser)
+    args = parser.parse_args()
+    TOPIC_ENGINE = args.topic_engine
+    
+    with instrumentation.profiled(args, "extract_missing_questions_v2"):
+        if args.batch:
+            # Only the parent process is traced; worker time shows up as the batch stage's wall time
+            with stage("batch"):
+                ok = run_batch(args.batch, args.pattern, args.output, args.workers, args.skip_existing)
+        elif args.incremental:
+            run_incremental(args.webtext, args.incremental, args.manifest, args.dry_run, review_file=args.review)
+        else:
+            extract_missing()
+    if args.batch and not ok:
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
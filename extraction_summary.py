@@ -2,94 +2,90 @@
 """
 Generate a summary of the question extraction process
 """
-import json
+import argparse
+from pathlib import Path
 
-def generate_summary():
-    """Generate a comprehensive summary of the extraction process"""
+import instrumentation
+import backup_store
+from bank_stats import load_stats
+from instrumentation import stage
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_BANK = ROOT / "src" / "data" / "questions.json"
+
+def generate_summary(json_file="/Users/michallatal/Desktop/it/it-quiz-app/src/data/questions.json", data=None):
+    """Generate a comprehensive summary of the extraction process
     
-    json_file = "/Users/michallatal/Desktop/it/it-quiz-app/src/data/questions.json"
+    Everything shown comes from the bank's stats sidecar (bank_stats.py), which merges and
+    patches keep current; the bank itself is only read if the sidecar is stale.
+    """
     
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    with stage("load_stats"):
+        stats = load_stats(json_file, data)
+    numbering = stats['numbering']
+    total = stats['total_questions']
     
     print("=" * 60)
     print("IT QUIZ APP - QUESTION EXTRACTION SUMMARY")
     print("=" * 60)
     
     print(f"\n📊 FINAL STATISTICS:")
-    print(f"Total Questions: {data['exam_info']['total_questions']}")
-    print(f"Last Updated: {data['exam_info']['last_updated']}")
+    print(f"Total Questions: {total}")
+    print(f"Last Updated: {stats['last_updated']}")
     
     # Question numbering analysis
-    question_numbers = [q.get('number', 0) for q in data['questions'] if 'number' in q]
-    question_numbers.sort()
-    
     print(f"\n📋 QUESTION NUMBERING:")
-    print(f"Lowest Number: {min(question_numbers)}")
-    print(f"Highest Number: {max(question_numbers)}")
-    print(f"Expected Range: 1-352")
+    print(f"Lowest Number: {numbering['lowest']}")
+    print(f"Highest Number: {numbering['highest']}")
+    if numbering['highest'] is not None:
+        first = numbering['highest'] - numbering['expected'] + 1
+        print(f"Expected Range: {first}-{numbering['highest']} ({numbering['expected']} questions)")
     
     # Check for any remaining gaps
-    full_range = set(range(1, 353))  # 1 to 352
-    existing = set(question_numbers)
-    missing = full_range - existing
-    
+    missing = numbering['missing']
     if missing:
-        print(f"Still Missing: {sorted(missing)} (Note: Question 131 has no answer in source)")
+        note = " (Note: Question 131 has no answer in source)" if 131 in missing else ""
+        print(f"Still Missing: {missing}{note}")
     else:
         print("✅ All questions accounted for!")
+    if numbering['duplicates']:
+        print(f"Duplicate Numbers: {', '.join(numbering['duplicates'])}")
     
     # Topic distribution
-    topics = {}
-    for q in data['questions']:
-        topic = q.get('topic', 'Unknown')
-        topics[topic] = topics.get(topic, 0) + 1
-    
     print(f"\n📂 TOPIC DISTRIBUTION:")
-    for topic, count in sorted(topics.items(), key=lambda x: x[1], reverse=True):
-        percentage = (count / len(data['questions'])) * 100
+    for topic, count in stats['topics'].items():
+        percentage = (count / total) * 100 if total else 0
         print(f"  {topic:<20}: {count:>3} questions ({percentage:>5.1f}%)")
     
     # Question types analysis
-    single_choice = 0
-    multiple_choice = 0
-    matching = 0
-    
-    for q in data['questions']:
-        correct_answer = q.get('correct_answer', '')
-        if isinstance(correct_answer, list):
-            if len(correct_answer) > 1:
-                multiple_choice += 1
-            else:
-                single_choice += 1
-        elif 'matching' in correct_answer.lower() or 'match' in q.get('question', '').lower():
-            matching += 1
-        else:
-            single_choice += 1
-    
+    types = stats['question_types']
     print(f"\n📝 QUESTION TYPES:")
-    print(f"  Single Choice: {single_choice}")
-    print(f"  Multiple Choice: {multiple_choice}")
-    print(f"  Matching/Ordering: {matching}")
+    print(f"  Single Choice: {types['single']}")
+    print(f"  Multiple Choice: {types['multiple']}")
+    print(f"  Matching/Ordering: {types['matching']}")
     
     print(f"\n✅ EXTRACTION PROCESS COMPLETED SUCCESSFULLY!")
-    print(f"\nExtracted 26 missing questions from webtext.md:")
     
-    # List the questions that were added
-    extracted_questions = [25, 34, 52, 57, 58, 59, 60, 61, 62, 89, 90, 91, 92, 93, 94, 207, 220, 221, 230, 231, 232, 243, 347, 348, 349, 350]
-    
-    for i, qnum in enumerate(extracted_questions, 1):
-        # Find the question in the data
-        question_data = next((q for q in data['questions'] if q.get('number') == qnum), None)
-        if question_data:
-            print(f"  {i:>2}. Q{qnum}: {question_data['question'][:50]}... ({question_data['topic']})")
+    # The questions added by the last merge that inserted any
+    last_merge = stats.get('last_merge')
+    if last_merge and last_merge['inserted']:
+        print(f"\nExtracted {len(last_merge['inserted'])} missing questions from webtext.md"
+              + (f" (merged {last_merge['date']}):" if last_merge.get('date') else ":"))
+        for i, question in enumerate(last_merge['inserted'], 1):
+            print(f"  {i:>2}. Q{question['number']}: {question['preview']}... ({question['topic']})")
     
     print(f"\n📁 FILES UPDATED:")
     print(f"  ✅ {json_file}")
-    print(f"  ✅ Backup created: /Users/michallatal/Desktop/it/it-quiz-app/src/data/questions_backup.json")
+    store = backup_store.default_store_for(json_file)
+    listing = ("python backup_store.py list" if store == backup_store.default_store_for(backup_store.DEFAULT_BANK)
+               else f"python backup_store.py --store {store} list")
+    print(f"  ✅ Backup snapshot stored in {store} ({listing})")
     
     print(f"\n⚠️  NOTE:")
-    print(f"  Question 131 is missing from source (webtext.md states 'no answer')")
+    if 131 in missing:
+        print(f"  Question 131 is missing from source (webtext.md states 'no answer')")
+    if stats['needs_review']:
+        print(f"  {stats['needs_review']} questions are flagged needs_review")
     print(f"  Some matching questions may need manual review for correct answers")
     
     print(f"\n🎯 NEXT STEPS:")
@@ -97,7 +93,16 @@ def generate_summary():
     print(f"  2. Test the updated question database in the app")
     print(f"  3. Verify question randomization works correctly")
     
-    return data
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a summary of the question bank after extraction")
+    parser.add_argument("bank", nargs="?", default=str(DEFAULT_BANK), help="question bank (default: %(default)s)")
+    instrumentation.add_profile_arguments(parser)
+    args = parser.parse_args()
+    
+    with instrumentation.profiled(args, "extraction_summary"):
+        generate_summary(args.bank)
 
 if __name__ == "__main__":
-    generate_summary()
\ No newline at end of file
+    main()
\ No newline at end of file
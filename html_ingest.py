@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Ingest saved ITExamAnswers HTML pages straight into question records, offline
+
+Pages in a directory are read concurrently with asyncio, a chunk at a time, and
+each chunk is fed to an html.parser-based extractor that never builds a DOM: it
+turns the markup into the same lines webtext.md holds (one per paragraph, list
+item, heading...) and cuts them into QuestionBlocks with the numbered-line rule
+the rest of the pipeline uses. Only the block being read is kept in memory.
+
+Options the page marks as correct (a class token such as "correct" or
+"answer-correct", but not "incorrect", or red text as ITExamAnswers uses) become
+the record's correctAnswer indices; unmarked blocks fall back to the
+explanation-based ranking used by the extractor. Answers that cannot be resolved
+stay as legacy correct_answer text with needs_review, as in answer_migration.py.
+
+With --merge, only numbers the bank lacks are inserted; questions it already
+holds go to a review file, as in incremental extraction.
+
+    python html_ingest.py pages/ [--output ingested_questions.json] [--webtext-out webtext.md] [--merge BANK]
+"""
+import argparse
+import asyncio
+import codecs
+import re
+import shutil
+import sys
+import tempfile
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import List, Dict, Any, Callable, NamedTuple, Optional, Tuple
+
+import extract_missing_questions_v2 as extractor
+import instrumentation
+import merge_missing_questions
+from answer_migration import migrate_record
+from bank_cache import load_bank
+from bank_writer import atomic_open, write_bank
+from instrumentation import count, stage
+from webtext_parser import QUESTION_START_RE, NumberingTracker, QuestionBlock, split_question_block
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_CONCURRENCY = 8
+DEFAULT_OUTPUT = "ingested_questions.json"
+# Ingested questions the bank already holds, left for manual review (see merge_ingested)
+DEFAULT_REVIEW = Path(__file__).resolve().parent / "html_ingest_review.json"
+
+# Tags that start a new line of text; everything else is inline
+BLOCK_TAGS = frozenset(['p', 'div', 'li', 'br', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'tr', 'td', 'th', 'ul', 'ol',
+                        'table', 'section', 'article', 'blockquote', 'pre', 'dt', 'dd', 'hr'])
+# Page chrome and non-text content, skipped with everything inside
+SKIP_TAGS = frozenset(['head', 'script', 'style', 'noscript', 'template', 'nav', 'header', 'footer', 'aside',
+                       'form', 'iframe', 'svg', 'select', 'button'])
+# Tags a repeated start tag closes implicitly (<li>a<li>b)
+SELF_CLOSING_SIBLINGS = frozenset(['li', 'p', 'dt', 'dd', 'tr', 'td', 'th'])
+VOID_TAGS = frozenset(['area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source',
+                       'track', 'wbr'])
+
+# A class token marks an option correct if "correct" is one of its -/_ separated words ("correct",
+# "answer-correct", "is_correct"), unless it is negated ("not-correct"); "incorrect" never matches
+CLASS_WORD_RE = re.compile(r'[-_]')
+CORRECT_STYLE_RE = re.compile(r'(?<![-\w])color\s*:\s*(#f00\b|#ff0000|red\b|rgb\(\s*255\s*,\s*0\s*,\s*0\s*\))', re.IGNORECASE)
+
+class IngestedBlock(NamedTuple):
+    """A question block from an HTML page, with the option lines the markup marks as correct"""
+    block: QuestionBlock
+    correct: List[str]
+
+def correct_class(value: str) -> bool:
+    for token in value.lower().split():
+        words = CLASS_WORD_RE.split(token)
+        if 'correct' in words and 'not' not in words:
+            return True
+    return False
+
+def marks_correct(attrs: List[Tuple[str, Optional[str]]]) -> bool:
+    for name, value in attrs:
+        if value and ((name == 'class' and correct_class(value))
+                      or (name == 'style' and CORRECT_STYLE_RE.search(value))):
+            return True
+    return False
+
+class BlockAssembler:
+    """Cuts a stream of text lines into question blocks; offsets are bytes of the equivalent webtext"""
+
+    def __init__(self):
+        self.number: Optional[int] = None
+        self.lines: List[str] = []
+        self.correct: List[str] = []
+        self.start_byte = 0
+        self.offset = 0
+
+    def _finish(self) -> Optional[IngestedBlock]:
+        if self.number is None:
+            return None
+        block = QuestionBlock(self.number, *split_question_block(self.lines), self.lines, self.start_byte,
+                              max(self.offset - 1, self.start_byte))
+        return IngestedBlock(block, self.correct)
+
+    def add(self, line: str, correct: bool = False) -> Optional[IngestedBlock]:
+        """Add a line; returns the previous block when this line starts a new one"""
+        done = None
+        match = QUESTION_START_RE.match(line)
+        if match:
+            done = self._finish()
+            self.number, self.lines, self.correct, self.start_byte = int(match.group(1)), [], [], self.offset
+        if self.number is not None:
+            self.lines.append(line)
+            if correct and not match:
+                self.correct.append(line)
+        self.offset += len(line.encode('utf-8')) + 1
+        return done
+
+    def close(self) -> Optional[IngestedBlock]:
+        done = self._finish()
+        self.number = None
+        return done
+
+class QuestionPageParser(HTMLParser):
+    """Incremental HTML -> lines -> question blocks; call feed() per chunk, then close()
+
+    on_line, if given, receives every text line (e.g. to write a webtext.md copy).
+    Completed blocks collect in .ready; take them after each feed() to keep memory flat.
+    """
+
+    def __init__(self, on_line: Optional[Callable[[str], None]] = None):
+        super().__init__(convert_charrefs=True)
+        self.on_line = on_line
+        self.ready: List[IngestedBlock] = []
+        self._assembler = BlockAssembler()
+        self._stack: List[Tuple[str, bool]] = []  # open (tag, marks correct)
+        self._open: Dict[str, int] = {}            # tag -> how many are on the stack
+        self._skip_depth = 0
+        self._correct_depth = 0
+        self._text: List[str] = []
+        self._line_correct = False
+
+    def _flush(self):
+        line = " ".join("".join(self._text).split())
+        self._text = []
+        if line:
+            if self.on_line:
+                self.on_line(line)
+            done = self._assembler.add(line, self._line_correct)
+            if done:
+                self.ready.append(done)
+        self._line_correct = False
+
+    def _pop(self):
+        open_tag, correct = self._stack.pop()
+        self._open[open_tag] -= 1
+        if self._skip_depth:
+            self._skip_depth -= 1
+            return open_tag
+        self._correct_depth -= correct
+        if open_tag in BLOCK_TAGS:
+            self._flush()
+        return open_tag
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SELF_CLOSING_SIBLINGS and self._stack and self._stack[-1][0] == tag:
+            self._pop()
+        if tag in BLOCK_TAGS and not self._skip_depth:
+            self._flush()
+        if tag in VOID_TAGS:
+            return
+        self._open[tag] = self._open.get(tag, 0) + 1
+        if tag in SKIP_TAGS or self._skip_depth:
+            self._skip_depth += 1
+            self._stack.append((tag, False))
+            return
+        correct = marks_correct(attrs)
+        self._correct_depth += correct
+        self._stack.append((tag, correct))
+
+    def handle_endtag(self, tag):
+        # Pop back to the matching open tag; unclosed <li>/<p> in between are closed implicitly
+        if not self._open.get(tag):
+            return
+        while self._stack and self._pop() != tag:
+            pass
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        self._text.append(data)
+        if self._correct_depth and not data.isspace():
+            self._line_correct = True
+
+    def close(self):
+        super().close()
+        self._flush()
+        done = self._assembler.close()
+        if done:
+            self.ready.append(done)
+
+def build_ingested_records(batch: List[IngestedBlock]) -> List[Dict[str, Any]]:
+    """Question records for a batch of blocks, classified and ranked together; the marked options,
+    if any, are the answer (as correctAnswer indices)"""
+    records = extractor.build_question_records(
+        [(b.block.number, b.block.stem, b.block.options, b.block.explanation) for b in batch])
+    unmarked = []
+    for ingested, record in zip(batch, records):
+        marked = [option for option in record['options'] if option in ingested.correct]
+        if marked and len(marked) < sum(1 for option in ingested.block.options if option in ingested.correct):
+            # A marked option was cut by the extractor's option limit; the answer cannot be represented
+            record['answer_confidence'] = 0.0
+            record['needs_review'] = True
+        elif marked:
+            record['correct_answer'] = marked[0] if len(marked) == 1 else marked
+            record['answer_confidence'] = 1.0
+            record['needs_review'] = False
+        else:
+            unmarked.append(record)
+    extractor.assign_answers(unmarked)
+    return [migrate_record(record)[0] for record in records]
+
+def build_ingested_record(ingested: IngestedBlock) -> Dict[str, Any]:
+    return build_ingested_records([ingested])[0]
+
+async def ingest_page(page: Path, semaphore: asyncio.Semaphore, text_file: Optional[Path] = None) -> Dict[str, Any]:
+    """Stream one saved page through the parser; failures are returned, not raised
+
+    With text_file, the page's text lines are written there as they are produced.
+    """
+    async with semaphore:
+        started = time.perf_counter()
+        numbering = NumberingTracker()
+        records: List[Dict[str, Any]] = []
+        text_out = open(text_file, 'w', encoding='utf-8') if text_file else None
+        parser = QuestionPageParser((lambda line: text_out.write(line + "\n")) if text_out else None)
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        size = 0
+
+        def take_ready():
+            fresh = [ingested for ingested in parser.ready if numbering.add(ingested.block.number)]
+            records.extend(build_ingested_records(fresh))
+            parser.ready.clear()
+
+        try:
+            with open(page, 'rb') as f:
+                while True:
+                    chunk = await asyncio.to_thread(f.read, CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    parser.feed(decoder.decode(chunk))
+                    take_ready()
+            parser.feed(decoder.decode(b'', final=True))
+            parser.close()
+            take_ready()
+        except Exception as e:
+            return {"source": page.name, "error": f"{type(e).__name__}: {e}", "seconds": time.perf_counter() - started}
+        finally:
+            if text_out:
+                text_out.close()
+
+        count("bytes_read", size)
+        count("questions_scanned", len(numbering.numbers))
+        return {"source": page.name, "records": records, "duplicates": numbering.duplicates,
+                "marked": sum(1 for r in records if r['answer_confidence'] == 1.0 and not r['needs_review']),
+                "bytes": size, "seconds": time.perf_counter() - started}
+
+async def ingest_pages(pages: List[Path], concurrency: int = DEFAULT_CONCURRENCY,
+                       webtext_out: Optional[Path] = None) -> Dict[str, Any]:
+    """Ingest pages concurrently; records are ordered by page name, then source order, first number wins"""
+    semaphore = asyncio.Semaphore(concurrency)
+    pages = sorted(pages, key=lambda p: p.name)
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="html-ingest-") as tmp:
+        # Each page's text goes to its own part file; they are joined in page order afterwards
+        parts = [Path(tmp) / f"{i}.txt" for i in range(len(pages))] if webtext_out else [None] * len(pages)
+        results = await asyncio.gather(*(ingest_page(page, semaphore, part) for page, part in zip(pages, parts)))
+        if webtext_out:
+            with atomic_open(webtext_out, 'w') as out:
+                for part, result in zip(parts, results):
+                    # A page that failed part-way left a truncated part file
+                    if 'error' not in result and part.exists():
+                        with open(part, 'r', encoding='utf-8') as f:
+                            shutil.copyfileobj(f, out)
+                        out.write("\n")
+    elapsed = time.perf_counter() - started
+
+    seen = set()
+    extracted, sources = [], []
+    for result in results:
+        if 'error' in result:
+            sources.append({"source": result['source'], "error": result['error']})
+            continue
+        fresh = [r for r in result['records'] if r['number'] not in seen]
+        seen.update(r['number'] for r in fresh)
+        extracted.extend({**r, "source": result['source']} for r in fresh)
+        sources.append({"source": result['source'], "extracted": len(fresh), "marked_answers": result['marked'],
+                        "repeated_elsewhere": len(result['records']) - len(fresh), "duplicates": result['duplicates'],
+                        "bytes": result['bytes'], "seconds": round(result['seconds'], 3)})
+
+    return {
+        "extracted_questions": extracted,
+        "sources": sources,
+        "failed_sources": [s['source'] for s in sources if 'error' in s],
+        "needs_review": [{"source": q['source'], "number": q['number']} for q in extracted if q['needs_review']],
+        "extraction_info": {
+            "total_extracted": len(extracted),
+            "total_sources": len(pages),
+            "topic_engine": extractor.TOPIC_ENGINE,
+            "seconds": round(elapsed, 3),
+        }
+    }
+
+def merge_ingested(extracted: List[Dict[str, Any]], bank_file, source, review_file=DEFAULT_REVIEW,
+                   backup_store=None) -> Dict[str, List[int]]:
+    """Insert the ingested questions the bank lacks; those it already has go to review_file
+
+    An ingested record (first four options, maybe a ranked guess at the answer) is no substitute
+    for a curated one, so the bank's records are never overwritten.
+    """
+    data = load_bank(bank_file).data
+    in_bank = {q['number'] for q in data['questions'] if 'number' in q}
+    inserts = [{k: v for k, v in q.items() if k != 'source'} for q in extracted if q['number'] not in in_bank]
+    review = [q for q in extracted if q['number'] in in_bank]
+    if review:
+        with stage("write_review"):
+            extractor.write_review(review_file, review, source)
+        print(f"Questions already in the bank written to {review_file}: {[q['number'] for q in review]}")
+    if inserts:
+        with stage("merge"):
+            merge_missing_questions.merge_questions(str(bank_file), backup_store=backup_store,
+                                                    new_questions=inserts, data=data)
+    else:
+        print("No new questions to merge")
+    return {"inserted": [q['number'] for q in inserts], "review": [q['number'] for q in review]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract questions from saved ITExamAnswers HTML pages")
+    parser.add_argument("pages", help="directory of saved pages")
+    parser.add_argument("--pattern", default="*.htm*", help="page file pattern (default: %(default)s)")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="extraction results (default: %(default)s)")
+    parser.add_argument("--webtext-out", help="also write the pages as webtext.md-style text")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="pages read at once (default: %(default)s)")
+    parser.add_argument("--merge", metavar="BANK", help="insert the extracted questions BANK lacks")
+    parser.add_argument("--review", default=str(DEFAULT_REVIEW),
+                        help="where questions already in BANK are written for review (default: %(default)s)")
+    parser.add_argument("--topic-engine", choices=extractor.TOPIC_ENGINES, default=extractor.TOPIC_ENGINE)
+    instrumentation.add_profile_arguments(parser)
+    args = parser.parse_args()
+    extractor.TOPIC_ENGINE = args.topic_engine
+
+    pages = [p for p in Path(args.pages).glob(args.pattern) if p.is_file()]
+    if not pages:
+        print(f"No files matching {args.pattern} in {args.pages}")
+        sys.exit(1)
+
+    with instrumentation.profiled(args, "html_ingest"):
+        print(f"Ingesting {len(pages)} pages...")
+        with stage("ingest"):
+            result = asyncio.run(ingest_pages(pages, args.concurrency, Path(args.webtext_out) if args.webtext_out else None))
+        write_bank(args.output, result, pretty=True)
+
+        for source in result['sources']:
+            if 'error' in source:
+                print(f"  ✗ {source['source']}: {source['error']}")
+            else:
+                print(f"  ✓ {source['source']}: {source['extracted']} questions, {source['marked_answers']} with marked answers")
+        info = result['extraction_info']
+        print(f"Questions extracted: {info['total_extracted']} in {info['seconds']:.2f}s "
+              f"({len(result['needs_review'])} need answer review)")
+        print(f"Results saved to: {args.output}")
+        if args.webtext_out:
+            print(f"Webtext written to: {args.webtext_out}")
+
+        if args.merge:
+            merge_ingested(result['extracted_questions'], args.merge, args.pages, args.review)
+
+    if result['failed_sources']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
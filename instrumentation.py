@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Shared per-stage instrumentation for the pipeline scripts
+
+Scripts wrap their steps in stage("name") and bump counters with count("name", n).
+Both are no-ops until a script is run with --profile, so the calls can stay in
+place. When enabled, every stage records wall time, CPU time, how far it raised
+the process's peak RSS and the counters bumped while it was open (stages nest;
+figures are inclusive), one stage
+can additionally be run under cProfile (--profile-stage), and everything is
+written to a JSON trace.
+
+Counters used across the scripts: questions_scanned, regex_calls, bytes_read,
+bytes_written.
+"""
+import cProfile
+import json
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+PROFILE_TOP = 20
+
+def peak_rss_kb() -> Optional[int]:
+    """High-water mark of the whole process's RSS so far (ru_maxrss), not of any one stage"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.script = ""
+        self.profile_stage: Optional[str] = None
+        self.profile_dir = Path(".")
+        self.counters: Dict[str, int] = {}
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._stack: List[str] = []
+        self._started = 0.0
+        self._started_cpu = 0.0
+
+    def enable(self, script: str, profile_stage: Optional[str] = None, profile_dir=None):
+        self.enabled = True
+        self.script = script
+        self.profile_stage = profile_stage
+        self.profile_dir = Path(profile_dir) if profile_dir else Path(".")
+        self._started = time.perf_counter()
+        self._started_cpu = time.process_time()
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def stage(self, name: str):
+        if not self.enabled:
+            yield
+            return
+
+        self._stack.append(name)
+        path = "/".join(self._stack)
+        # Created on entry so the trace lists stages in the order they started
+        record = self.stages.setdefault(path, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                                               "peak_rss_growth_kb": None, "process_peak_rss_kb": None,
+                                               "counters": {}})
+        counters_before = dict(self.counters)
+        peak_before = peak_rss_kb()
+        profiler = cProfile.Profile() if self.profile_stage in (name, path) else None
+        wall, cpu = time.perf_counter(), time.process_time()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            self._stack.pop()
+
+            record["calls"] += 1
+            record["wall_seconds"] += wall
+            record["cpu_seconds"] += cpu
+            # ru_maxrss only ever rises, so a stage is charged with how far it pushed the mark up
+            peak_after = peak_rss_kb()
+            record["process_peak_rss_kb"] = peak_after
+            if peak_after is not None:
+                record["peak_rss_growth_kb"] = (record["peak_rss_growth_kb"] or 0) + peak_after - peak_before
+            for counter, value in self.counters.items():
+                delta = value - counters_before.get(counter, 0)
+                if delta:
+                    record["counters"][counter] = record["counters"].get(counter, 0) + delta
+            if profiler:
+                record["profile"] = self._save_profile(path, profiler)
+
+    def _save_profile(self, path: str, profiler: cProfile.Profile) -> Dict[str, Any]:
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        prof_file = self.profile_dir / f"{self.script}.{path.replace('/', '.')}.prof"
+        profiler.dump_stats(str(prof_file))
+        stats = pstats.Stats(profiler).stats
+        top = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:PROFILE_TOP]
+        return {
+            "file": str(prof_file),
+            "top": [{"function": f"{Path(filename).name}:{line}({function})", "calls": calls,
+                     "tottime": round(tottime, 6), "cumtime": round(cumtime, 6)}
+                    for (filename, line, function), (_, calls, tottime, cumtime, _) in top],
+        }
+
+    def trace(self) -> Dict[str, Any]:
+        return {
+            "script": self.script,
+            "argv": sys.argv,
+            "created": datetime.now().isoformat(timespec='seconds'),
+            "wall_seconds": round(time.perf_counter() - self._started, 6),
+            "cpu_seconds": round(time.process_time() - self._started_cpu, 6),
+            "process_peak_rss_kb": peak_rss_kb(),
+            "counters": self.counters,
+            "stages": [{"stage": path, **{k: round(v, 6) if isinstance(v, float) else v for k, v in record.items()}}
+                       for path, record in self.stages.items()],
+        }
+
+    def report(self, out=sys.stderr):
+        trace = self.trace()
+        print(f"\n⏱  {self.script}: {trace['wall_seconds']:.3f}s wall, {trace['cpu_seconds']:.3f}s CPU, "
+              f"process peak RSS {trace['process_peak_rss_kb'] or 0:,} KB", file=out)
+        for stage in trace['stages']:
+            depth = stage['stage'].count('/')
+            label = "  " * depth + stage['stage'].rsplit('/', 1)[-1]
+            calls = f" x{stage['calls']}" if stage['calls'] > 1 else ""
+            counters = ", ".join(f"{k}={v:,}" for k, v in stage['counters'].items())
+            growth = f"+{stage['peak_rss_growth_kb']:,} KB peak" if stage['peak_rss_growth_kb'] else ""
+            print(f"  {label + calls:<32} {stage['wall_seconds']:>8.3f}s  {stage['cpu_seconds']:>8.3f}s CPU  "
+                  f"{growth:>16}  {counters}", file=out)
+
+# Process-wide tracer shared by every module
+TRACER = Tracer()
+
+def stage(name: str):
+    return TRACER.stage(name)
+
+def count(name: str, n: int = 1):
+    TRACER.count(name, n)
+
+def add_profile_arguments(parser):
+    parser.add_argument("--profile", nargs="?", const="", metavar="TRACE",
+                        help="record per-stage timings and counters; write a JSON trace (default: <script>-trace.json)")
+    parser.add_argument("--profile-stage", metavar="STAGE", help="also run this stage under cProfile")
+
+@contextmanager
+def profiled(args, script: str):
+    """Enable the tracer if the script was run with --profile; write the trace when the block ends"""
+    if getattr(args, "profile", None) is None:
+        yield TRACER
+        return
+
+    trace_file = Path(args.profile or f"{script}-trace.json")
+    TRACER.enable(script, getattr(args, "profile_stage", None), trace_file.parent)
+    try:
+        yield TRACER
+    finally:
+        trace_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(trace_file, 'w', encoding='utf-8') as f:
+            json.dump(TRACER.trace(), f, indent=2)
+        TRACER.report()
+        print(f"Trace saved to: {trace_file}", file=sys.stderr)
@@ -2,9 +2,20 @@
 """
 Script to merge extracted missing questions into questions.json with manual corrections
 """
+import argparse
+import hashlib
 import json
+from datetime import date
 from pathlib import Path
 
+import instrumentation
+from answer_migration import LEGACY_FIELDS, has_valid_answer, migrate_questions, print_report
+from backup_store import snapshot_bank
+from bank_stats import merge_record, open_stats, write_stats
+from bank_writer import write_bank
+from instrumentation import count, stage
+from question_dedup import DEFAULT_THRESHOLD, match_new_questions
+
 def create_corrected_questions():
     """Create manually corrected versions of the extracted questions"""
     
@@ -273,54 +284,233 @@ def create_corrected_questions():
     
     return corrected_questions
 
-def merge_questions():
-    """Merge the corrected questions into the main questions.json file"""
+def drop_duplicate_questions(existing, new_questions, threshold=DEFAULT_THRESHOLD):
+    """Return new_questions without records that duplicate an existing question"""
     
-    json_file = "/Users/michallatal/Desktop/it/it-quiz-app/src/data/questions.json"
-    backup_file = "/Users/michallatal/Desktop/it/it-quiz-app/src/data/questions_backup.json"
+    if not new_questions:
+        return new_questions
     
-    # Load existing data
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # Only the new records are queried; the bank's signatures are reused from earlier merges
+    matches = match_new_questions(existing, new_questions, threshold)
+    
+    if not matches:
+        return new_questions
+    
+    print(f"Near-duplicates between existing and new questions:")
+    for i, j, similarity in matches:
+        print(f"  new #{new_questions[j].get('number')} ~ existing #{existing[i].get('number')} "
+              f"(id {existing[i].get('id')}): {similarity:.2f}  {str(new_questions[j].get('question', ''))[:60]}")
+    
+    duplicates = {j for i, j, similarity in matches if similarity >= 1.0}
+    if duplicates:
+        print(f"\nSkipping {len(duplicates)} new questions identical to existing ones: "
+              f"{sorted(new_questions[i].get('number') for i in duplicates)}")
     
-    # Create backup
-    with open(backup_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    return [q for i, q in enumerate(new_questions) if i not in duplicates]
+
+def content_hash(question):
+    """Stable key for a question independent of its id/number: hash of the normalized stem and options"""
+    
+    normalized = [" ".join(question.get('question', '').lower().split()),
+                  [" ".join(str(o).lower().split()) for o in question.get('options', [])]]
+    return hashlib.sha1(json.dumps(normalized, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def record_key(question, key="number"):
+    """Merge key of a question: its number (default) or its content hash"""
+    
+    return content_hash(question) if key == "content" else question.get(key)
+
+def upsert_questions(questions, new_questions, key="number", respect_pins=True, stats=None, pins=()):
+    """Upsert new_questions into questions in place, keyed on number or content hash
     
-    print(f"Backup created at: {backup_file}")
+    Existing records keep their id and position; new records get the next free id.
+    Records whose number is in pins (manual corrections) are left alone unless respect_pins is off.
+    A new record whose answer is unresolved (no valid correctAnswer) never replaces a record
+    that has one. An update leaves a single answer field: correctAnswer drops the legacy
+    fields, and a legacy answer drops the existing (invalid) correctAnswer.
+    stats (a bank_stats.BankStats) is updated for the inserted and updated records only.
+    Returns the inserted, updated, unchanged, pinned and unresolved records.
+    """
+    
+    count("questions_scanned", len(questions) + len(new_questions))
+    index = {}
+    duplicate_keys = set()
+    for pos, question in enumerate(questions):
+        k = record_key(question, key)
+        if k in index:
+            duplicate_keys.add(k)
+        else:
+            index[k] = pos
+    
+    next_id = max((q.get('id', 0) for q in questions), default=0) + 1
+    summary = {"inserted": [], "updated": [], "unchanged": [], "pinned": [], "unresolved": []}
+    
+    for new in new_questions:
+        k = record_key(new, key)
+        fields = {field: value for field, value in new.items() if field != 'id'}
+        pos = index.get(k)
+        
+        if pos is None:
+            record = {"id": next_id, **fields}
+            next_id += 1
+            index[k] = len(questions)
+            questions.append(record)
+            summary["inserted"].append(record)
+            if stats is not None:
+                stats.add(record)
+            continue
+        
+        if k in duplicate_keys:
+            print(f"  ! Key {k} appears more than once in the bank; updating the first record (id {questions[pos].get('id')})")
+        
+        existing = questions[pos]
+        if respect_pins and existing.get('number') in pins:
+            summary["pinned"].append(existing)
+            continue
+        if has_valid_answer(existing) and not has_valid_answer(new):
+            summary["unresolved"].append(existing)
+            continue
+        
+        if 'correctAnswer' in fields:
+            # needs_review was set for the unresolved legacy answer, as in answer_migration.migrate_record
+            dropped = [f for f in (*LEGACY_FIELDS, 'needs_review') if f in existing and f not in fields]
+        else:
+            dropped = ['correctAnswer'] if 'correctAnswer' in existing and any(f in fields for f in LEGACY_FIELDS) else []
+        
+        if not dropped and all(existing.get(field) == value for field, value in fields.items()):
+            summary["unchanged"].append(existing)
+        else:
+            before = dict(existing)
+            existing.update(fields)
+            for field in dropped:
+                del existing[field]
+            summary["updated"].append(existing)
+            if stats is not None:
+                stats.replace(before, existing)
+    
+    return summary
+
+def pins_path(bank_file) -> Path:
+    """Pin file of a bank; pins are kept out of the bank, whose records the app reads as they are"""
+    bank_file = Path(bank_file)
+    return bank_file.parent / "pins" / f"{bank_file.stem}.json"
+
+def load_pins(bank_file):
+    """Numbers of the bank's pinned records (manual corrections automated merges must not touch)"""
+    try:
+        with open(pins_path(bank_file), 'r', encoding='utf-8') as f:
+            return set(json.load(f).get('numbers', []))
+    except (OSError, ValueError):
+        return set()
+
+def save_pins(bank_file, pins):
+    path = pins_path(bank_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_bank(path, {"note": "Manually corrected question numbers; merges leave these records alone",
+                      "numbers": sorted(pins)})
+
+def print_merge_summary(summary):
+    for status in ("inserted", "updated", "unchanged", "pinned", "unresolved"):
+        records = summary[status]
+        if status in ("pinned", "unresolved") and not records:
+            continue
+        numbers = [q.get('number') for q in records]
+        print(f"  {status.capitalize():<10}: {len(records):>3}" + (f"  {numbers}" if records and status != "unchanged" else ""))
+
+def merge_questions(json_file="/Users/michallatal/Desktop/it/it-quiz-app/src/data/questions.json",
+                    backup_store=None, new_questions=None, key="number", pretty=True, data=None):
+    """Merge the corrected questions into the main questions.json file
+    
+    data is json_file already loaded; it is updated in place, so callers holding it see the merge.
+    Without new_questions the manual corrections are merged. They only fill numbers missing from the
+    bank: records already there have been curated since, so they are pinned as they are instead of
+    being overwritten. Inserted corrections are pinned too, so later automated merges (incremental
+    re-extraction) do not clobber them. Pins are kept in a file beside the bank (see pins_path).
+    """
+    
+    # Load existing data
+    if data is None:
+        with stage("load_bank"), open(json_file, 'rb') as f:
+            raw = f.read()
+            count("bytes_read", len(raw))
+            data = json.loads(raw)
     
     # Get corrected questions
-    new_questions = create_corrected_questions()
+    pins = load_pins(json_file)
+    pinned_now = []
+    if new_questions is None:
+        corrected = create_corrected_questions()
+        bank_numbers = {q.get('number') for q in data['questions']}
+        pinned_now = sorted({q['number'] for q in corrected} - pins)
+        pins.update(pinned_now)
+        new_questions = [q for q in corrected if q['number'] not in bank_numbers]
     
-    # Add new questions to the data
-    data['questions'].extend(new_questions)
+    # Legacy correct_answer text becomes correctAnswer indices before anything reaches the bank
+    with stage("migrate"):
+        new_questions = list(new_questions)
+        migration = migrate_questions(new_questions)
+    if migration.changed:
+        print_report(migration)
     
-    # Update exam info
-    data['exam_info']['total_questions'] = len(data['questions'])
-    data['exam_info']['last_updated'] = "2025-08-13"
+    # Dedup stage: records that would be inserted must not copy an existing question under another key
+    existing_keys = {record_key(q, key) for q in data['questions']}
+    updates = [q for q in new_questions if record_key(q, key) in existing_keys]
+    inserts = [q for q in new_questions if record_key(q, key) not in existing_keys]
+    with stage("dedup"):
+        new_questions = updates + drop_duplicate_questions(data['questions'], inserts)
+    
+    # The stats sidecar is updated for the touched records only, unless it no longer describes the bank
+    with stage("stats"):
+        stats = open_stats(json_file, data['questions'])
     
-    # Sort questions by number
-    data['questions'].sort(key=lambda x: x.get('number', x.get('id', 0)))
+    with stage("upsert"):
+        summary = upsert_questions(data['questions'], new_questions, key, stats=stats, pins=pins)
     
-    # Update IDs to be sequential
-    for i, question in enumerate(data['questions'], 1):
-        question['id'] = i
+    print(f"Merge summary (keyed on {key}):")
+    print_merge_summary(summary)
+    if pinned_now:
+        save_pins(json_file, pins)
+        print(f"  Pinned: {len(pinned_now)}  {pinned_now} (recorded in {pins_path(json_file)})")
     
-    # Save updated data
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    if not summary["inserted"] and not summary["updated"]:
+        print(f"No changes; {json_file} left untouched")
+        return data
+    
+    # Snapshot the file as it was before this merge; only records not already in the store are written
+    with stage("snapshot"):
+        snapshot = snapshot_bank(json_file, note="before merge", store_root=backup_store)
+    print(f"Backup snapshot: {snapshot['snapshot']} ({snapshot['objects_written']} new objects)")
+    
+    # Update exam info
+    data['exam_info']['total_questions'] = len(data['questions'])
+    data['exam_info']['last_updated'] = date.today().isoformat()
+    
+    # Save updated data: streamed to a temp file, fsynced and renamed into place
+    with stage("write_bank"):
+        write_bank(json_file, data, pretty=pretty)
+    with stage("write_stats"):
+        write_stats(json_file, stats, data['exam_info'],
+                    merge_record(summary["inserted"], data['exam_info']['last_updated']) if summary["inserted"] else None)
     
-    print(f"Successfully merged {len(new_questions)} questions")
     print(f"Total questions now: {data['exam_info']['total_questions']}")
     print(f"Questions file updated: {json_file}")
     
     return data
 
 def main():
+    parser = argparse.ArgumentParser(description="Merge corrected missing questions into questions.json")
+    parser.add_argument("--key", choices=("number", "content"), default="number",
+                        help="match records on question number or on a hash of stem and options (default: %(default)s)")
+    parser.add_argument("--compact", action="store_true",
+                        help="write minified JSON (for shipping) instead of indented JSON (for review)")
+    instrumentation.add_profile_arguments(parser)
+    args = parser.parse_args()
+    
     print("Merging corrected missing questions into questions.json...")
     
     try:
-        updated_data = merge_questions()
+        with instrumentation.profiled(args, "merge_missing_questions"):
+            updated_data = merge_questions(key=args.key, pretty=not args.compact)
         print("\n✅ Merge completed successfully!")
         
         # Show some statistics
@@ -330,8 +520,8 @@ def main():
             topics[topic] = topics.get(topic, 0) + 1
         
         print(f"\nQuestion distribution by topic:")
-        for topic, count in sorted(topics.items()):
-            print(f"  {topic}: {count}")
+        for topic, topic_count in sorted(topics.items()):
+            print(f"  {topic}: {topic_count}")
             
     except Exception as e:
         print(f"❌ Error during merge: {e}")
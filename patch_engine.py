@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Apply critical_fixes.json-style patch sets to a question bank in one transaction
+
+Targets are resolved through number/id indexes built once, so patches keep working
+after the bank is re-sorted. Each patch checks its old_value precondition; a patch
+whose new_value is already in place is reported as already applied, which makes
+re-running a patch set a no-op. If any patch fails, nothing is written.
+
+Supported targets: "number:64", "id:64", a "target_number"/"target_id" key on the
+patch, or the legacy positional "questions[63]" form, read as question number 64.
+"""
+import argparse
+import copy
+import json
+import re
+import sys
+from pathlib import Path
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
+
+from backup_store import snapshot_bank
+from bank_stats import open_stats, write_stats
+from bank_writer import write_bank
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_PATCH_FILE = ROOT / "critical_fixes.json"
+DEFAULT_BANK = ROOT / "src" / "data" / "questions.json"
+
+LEGACY_TARGET_RE = re.compile(r'^questions\[(\d+)\]$')
+KEYED_TARGET_RE = re.compile(r'^(number|id):(\d+)$')
+
+# Statuses that abort the transaction
+FAILED = {"conflict", "not_found", "ambiguous", "invalid"}
+
+class PatchError(Exception):
+    def __init__(self, status: str, message: str):
+        super().__init__(message)
+        self.status = status
+
+class PatchResult(NamedTuple):
+    patch_id: str
+    status: str
+    target: str
+    record_id: Any
+    number: Any
+    message: str
+
+def parse_target(patch: Dict[str, Any]) -> Tuple[str, int]:
+    """(index name, key) for a patch"""
+    for field in ('number', 'id'):
+        if f'target_{field}' in patch:
+            return field, int(patch[f'target_{field}'])
+    target = str(patch.get('target', ''))
+    match = KEYED_TARGET_RE.match(target)
+    if match:
+        return match.group(1), int(match.group(2))
+    match = LEGACY_TARGET_RE.match(target)
+    if match:
+        return 'number', int(match.group(1)) + 1
+    raise PatchError("invalid", f"Unrecognized target '{target}'")
+
+def _normalize(text: Any) -> str:
+    return " ".join(str(text).lower().split())
+
+def read_field(record: Dict[str, Any], field: str) -> Any:
+    """Field value as patches describe it; correct_answer reads through correctAnswer indices"""
+    if field == 'correct_answer' and 'correct_answer' not in record and 'correctAnswer' in record:
+        options = record.get('options', [])
+        answer = record['correctAnswer']
+        try:
+            if isinstance(answer, list):
+                return [options[i] for i in answer]
+            return options[answer]
+        except (IndexError, TypeError):
+            return None
+    return record.get(field)
+
+def write_field(record: Dict[str, Any], field: str, value: Any):
+    if field == 'correct_answer' and 'correct_answer' not in record and 'correctAnswer' in record:
+        lookup = {_normalize(option): i for i, option in enumerate(record.get('options', []))}
+        texts = value if isinstance(value, list) else [value]
+        indices = [lookup.get(_normalize(text)) for text in texts]
+        if None in indices:
+            missing = [t for t, i in zip(texts, indices) if i is None]
+            raise PatchError("conflict", f"Answer text not among options: {missing}")
+        record['correctAnswer'] = indices if isinstance(value, list) else indices[0]
+        return
+    record[field] = value
+
+def _same(a: Any, b: Any) -> bool:
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_normalize(x) == _normalize(y) for x, y in zip(a, b))
+    if a is None or b is None:
+        return a is b
+    return _normalize(a) == _normalize(b)
+
+class PatchEngine:
+    """Number/id indexes over a bank, built once and shared by every patch
+
+    stats (a bank_stats.BankStats), if given, is updated for the patched records when the set commits.
+    """
+
+    def __init__(self, questions: List[Dict[str, Any]], stats=None):
+        self.questions = questions
+        self.stats = stats
+        self.indexes: Dict[str, Dict[int, List[Dict[str, Any]]]] = {'number': {}, 'id': {}}
+        for record in questions:
+            for field, index in self.indexes.items():
+                if field in record:
+                    index.setdefault(record[field], []).append(record)
+
+    def resolve(self, patch: Dict[str, Any]) -> Dict[str, Any]:
+        field, key = parse_target(patch)
+        candidates = self.indexes[field].get(key, [])
+        if not candidates:
+            raise PatchError("not_found", f"No question with {field} {key}")
+        if len(candidates) == 1:
+            return candidates[0]
+        # Duplicate numbers: the precondition decides which record the patch was written against
+        expected = [patch.get(k) for k in ('old_value', 'current_value', 'new_value') if k in patch]
+        matching = [r for r in candidates if any(_same(read_field(r, patch.get('field', '')), v) for v in expected)]
+        if len(matching) == 1:
+            return matching[0]
+        raise PatchError("ambiguous", f"{len(candidates)} questions have {field} {key}")
+
+    def apply_one(self, patch: Dict[str, Any], touched: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]]) -> Tuple[str, Dict[str, Any], str]:
+        operation = patch.get('operation')
+        field = patch.get('field')
+        if not field:
+            raise PatchError("invalid", "Patch has no field")
+        record = self.resolve(patch)
+        current = read_field(record, field)
+
+        if operation == 'verify_correct':
+            expected = patch.get('current_value')
+            if _same(current, expected):
+                return "verified", record, "Current value confirmed"
+            raise PatchError("conflict", f"Expected {expected!r}, found {current!r}")
+
+        if operation != 'replace':
+            raise PatchError("invalid", f"Unsupported operation '{operation}'")
+
+        new_value = patch.get('new_value')
+        if _same(current, new_value):
+            return "already_applied", record, "New value already in place"
+        if 'old_value' in patch and not _same(current, patch['old_value']):
+            raise PatchError("conflict", f"Expected {patch['old_value']!r}, found {current!r}")
+
+        # Keep the pre-transaction state of every record we modify so a failed run can be undone
+        touched.setdefault(id(record), (record, copy.deepcopy(record)))
+        write_field(record, field, new_value)
+        return "applied", record, f"{current!r} -> {new_value!r}"
+
+    def apply(self, patches: List[Dict[str, Any]]) -> Tuple[bool, List[PatchResult]]:
+        """Apply every patch in order; on any failure the bank is rolled back and False is returned"""
+        touched: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        results = []
+        for patch in patches:
+            target = str(patch.get('target', patch.get('target_number', patch.get('target_id', ''))))
+            try:
+                status, record, message = self.apply_one(patch, touched)
+                results.append(PatchResult(patch.get('id', ''), status, target, record.get('id'), record.get('number'), message))
+            except PatchError as e:
+                results.append(PatchResult(patch.get('id', ''), e.status, target, None, None, str(e)))
+
+        ok = not any(r.status in FAILED for r in results)
+        if not ok:
+            for record, original in touched.values():
+                record.clear()
+                record.update(original)
+        elif self.stats is not None:
+            for record, original in touched.values():
+                self.stats.replace(original, record)
+        return ok, results
+
+def apply_patch_file(patch_file=DEFAULT_PATCH_FILE, bank_file=DEFAULT_BANK, dry_run: bool = False,
+                     pretty: bool = True) -> Tuple[bool, List[PatchResult]]:
+    """Apply a patch file to a bank file; writes (after a backup snapshot) only if something changed"""
+    with open(patch_file, 'r', encoding='utf-8') as f:
+        patches = json.load(f).get('patches', [])
+    with open(bank_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    stats = None if dry_run else open_stats(bank_file, data['questions'])
+    ok, results = PatchEngine(data['questions'], stats).apply(patches)
+    changed = any(r.status == "applied" for r in results)
+
+    if ok and changed and not dry_run:
+        snapshot_bank(bank_file, note=f"before patches from {Path(patch_file).name}")
+        write_bank(bank_file, data, pretty=pretty)
+        write_stats(bank_file, stats, data.get('exam_info'))
+    return ok, results
+
+def print_results(results: List[PatchResult]):
+    for r in results:
+        where = f"#{r.number} (id {r.record_id})" if r.record_id is not None else r.target
+        print(f"  {r.status:<16} {r.patch_id:<32} {where:<16} {r.message}")
+    counts: Dict[str, int] = {}
+    for r in results:
+        counts[r.status] = counts.get(r.status, 0) + 1
+    print("\n" + ", ".join(f"{status}: {count}" for status, count in sorted(counts.items())))
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a patch set to the question bank")
+    parser.add_argument("patch_file", nargs="?", default=str(DEFAULT_PATCH_FILE))
+    parser.add_argument("--bank", default=str(DEFAULT_BANK))
+    parser.add_argument("--dry-run", action="store_true", help="check every patch without writing")
+    parser.add_argument("--compact", action="store_true", help="write minified JSON")
+    parser.add_argument("--log", help="write the per-patch results to this JSON file")
+    args = parser.parse_args()
+
+    print(f"Applying {args.patch_file} to {args.bank}...")
+    ok, results = apply_patch_file(args.patch_file, args.bank, args.dry_run, pretty=not args.compact)
+    print_results(results)
+
+    if args.log:
+        write_bank(args.log, {"bank": args.bank, "patch_file": args.patch_file, "committed": ok and not args.dry_run,
+                              "results": [r._asdict() for r in results]})
+
+    if not ok:
+        print("❌ Patch set rejected; the bank was not modified")
+        sys.exit(1)
+    if not any(r.status == "applied" for r in results):
+        print("✅ Nothing to apply; the bank already has every patch")
+    elif args.dry_run:
+        print("✅ Dry run: every patch applies cleanly")
+    else:
+        print("✅ Patch set applied")
+
+if __name__ == "__main__":
+    main()
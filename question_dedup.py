@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate question detection with MinHash signatures and LSH banding
+
+With NumPy installed, signatures are computed for a whole batch of records in a
+few vectorized passes and kept in .cache/minhash/, keyed by a hash of the text
+they were computed from. A merge then only hashes the records it has not seen,
+and match_new_questions() queries just the new records against the bank's LSH
+bands instead of clustering the whole bank. Without NumPy the same signatures
+are computed in pure Python.
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import sys
+import zlib
+from itertools import combinations
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, NamedTuple, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional; signatures are then computed one record at a time
+    np = None
+
+from bank_writer import atomic_open
+
+ROOT = Path(__file__).resolve().parent
+DATA_DIR = ROOT / "src" / "data"
+DEFAULT_SIGNATURE_CACHE = ROOT / ".cache" / "minhash"
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+# Small enough that a * h + b stays below 2**64 for 32-bit shingle hashes, so NumPy uint64 never overflows
+MERSENNE_PRIME = (1 << 31) - 1
+MAX_HASH = (1 << 32) - 1
+# Shingle hashes hashed per vectorized pass (NUM_PERM x this many uint64s in memory)
+CHUNK_SHINGLES = 1 << 15
+
+SHINGLE_SIZE = 3
+NUM_PERM = 128
+BANDS = 32          # 32 bands x 4 rows: pairs around 0.4 Jaccard already become candidates
+DEFAULT_THRESHOLD = 0.7
+
+class DedupRecord(NamedTuple):
+    source: str
+    number: Any
+    id: Any
+    question: str
+    shingles: Set[int]
+
+class DuplicateCluster(NamedTuple):
+    members: List[int]                          # indexes into the record list
+    pairs: List[Tuple[int, int, float]]         # (a, b, jaccard) for every linked pair
+
+def shingle_text(question: Dict[str, Any]) -> str:
+    """The text record_shingles() tokenizes: the stem plus its options, lowercased"""
+    options = " ".join(str(o) for o in question.get('options', []))
+    return f"{question.get('question', '')} {options}".lower()
+
+def text_shingles(text: str, k: int = SHINGLE_SIZE) -> Set[int]:
+    tokens = TOKEN_RE.findall(text)
+    if len(tokens) < k:
+        grams = {" ".join(tokens)} if tokens else set()
+    else:
+        grams = {" ".join(tokens[i:i + k]) for i in range(len(tokens) - k + 1)}
+    return {zlib.crc32(g.encode('utf-8')) for g in grams}
+
+def record_shingles(question: Dict[str, Any], k: int = SHINGLE_SIZE) -> Set[int]:
+    """Hashed word k-grams of the stem plus its options"""
+    return text_shingles(shingle_text(question), k)
+
+def jaccard(a: Set[int], b: Set[int]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+class MinHasher:
+    """num_perm universal hash functions (a*x + b) mod p, seeded so signatures are reproducible"""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.seed = seed
+        self.params = [(rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    def signature(self, shingles: Set[int]) -> Tuple[int, ...]:
+        if not shingles:
+            return (MAX_HASH,) * self.num_perm
+        return tuple(min((a * h + b) % MERSENNE_PRIME for h in shingles) for a, b in self.params)
+
+    def signatures(self, shingle_sets: List[Set[int]]) -> List[Tuple[int, ...]]:
+        """Signatures of many shingle sets, identical to signature() for each"""
+        if np is None:
+            return [self.signature(s) for s in shingle_sets]
+        return [tuple(row) for row in self.signature_matrix(shingle_sets).tolist()]
+
+    def signature_matrix(self, shingle_sets: List[Set[int]]):
+        """len(shingle_sets) x num_perm uint32 signatures, computed a chunk of records at a time (needs NumPy)"""
+        a = np.array([p[0] for p in self.params], dtype=np.uint64)[:, None]
+        b = np.array([p[1] for p in self.params], dtype=np.uint64)[:, None]
+        matrix = np.full((len(shingle_sets), self.num_perm), MAX_HASH, dtype=np.uint32)
+
+        def flush(rows: List[int], hashes: List[int], starts: List[int]):
+            values = np.array(hashes, dtype=np.uint64)[None, :]
+            permuted = (a * values + b) % MERSENNE_PRIME
+            matrix[rows] = np.minimum.reduceat(permuted, starts, axis=1).T
+
+        rows, hashes, starts = [], [], []
+        for i, shingles in enumerate(shingle_sets):
+            if not shingles:
+                continue
+            rows.append(i)
+            starts.append(len(hashes))
+            hashes.extend(shingles)
+            if len(hashes) >= CHUNK_SHINGLES:
+                flush(rows, hashes, starts)
+                rows, hashes, starts = [], [], []
+        if rows:
+            flush(rows, hashes, starts)
+        return matrix
+
+class SignatureStore:
+    """Signatures computed by earlier runs, keyed by the SHA-1 of each record's shingle_text (needs NumPy)
+
+    Stored in cache_dir as one .npz per hasher; load() and save() are cheap next to hashing a bank.
+    """
+
+    def __init__(self, hasher: MinHasher, cache_dir=DEFAULT_SIGNATURE_CACHE):
+        self.hasher = hasher
+        self.path = Path(cache_dir) / f"signatures-{hasher.num_perm}-{hasher.seed}.npz"
+        self.keys = np.empty(0, dtype='S20')
+        self.matrix = np.empty((0, hasher.num_perm), dtype=np.uint32)
+        try:
+            with np.load(self.path, allow_pickle=False) as saved:
+                if saved['matrix'].shape[1:] == (hasher.num_perm,):
+                    self.keys, self.matrix = saved['keys'], saved['matrix']
+        except (OSError, ValueError, KeyError):
+            pass
+        self.rows = {key: i for i, key in enumerate(self.keys.tolist())}
+
+    def signature_matrix(self, texts: List[str]):
+        """Signatures for these shingle texts; only texts not in the store are hashed, and the store is saved"""
+        keys = [hashlib.sha1(text.encode('utf-8')).digest() for text in texts]
+        unseen = list(dict.fromkeys(key for key in keys if key not in self.rows))
+        if unseen:
+            text_of = dict(zip(keys, texts))
+            computed = self.hasher.signature_matrix([text_shingles(text_of[key]) for key in unseen])
+            self.rows.update((key, len(self.keys) + i) for i, key in enumerate(unseen))
+            self.keys = np.concatenate([self.keys, np.array(unseen, dtype='S20')])
+            self.matrix = np.concatenate([self.matrix, computed])
+            # Entries no record asked for lately are dropped once they outnumber the live ones
+            if len(self.keys) > 2 * len(set(keys)):
+                live = np.array(sorted({self.rows[key] for key in keys}))
+                self.keys, self.matrix = self.keys[live], self.matrix[live]
+                self.rows = {key: i for i, key in enumerate(self.keys.tolist())}
+            self.save()
+        return self.matrix[[self.rows[key] for key in keys]]
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with atomic_open(self.path, 'wb') as f:
+            np.savez(f, keys=self.keys, matrix=self.matrix)
+
+def lsh_candidates(signatures: List[Tuple[int, ...]], bands: int = BANDS) -> Set[Tuple[int, int]]:
+    """Pairs that share at least one identical band; never compares every pair"""
+    rows = len(signatures[0]) // bands if signatures else 0
+    candidates = set()
+    for band in range(bands):
+        buckets: Dict[Tuple[int, ...], List[int]] = {}
+        lo, hi = band * rows, (band + 1) * rows
+        for i, signature in enumerate(signatures):
+            buckets.setdefault(signature[lo:hi], []).append(i)
+        for members in buckets.values():
+            if len(members) > 1:
+                candidates.update(combinations(members, 2))
+    return candidates
+
+def band_keys(matrix, bands: int = BANDS):
+    """One uint64 per (record, band) that is equal whenever the band's rows are (needs NumPy)"""
+    rows = matrix.shape[1] // bands
+    banded = matrix[:, :bands * rows].reshape(len(matrix), bands, rows).astype(np.uint64)
+    # Odd multipliers mix the rows; uint64 arithmetic wraps, and colliding keys only add candidates
+    multipliers = np.array([0x9E3779B97F4A7C15 * (2 * r + 1) % (1 << 64) for r in range(rows)], dtype=np.uint64)
+    return (banded * multipliers).sum(axis=2, dtype=np.uint64)
+
+def lsh_query(index_signatures: List[Tuple[int, ...]], query_signatures: List[Tuple[int, ...]],
+              bands: int = BANDS) -> Set[Tuple[int, int]]:
+    """(index, query) pairs that share a band; pairs within either list are never formed"""
+    rows = len(index_signatures[0]) // bands if index_signatures else 0
+    candidates = set()
+    for band in range(bands):
+        lo, hi = band * rows, (band + 1) * rows
+        wanted: Dict[Tuple[int, ...], List[int]] = {}
+        for j, signature in enumerate(query_signatures):
+            wanted.setdefault(signature[lo:hi], []).append(j)
+        for i, signature in enumerate(index_signatures):
+            for j in wanted.get(signature[lo:hi], ()):
+                candidates.add((i, j))
+    return candidates
+
+def match_new_questions(existing: List[Dict[str, Any]], new_questions: List[Dict[str, Any]],
+                        threshold: float = DEFAULT_THRESHOLD, hasher: Optional[MinHasher] = None,
+                        cache_dir=None) -> List[Tuple[int, int, float]]:
+    """(existing position, new position, jaccard) for every new question near an existing one
+
+    Only the new questions are looked up in the existing questions' LSH bands. With NumPy the
+    existing questions' signatures come from the SignatureStore in cache_dir (default
+    .cache/minhash), so an unchanged bank is not hashed again; shingles are only built for
+    candidate pairs.
+    """
+    hasher = hasher or MinHasher()
+    cache_dir = DEFAULT_SIGNATURE_CACHE if cache_dir is None else cache_dir
+    if not existing or not new_questions:
+        return []
+    texts = [shingle_text(q) for q in existing] + [shingle_text(q) for q in new_questions]
+
+    if np is None:
+        signatures = hasher.signatures([text_shingles(text) for text in texts])
+        candidates = lsh_query(signatures[:len(existing)], signatures[len(existing):])
+    else:
+        keys = band_keys(SignatureStore(hasher, cache_dir).signature_matrix(texts))
+        index_keys, query_keys = keys[:len(existing)], keys[len(existing):]
+        candidates = set()
+        for band in range(keys.shape[1]):
+            hits = np.flatnonzero(np.isin(index_keys[:, band], query_keys[:, band]))
+            for i in hits.tolist():
+                candidates.update((i, j) for j in np.flatnonzero(query_keys[:, band] == index_keys[i, band]).tolist())
+
+    shingles: Dict[int, Set[int]] = {}
+    def shingles_of(pos: int) -> Set[int]:
+        if pos not in shingles:
+            shingles[pos] = text_shingles(texts[pos])
+        return shingles[pos]
+
+    matches = []
+    for i, j in sorted(candidates):
+        similarity = jaccard(shingles_of(i), shingles_of(len(existing) + j))
+        if similarity >= threshold:
+            matches.append((i, j, round(similarity, 4)))
+    return matches
+
+def find_duplicate_clusters(records: List[DedupRecord], threshold: float = DEFAULT_THRESHOLD,
+                            scope: str = "all", hasher: Optional[MinHasher] = None) -> List[DuplicateCluster]:
+    """Group records whose shingle Jaccard similarity reaches threshold
+
+    scope: "all" links any pair, "within" only pairs from the same file,
+    "across" only pairs from different files.
+    """
+    hasher = hasher or MinHasher()
+    # Copies of the same record across bank variants share one signature computation
+    unique: Dict[frozenset, int] = {}
+    for r in records:
+        unique.setdefault(frozenset(r.shingles), len(unique))
+    computed = hasher.signatures([set(key) for key in unique])
+    signatures = [computed[unique[frozenset(r.shingles)]] for r in records]
+
+    linked = []
+    for a, b in sorted(lsh_candidates(signatures)):
+        same_source = records[a].source == records[b].source
+        if (scope == "within" and not same_source) or (scope == "across" and same_source):
+            continue
+        similarity = jaccard(records[a].shingles, records[b].shingles)
+        if similarity >= threshold:
+            linked.append((a, b, round(similarity, 4)))
+
+    # Union-find over the linked pairs
+    parent = list(range(len(records)))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b, _ in linked:
+        parent[find(a)] = find(b)
+
+    groups: Dict[int, List[int]] = {}
+    pairs: Dict[int, List[Tuple[int, int, float]]] = {}
+    for a, b, similarity in linked:
+        root = find(a)
+        pairs.setdefault(root, []).append((a, b, similarity))
+    for i in range(len(records)):
+        root = find(i)
+        if root in pairs:
+            groups.setdefault(root, []).append(i)
+
+    return [DuplicateCluster(groups[root], pairs[root]) for root in sorted(groups, key=lambda r: groups[r][0])]
+
+def load_records(json_files: Iterable[Path]) -> List[DedupRecord]:
+    """Question records from every readable bank, tagged with their file name"""
+    records = []
+    for json_file in json_files:
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Skipping {json_file}: {e}", file=sys.stderr)
+            continue
+        questions = data.get('questions', []) if isinstance(data, dict) else data
+        records.extend(records_from_questions(questions, Path(json_file).name))
+    return records
+
+def records_from_questions(questions: Iterable[Dict[str, Any]], source: str) -> List[DedupRecord]:
+    return [DedupRecord(source, q.get('number'), q.get('id'), q.get('question', ''), record_shingles(q))
+            for q in questions]
+
+def print_clusters(records: List[DedupRecord], clusters: List[DuplicateCluster], limit: Optional[int] = None):
+    print(f"Near-duplicate clusters: {len(clusters)}")
+    for n, cluster in enumerate(clusters[:limit] if limit else clusters, 1):
+        best = max(similarity for _, _, similarity in cluster.pairs)
+        print(f"\nCluster {n} ({len(cluster.members)} records, max similarity {best:.2f}):")
+        for i in cluster.members:
+            r = records[i]
+            print(f"  {r.source} #{r.number} (id {r.id}): {r.question[:70]}")
+        for a, b, similarity in cluster.pairs:
+            print(f"    {records[a].source}#{records[a].number} ~ {records[b].source}#{records[b].number}: {similarity:.2f}")
+
+def clusters_to_json(records: List[DedupRecord], clusters: List[DuplicateCluster]) -> List[Dict[str, Any]]:
+    def ref(i):
+        return {"source": records[i].source, "number": records[i].number, "id": records[i].id}
+
+    return [{
+        "records": [ref(i) for i in cluster.members],
+        "pairs": [{"a": ref(a), "b": ref(b), "similarity": s} for a, b, s in cluster.pairs],
+    } for cluster in clusters]
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate questions across question banks")
+    parser.add_argument("files", nargs="*", help="bank files (default: every src/data/*.json)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="minimum Jaccard similarity (default: %(default)s)")
+    parser.add_argument("--scope", choices=("all", "within", "across"), default="all",
+                        help="link pairs from any file, the same file only, or different files only")
+    parser.add_argument("--limit", type=int, help="print at most this many clusters")
+    parser.add_argument("--json", dest="json_output", help="also write the clusters to this file")
+    args = parser.parse_args()
+
+    files = [Path(f) for f in args.files] or sorted(DATA_DIR.glob("*.json"))
+    records = load_records(files)
+    print(f"Loaded {len(records)} questions from {len(files)} files")
+
+    clusters = find_duplicate_clusters(records, args.threshold, args.scope)
+    print_clusters(records, clusters, args.limit)
+
+    if args.json_output:
+        with open(args.json_output, 'w', encoding='utf-8') as f:
+            json.dump({"threshold": args.threshold, "scope": args.scope,
+                       "clusters": clusters_to_json(records, clusters)}, f, indent=2, ensure_ascii=False)
+        print(f"\nClusters saved to: {args.json_output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Single-process pipeline over the question bank: analyze, extract, merge, migrate, shards, exhibits, summary
+
+    python -m questionbank run [analyze] [extract] [merge] [migrate] [shards] [exhibits] [summary] [--force]
+    python -m questionbank status
+
+questions.json and webtext.md are each read and parsed once per run, and every
+stage works on the same in-memory bank and webtext blocks. After a stage succeeds
+the hashes of its inputs are recorded in a state file; a later run skips it while
+those inputs are unchanged, without parsing anything.
+"""
+import argparse
+import hashlib
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, NamedTuple, Optional
+
+import analyze_questions
+import answer_migration
+import build_exhibits
+import build_shards
+import extract_missing_questions_v2 as extractor
+import extraction_summary
+import instrumentation
+import merge_missing_questions
+from backup_store import snapshot_bank
+from bank_cache import build_indexes, load_bank
+from bank_stats import rebuild_stats
+from bank_writer import write_bank
+from instrumentation import stage as trace_stage
+from topic_classifier import TOPIC_ENGINES
+from webtext_parser import NumberingTracker, QuestionBlock, iter_question_blocks
+
+ROOT = Path(__file__).resolve().parent
+
+# Stages always run in this order, whatever order they are named in
+STAGES = ("analyze", "extract", "merge", "migrate", "shards", "exhibits", "summary")
+
+class PipelineConfig(NamedTuple):
+    bank: Path = ROOT / "src" / "data" / "questions.json"
+    webtext: Path = ROOT.parent / "webtext.md"
+    output: Path = ROOT / "missing_questions_v2.json"
+    shards: Path = build_shards.DEFAULT_OUTPUT
+    exhibits: Path = build_exhibits.DEFAULT_OUTPUT
+    state: Path = ROOT / ".questionbank_state.json"
+    topic_engine: str = extractor.TOPIC_ENGINE
+    key: str = "number"
+    pretty: bool = True
+
+DEFAULT_CONFIG = PipelineConfig()
+
+def file_hash(path: Path) -> Optional[str]:
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+class PipelineContext:
+    """Inputs shared by every stage; each one is loaded on first use and then reused"""
+
+    def __init__(self, config: PipelineConfig):
+        self.config = config
+        self._bank: Optional[Dict[str, Any]] = None
+        self._bank_hash: Optional[str] = None
+        self._webtext_hash: Optional[str] = None
+        self._blocks: Optional[List[QuestionBlock]] = None
+        self.numbering = NumberingTracker()
+        self.extracted: Optional[Dict[str, Any]] = None
+
+    @property
+    def bank(self) -> Dict[str, Any]:
+        if self._bank is None:
+            cached = load_bank(self.config.bank)
+            self._bank_hash = cached.sha256
+            self._bank = cached.data
+        return self._bank
+
+    @property
+    def bank_hash(self) -> Optional[str]:
+        if self._bank_hash is None:
+            self._bank_hash = file_hash(self.config.bank)
+        return self._bank_hash
+
+    def bank_written(self):
+        """The in-memory bank was saved; refresh its fingerprint"""
+        self._bank_hash = file_hash(self.config.bank)
+
+    @property
+    def webtext_hash(self) -> Optional[str]:
+        if self._webtext_hash is None:
+            self._webtext_hash = file_hash(self.config.webtext)
+        return self._webtext_hash
+
+    @property
+    def blocks(self) -> List[QuestionBlock]:
+        if self._blocks is None:
+            if not self.config.webtext.exists():
+                raise FileNotFoundError(f"{self.config.webtext} not found")
+            self._blocks = []
+            for block in iter_question_blocks(str(self.config.webtext)):
+                self.numbering.add(block.number)
+                self._blocks.append(block)
+        return self._blocks
+
+    @property
+    def bank_numbers(self) -> List[int]:
+        return sorted(q['number'] for q in self.bank['questions'] if 'number' in q)
+
+    @property
+    def missing_numbers(self) -> List[int]:
+        """Numbers present in the webtext but not in the bank"""
+        self.blocks
+        return sorted(self.numbering.seen - set(self.bank_numbers))
+
+# --- stages ---------------------------------------------------------------
+# Each stage has a fingerprint of everything it reads; it is evaluated after the
+# stage runs, so a stage that rewrites its own input (merge) is not re-run next time.
+
+def fingerprint(ctx: PipelineContext, stage: str) -> Dict[str, Any]:
+    config = ctx.config
+    if stage == "analyze":
+        return {"bank": ctx.bank_hash, "webtext": ctx.webtext_hash}
+    if stage == "extract":
+        return {"bank": ctx.bank_hash, "webtext": ctx.webtext_hash, "topic_engine": config.topic_engine,
+                "output": file_hash(config.output)}
+    if stage == "merge":
+        # The corrected questions live in merge_missing_questions.py itself
+        return {"bank": ctx.bank_hash, "source": file_hash(Path(merge_missing_questions.__file__)),
+                "key": config.key, "pretty": config.pretty}
+    if stage == "shards":
+        return {"bank": ctx.bank_hash, "manifest": file_hash(config.shards / "manifest.json")}
+    if stage == "exhibits":
+        return {"bank": ctx.bank_hash, "manifest": file_hash(config.exhibits / "manifest.json"),
+                "sources": build_exhibits.source_stamp(ctx.bank['questions'])}
+    return {"bank": ctx.bank_hash}
+
+def run_analyze(ctx: PipelineContext):
+    print(f"Analyzing {ctx.config.bank.name}...")
+    json_questions, _ = analyze_questions.analyze_bank_numbers(ctx.bank['questions'])
+    print(f"\nAnalyzing {ctx.config.webtext.name}...")
+    ctx.blocks
+    webtext_questions = analyze_questions.report_webtext_numbering(ctx.numbering)
+    analyze_questions.compare_numbers(json_questions, webtext_questions)
+
+def run_extract(ctx: PipelineContext):
+    missing = ctx.missing_numbers
+    print(f"Extracting {len(missing)} missing questions...")
+    extractor.TOPIC_ENGINE = ctx.config.topic_engine
+    results = extractor.extract_questions_from_blocks(ctx.blocks, missing)
+    ctx.extracted = extractor.report_extraction(results, missing)
+    write_bank(ctx.config.output, ctx.extracted, pretty=True)
+    print(f"\nResults saved to: {ctx.config.output}")
+    extractor.print_extraction_samples(ctx.extracted['extracted_questions'])
+
+def run_merge(ctx: PipelineContext):
+    print(f"Merging corrected missing questions into {ctx.config.bank.name}...")
+    merge_missing_questions.merge_questions(str(ctx.config.bank), key=ctx.config.key, pretty=ctx.config.pretty,
+                                            data=ctx.bank)
+    ctx.bank_written()
+
+def run_migrate(ctx: PipelineContext):
+    report = answer_migration.migrate_questions(ctx.bank['questions'])
+    answer_migration.print_report(report)
+    if report.converted:
+        snapshot = snapshot_bank(ctx.config.bank, note="before answer migration")
+        print(f"Backup snapshot: {snapshot['snapshot']} ({snapshot['objects_written']} new objects)")
+        ctx.bank['exam_info']['last_updated'] = datetime.now().date().isoformat()
+        write_bank(ctx.config.bank, ctx.bank, pretty=ctx.config.pretty)
+        ctx.bank_written()
+        rebuild_stats(ctx.config.bank, ctx.bank)
+        print(f"Questions file updated: {ctx.config.bank}")
+
+def run_shards(ctx: PipelineContext):
+    manifest = build_shards.build_shards(ctx.config.bank, ctx.config.shards,
+                                         bank=build_indexes(ctx.bank, ctx.bank_hash))
+    print(f"Built {len(manifest['topics'])} topic shards and {len(manifest['chunks'])} chunks "
+          f"for {manifest['total_questions']} questions in {ctx.config.shards}")
+
+def run_exhibits(ctx: PipelineContext):
+    manifest = build_exhibits.build_exhibits(ctx.config.bank, ctx.config.exhibits,
+                                             bank=build_indexes(ctx.bank, ctx.bank_hash))
+    print(f"Built {len(manifest['assets'])} exhibit assets for {len(manifest['exhibits'])} questions "
+          f"in {ctx.config.exhibits}")
+    for item in manifest['missing']:
+        print(f"  ⚠️  Q{item['number']}: {item['src']} not found")
+
+def run_summary(ctx: PipelineContext):
+    extraction_summary.generate_summary(str(ctx.config.bank), data=ctx.bank)
+
+STAGE_RUNNERS = {"analyze": run_analyze, "extract": run_extract, "merge": run_merge, "migrate": run_migrate,
+                 "shards": run_shards, "exhibits": run_exhibits, "summary": run_summary}
+
+# --- runner ---------------------------------------------------------------
+
+def load_state(path: Path) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def is_fresh(ctx: PipelineContext, state: Dict[str, Any], stage: str) -> bool:
+    recorded = state.get(stage)
+    return bool(recorded) and recorded.get("fingerprint") == fingerprint(ctx, stage)
+
+def run_pipeline(stages: List[str], config: PipelineConfig, force: bool = False) -> PipelineContext:
+    """Run the named stages in pipeline order, skipping those whose inputs are unchanged"""
+    ctx = PipelineContext(config)
+    state = load_state(config.state)
+
+    for stage in [s for s in STAGES if s in stages]:
+        if not force and is_fresh(ctx, state, stage):
+            print(f"=== {stage}: skipped (inputs unchanged since {state[stage]['completed']})")
+            continue
+        print(f"=== {stage}")
+        with trace_stage(stage):
+            STAGE_RUNNERS[stage](ctx)
+        state[stage] = {"fingerprint": fingerprint(ctx, stage), "completed": datetime.now().isoformat(timespec='seconds')}
+        write_bank(config.state, state)
+        print()
+
+    return ctx
+
+def main():
+    parser = argparse.ArgumentParser(prog="questionbank", description="Run the question bank pipeline in one process")
+    parser.add_argument("--bank", type=Path, default=DEFAULT_CONFIG.bank, help="question bank (default: %(default)s)")
+    parser.add_argument("--webtext", type=Path, default=DEFAULT_CONFIG.webtext, help="source dump (default: %(default)s)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_CONFIG.output, help="extraction results (default: %(default)s)")
+    parser.add_argument("--shards", type=Path, default=DEFAULT_CONFIG.shards, help="shard directory (default: %(default)s)")
+    parser.add_argument("--exhibits", type=Path, default=DEFAULT_CONFIG.exhibits,
+                        help="exhibit asset directory (default: %(default)s)")
+    parser.add_argument("--state", type=Path, default=DEFAULT_CONFIG.state, help="stage state file (default: %(default)s)")
+    parser.add_argument("--topic-engine", choices=TOPIC_ENGINES, default=DEFAULT_CONFIG.topic_engine)
+    parser.add_argument("--key", choices=("number", "content"), default=DEFAULT_CONFIG.key, help="merge key")
+    parser.add_argument("--compact", action="store_true", help="write the merged bank as minified JSON")
+    instrumentation.add_profile_arguments(parser)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run pipeline stages")
+    run.add_argument("stages", nargs="*", metavar="stage",
+                     help=f"stages to run, any of {', '.join(STAGES)} (default: all)")
+    run.add_argument("--force", action="store_true", help="run stages even if their inputs are unchanged")
+
+    commands.add_parser("status", help="show which stages are up to date")
+
+    args = parser.parse_args()
+    config = PipelineConfig(bank=args.bank, webtext=args.webtext, output=args.output, shards=args.shards,
+                            exhibits=args.exhibits, state=args.state, topic_engine=args.topic_engine, key=args.key, pretty=not args.compact)
+
+    if args.command == "status":
+        ctx = PipelineContext(config)
+        state = load_state(config.state)
+        for stage in STAGES:
+            if stage not in state:
+                print(f"{stage:<8} never run")
+            else:
+                status = "up to date" if is_fresh(ctx, state, stage) else "stale"
+                print(f"{stage:<8} {status:<11} last run {state[stage]['completed']}")
+        return
+
+    unknown = [s for s in args.stages if s not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+
+    try:
+        with instrumentation.profiled(args, "questionbank"):
+            run_pipeline(args.stages or list(STAGES), config, args.force)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
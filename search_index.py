@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Inverted full-text index over question stems, options and explanations, with BM25 ranking
+
+Each record's fields are tokenized into one position stream (with a gap between
+fields so phrases never span two of them). Postings hold the record, the term
+frequency and the positions. The serialized form is compact JSON that the app can
+load as is: per term a flat integer array of
+    doc delta, tf, position delta x tf, doc delta, tf, ...
+
+Queries: words are ANDed, OR separates alternatives, "double quotes" make a phrase.
+
+    python search_index.py build [bank.json] [--output index.json]
+    python search_index.py search 'raid "parity data" OR mirroring' [--limit 10]
+"""
+import argparse
+import json
+import math
+import re
+from pathlib import Path
+from typing import List, Dict, Any, NamedTuple, Optional, Set, Tuple
+
+from bank_cache import load_bank
+from bank_writer import write_bank
+from question_dedup import TOKEN_RE
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_BANK = ROOT / "src" / "data" / "questions.json"
+
+INDEX_VERSION = 1
+FIELDS = ('question', 'options', 'explanation')
+FIELD_GAP = 100             # positions skipped between fields and between options
+K1, B = 1.2, 0.75
+QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+class SearchHit(NamedTuple):
+    number: Any
+    id: Any
+    score: float
+    doc: int                # position of the record in the bank
+
+def default_index_file(bank_file) -> Path:
+    return Path(bank_file).with_suffix('.search.json')
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+def record_positions(question: Dict[str, Any]) -> Tuple[Dict[str, List[int]], int]:
+    """term -> positions for one record, and its length in tokens"""
+    texts = [str(question.get('question', ''))]
+    texts.extend(str(o) for o in question.get('options', []))
+    texts.append(str(question.get('explanation', '')))
+
+    positions: Dict[str, List[int]] = {}
+    offset = length = 0
+    for text in texts:
+        tokens = tokenize(text)
+        for i, token in enumerate(tokens):
+            positions.setdefault(token, []).append(offset + i)
+        offset += len(tokens) + FIELD_GAP
+        length += len(tokens)
+    return positions, length
+
+class SearchIndex:
+    """postings: term -> {doc: positions}; docs are (number, id) in bank order"""
+
+    def __init__(self, docs: List[Tuple[Any, Any]], lengths: List[int],
+                 postings: Dict[str, Dict[int, List[int]]], source_sha256: str = ""):
+        self.docs = docs
+        self.lengths = lengths
+        self.postings = postings
+        self.source_sha256 = source_sha256
+        self.avg_length = sum(lengths) / len(lengths) if lengths else 0.0
+
+    @classmethod
+    def build(cls, questions: List[Dict[str, Any]], source_sha256: str = "") -> "SearchIndex":
+        docs, lengths = [], []
+        postings: Dict[str, Dict[int, List[int]]] = {}
+        for doc, question in enumerate(questions):
+            positions, length = record_positions(question)
+            docs.append((question.get('number'), question.get('id')))
+            lengths.append(length)
+            for term, term_positions in positions.items():
+                postings.setdefault(term, {})[doc] = term_positions
+        return cls(docs, lengths, postings, source_sha256)
+
+    # --- serialization ---------------------------------------------------
+
+    def to_json(self) -> Dict[str, Any]:
+        terms = {}
+        for term in sorted(self.postings):
+            flat, previous_doc = [], 0
+            for doc in sorted(self.postings[term]):
+                positions = self.postings[term][doc]
+                flat += [doc - previous_doc, len(positions)]
+                flat += [p - q for p, q in zip(positions, [0] + positions[:-1])]
+                previous_doc = doc
+            terms[term] = flat
+        return {"version": INDEX_VERSION, "source_sha256": self.source_sha256, "fields": list(FIELDS),
+                "field_gap": FIELD_GAP, "docs": [list(d) for d in self.docs], "lengths": self.lengths, "terms": terms}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "SearchIndex":
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported index version {data.get('version')}")
+        postings: Dict[str, Dict[int, List[int]]] = {}
+        for term, flat in data['terms'].items():
+            entries: Dict[int, List[int]] = {}
+            doc = i = 0
+            while i < len(flat):
+                doc += flat[i]
+                tf = flat[i + 1]
+                positions, position = [], 0
+                for delta in flat[i + 2:i + 2 + tf]:
+                    position += delta
+                    positions.append(position)
+                entries[doc] = positions
+                i += 2 + tf
+            postings[term] = entries
+        return cls([tuple(d) for d in data['docs']], data['lengths'], postings, data.get('source_sha256', ""))
+
+    def save(self, path):
+        write_bank(path, self.to_json(), pretty=False)
+
+    @classmethod
+    def load(cls, path) -> "SearchIndex":
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_json(json.load(f))
+
+    # --- queries ---------------------------------------------------------
+
+    def _phrase_docs(self, terms: List[str]) -> Set[int]:
+        if not terms:
+            return set()
+        lists = [self.postings.get(t, {}) for t in terms]
+        docs = set(lists[0]).intersection(*lists[1:])
+        if len(terms) == 1:
+            return docs
+        matched = set()
+        for doc in docs:
+            starts = set(lists[0][doc])
+            for offset, postings in enumerate(lists[1:], 1):
+                starts &= {p - offset for p in postings[doc]}
+                if not starts:
+                    break
+            if starts:
+                matched.add(doc)
+        return matched
+
+    def match(self, query: str) -> Tuple[Set[int], List[str]]:
+        """Documents matching a query, and every term it mentions (for scoring)"""
+        groups: List[List[List[str]]] = [[]]
+        for phrase, word in QUERY_RE.findall(query):
+            if word == "OR":
+                groups.append([])
+            elif word == "AND":
+                continue
+            else:
+                terms = tokenize(phrase if phrase else word)
+                if terms:
+                    groups[-1].append(terms)
+
+        matched: Set[int] = set()
+        query_terms: List[str] = []
+        for clauses in groups:
+            if not clauses:
+                continue
+            docs = None
+            for terms in clauses:
+                query_terms.extend(terms)
+                clause_docs = self._phrase_docs(terms)
+                docs = clause_docs if docs is None else docs & clause_docs
+            matched |= docs
+        return matched, list(dict.fromkeys(query_terms))
+
+    def bm25(self, doc: int, terms: List[str]) -> float:
+        score = 0.0
+        n = len(self.docs)
+        norm = K1 * (1 - B + B * self.lengths[doc] / self.avg_length) if self.avg_length else K1
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings or doc not in postings:
+                continue
+            tf = len(postings[doc])
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            score += idf * tf * (K1 + 1) / (tf + norm)
+        return score
+
+    def search(self, query: str, limit: Optional[int] = 10) -> List[SearchHit]:
+        docs, terms = self.match(query)
+        ranked = sorted(((self.bm25(doc, terms), doc) for doc in docs), key=lambda x: (-x[0], x[1]))
+        return [SearchHit(*self.docs[doc], round(score, 4), doc) for score, doc in ranked[:limit]]
+
+def build_index(bank_file=DEFAULT_BANK, output=None) -> Tuple[SearchIndex, Path]:
+    bank = load_bank(bank_file)
+    index = SearchIndex.build(bank.questions, bank.sha256)
+    output = Path(output) if output else default_index_file(bank_file)
+    index.save(output)
+    return index, output
+
+def load_index(bank_file=DEFAULT_BANK, index_file=None) -> SearchIndex:
+    """The saved index for bank_file, rebuilt first if it is missing or the bank has changed"""
+    index_file = Path(index_file) if index_file else default_index_file(bank_file)
+    bank = load_bank(bank_file)
+    try:
+        index = SearchIndex.load(index_file)
+        if index.source_sha256 == bank.sha256:
+            return index
+    except (OSError, ValueError, KeyError):
+        pass
+    index = SearchIndex.build(bank.questions, bank.sha256)
+    index.save(index_file)
+    return index
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search over the question bank")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="build and save the index")
+    build.add_argument("bank", nargs="?", default=str(DEFAULT_BANK))
+    build.add_argument("--output", help="index file (default: <bank>.search.json)")
+
+    search = commands.add_parser("search", help="query the index (rebuilt if the bank changed)")
+    search.add_argument("query")
+    search.add_argument("--bank", default=str(DEFAULT_BANK))
+    search.add_argument("--index", help="index file (default: <bank>.search.json)")
+    search.add_argument("--limit", type=int, default=10)
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        index, output = build_index(args.bank, args.output)
+        print(f"Indexed {len(index.docs)} questions, {len(index.postings)} terms -> {output} "
+              f"({output.stat().st_size / 1024:.1f} KB)")
+        return
+
+    bank = load_bank(args.bank)
+    index = load_index(args.bank, args.index)
+    hits = index.search(args.query, args.limit)
+    print(f"{len(hits)} results for {args.query!r}")
+    for hit in hits:
+        # Resolved by position: numbers repeat in the bank, and some records have none
+        question = bank.questions[hit.doc].get('question', '')
+        print(f"  {hit.score:>7.3f}  #{hit.number if hit.number is not None else '-':<4} {question[:80]}")
+
+if __name__ == "__main__":
+    main()
@@ -24,7 +24,7 @@ import {
   Brain,
   Award
 } from 'lucide-react'
-import questionData from '@/data/questions.json'
+import bankStats from '@/data/stats/questions.json'
 import { AchievementsPanel } from '@/components/achievements/AchievementsPanel'
 import { AnimatedThemeToggle } from '@/components/ui/AnimatedThemeToggle'
 import { StatsSkeleton } from '@/components/skeletons'
@@ -56,7 +56,7 @@ export default function StatsPage() {
       ? (progress.correctAnswers / progress.questionsAnswered) * 100 
       : 0
     
-    const totalTopicQuestions = questionData.questions.filter(q => q.topic === topic).length
+    const totalTopicQuestions = (bankStats.topics as Record<string, number>)[topic] ?? 0
     const completionRate = (progress.questionsAnswered / totalTopicQuestions) * 100
 
     return {
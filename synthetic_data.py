@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic webtext.md dumps and questions.json banks of any size
+
+Questions are derived from the real bank: each one starts from a real record
+(so topic keywords, option shapes and explanations look like the real thing) and
+has part of its stem words swapped for words drawn from the bank's vocabulary, so
+generated questions are not near-duplicates of each other. Output is seeded and
+reproducible.
+
+    python synthetic_data.py 10000 --output-dir /tmp/synthetic
+"""
+import argparse
+import json
+import random
+import re
+from pathlib import Path
+from typing import List, Dict, Any, Tuple
+
+from bank_writer import write_bank
+from webtext_parser import QUESTION_START_RE
+
+ROOT = Path(__file__).resolve().parent
+DEFAULT_TEMPLATE_BANK = ROOT / "src" / "data" / "questions.json"
+
+WORD_RE = re.compile(r'[A-Za-z]{4,}')
+MUTATION_RATE = 0.35        # share of stem words replaced
+MISSING_RATE = 0.02         # share of webtext questions left out of the bank
+
+def _load_templates(template_bank) -> List[Dict[str, Any]]:
+    with open(template_bank, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    # Records need resolvable answers, and no option may look like the start of another question
+    return [q for q in data['questions']
+            if q.get('options') and isinstance(q.get('correctAnswer'), (int, list))
+            and not any(QUESTION_START_RE.match(o) for o in q['options'])]
+
+def _mutate(text: str, vocabulary: List[str], rng: random.Random) -> str:
+    return WORD_RE.sub(lambda m: rng.choice(vocabulary) if rng.random() < MUTATION_RATE else m.group(0), text)
+
+def _answer_indices(template: Dict[str, Any]) -> List[int]:
+    answer = template['correctAnswer']
+    return answer if isinstance(answer, list) else [answer]
+
+def generate_questions(count: int, seed: int = 42, template_bank=DEFAULT_TEMPLATE_BANK) -> List[Dict[str, Any]]:
+    """count bank-format records numbered 1..count"""
+    rng = random.Random(seed)
+    templates = _load_templates(template_bank)
+    vocabulary = sorted({w.lower() for q in templates for w in WORD_RE.findall(q['question'])})
+
+    questions = []
+    for number in range(1, count + 1):
+        template = templates[rng.randrange(len(templates))]
+        options = list(template['options'])
+        answers = _answer_indices(template)
+        explanation = template.get('explanation') or ""
+        if not explanation or explanation.lower().startswith("no explanation"):
+            explanation = "The correct answer is " + " and ".join(options[i] for i in answers) + "."
+        questions.append({
+            "id": number,
+            "number": number,
+            "question": _mutate(template['question'], vocabulary, rng),
+            "options": options,
+            "correctAnswer": template['correctAnswer'],
+            "explanation": explanation,
+            "topic": template.get('topic', 'General IT'),
+            "difficulty": template.get('difficulty', 'medium'),
+        })
+    return questions
+
+def render_webtext(questions: List[Dict[str, Any]]) -> str:
+    """The questions in the numbered-block layout of the real webtext.md"""
+    blocks = []
+    for q in questions:
+        lines = [f"{q['number']}. {q['question']}"]
+        lines.extend(q['options'])
+        lines.append(f"Explanation: {q['explanation']}")
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks) + "\n"
+
+def generate_dataset(count: int, output_dir, seed: int = 42, template_bank=DEFAULT_TEMPLATE_BANK) -> Tuple[Path, Path, List[int]]:
+    """Write webtext.md (every question) and questions.json (all but a few); returns both paths and the omitted numbers"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    questions = generate_questions(count, seed, template_bank)
+
+    rng = random.Random(seed + 1)
+    missing = sorted(rng.sample(range(1, count + 1), max(1, int(count * MISSING_RATE))))
+    omitted = set(missing)
+    bank = {
+        "exam_info": {"title": f"Synthetic bank ({count} questions)", "total_questions": count - len(omitted),
+                      "last_updated": "2025-01-01"},
+        "questions": [q for q in questions if q['number'] not in omitted],
+    }
+
+    webtext_file = output_dir / "webtext.md"
+    bank_file = output_dir / "questions.json"
+    webtext_file.write_text(render_webtext(questions), encoding='utf-8')
+    write_bank(bank_file, bank, pretty=True)
+    return webtext_file, bank_file, missing
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic webtext.md and questions.json")
+    parser.add_argument("count", type=int, help="number of questions")
+    parser.add_argument("--output-dir", default=".", help="directory to write into (default: current)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--template-bank", default=str(DEFAULT_TEMPLATE_BANK))
+    args = parser.parse_args()
+
+    webtext_file, bank_file, missing = generate_dataset(args.count, args.output_dir, args.seed, args.template_bank)
+    print(f"Wrote {webtext_file} ({webtext_file.stat().st_size / 1024:.0f} KB, {args.count} questions)")
+    print(f"Wrote {bank_file} ({bank_file.stat().st_size / 1024:.0f} KB, {args.count - len(missing)} questions, "
+          f"{len(missing)} left out for extraction)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+from answer_migration import has_valid_answer, migrate_questions, migrate_record, resolve_answer
+
+OPTIONS = ["PAN", "WAN", "LAN", "MAN"]
+
+def test_resolve_answer_text_and_lists():
+    assert resolve_answer("lan.", OPTIONS) == (2, None)
+    assert resolve_answer(["MAN", "PAN", "MAN"], OPTIONS) == ([0, 3], None)
+    assert resolve_answer(7, OPTIONS)[0] is None
+    assert resolve_answer("Multiple matching pairs", OPTIONS)[1].startswith("not an option")
+
+def test_migrate_record_keeps_field_order_and_clears_review_flag():
+    record = {"id": 1, "number": 25, "question": "?", "options": OPTIONS, "correct_answer": "LAN",
+              "topic": "Networking", "needs_review": True}
+    migrated, reason = migrate_record(record)
+    assert reason is None
+    assert list(migrated) == ["id", "number", "question", "options", "correctAnswer", "topic"]
+    assert migrated["correctAnswer"] == 2
+
+def test_unresolved_answer_is_kept_and_flagged():
+    record = {"number": 52, "options": OPTIONS, "correct_answer": "Multiple matching pairs"}
+    migrated, reason = migrate_record(record)
+    assert reason and migrated["correct_answer"] == "Multiple matching pairs"
+    assert migrated["needs_review"] is True and "correctAnswer" not in migrated
+
+def test_record_without_answer_is_flagged():
+    migrated, reason = migrate_record({"number": 60, "options": OPTIONS})
+    assert reason == "no answer" and migrated["needs_review"] is True
+    assert migrate_record({"number": 61, "options": OPTIONS, "correctAnswer": 1}) == (
+        {"number": 61, "options": OPTIONS, "correctAnswer": 1}, None)
+
+def test_valid_correct_answer_is_never_replaced_by_a_stale_legacy_field():
+    agreeing = {"number": 70, "options": OPTIONS, "correctAnswer": [2], "correct_answer": "LAN"}
+    assert migrate_record(agreeing) == ({"number": 70, "options": OPTIONS, "correctAnswer": [2]}, None)
+    disagreeing = {"number": 71, "options": OPTIONS, "correctAnswer": 1, "correct_answer": "LAN"}
+    migrated, reason = migrate_record(disagreeing)
+    assert reason and "disagrees" in reason
+    assert migrated == {**disagreeing, "needs_review": True}
+    report = migrate_questions([disagreeing])
+    assert (report.converted, len(report.unresolved)) == (0, 1)
+
+def test_migrate_questions_report():
+    questions = [{"number": 1, "options": OPTIONS, "correctAnswer": 0},
+                 {"number": 2, "options": OPTIONS, "correct_answer": ["WAN", "LAN"]},
+                 {"number": 3, "options": OPTIONS, "correct_answer": "none of these"}]
+    report = migrate_questions(questions)
+    assert (report.converted, report.current, len(report.unresolved)) == (1, 1, 1)
+    assert questions[1]["correctAnswer"] == [1, 2]
+
+def test_has_valid_answer():
+    assert has_valid_answer({"options": OPTIONS, "correctAnswer": 3})
+    assert has_valid_answer({"options": OPTIONS, "correctAnswer": [0, 1]})
+    assert not has_valid_answer({"options": OPTIONS, "correctAnswer": 4})
+    assert not has_valid_answer({"options": OPTIONS, "correctAnswer": []})
+    assert not has_valid_answer({"options": OPTIONS, "correct_answer": "LAN"})
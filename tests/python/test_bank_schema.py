@@ -0,0 +1,21 @@
+from bank_schema import validate_bank
+
+EXAM_INFO = {"total_questions": 1, "topics": ["Networking"], "difficulty_levels": ["easy", "medium"]}
+RECORD = {"id": 1, "number": 1, "question": "Which device forwards packets?", "options": ["Hub", "Switch", "Router", "Modem"],
+          "correctAnswer": 2, "topic": "Networking", "difficulty": "medium"}
+
+def violations(**fields):
+    return [(v.field, v.message) for v in validate_bank({"exam_info": EXAM_INFO, "questions": [{**RECORD, **fields}]})]
+
+def test_valid_record():
+    assert violations() == []
+
+def test_unknown_topic_and_difficulty():
+    assert violations(topic="Printers", difficulty="hard") == [
+        ("topic", "'Printers' is not in exam_info.topics"),
+        ("difficulty", "'hard' is not in exam_info.difficulty_levels")]
+
+def test_unhashable_topic_and_difficulty_are_reported_not_raised():
+    assert violations(topic=["Networking"], difficulty={"level": "easy"}) == [
+        ("topic", "expected a string, got ['Networking']"),
+        ("difficulty", "expected a string, got {'level': 'easy'}")]
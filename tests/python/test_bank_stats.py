@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from answer_migration import migrate_bank
+from backup_store import BackupStore, snapshot_bank
+from bank_stats import BankStats, load_stats, read_sidecar, stats_path
+from merge_missing_questions import merge_questions
+from patch_engine import apply_patch_file
+
+OPTIONS = ["PAN", "WAN", "LAN", "MAN"]
+
+@pytest.fixture
+def bank_file(tmp_path):
+    questions = [{"id": n, "number": n, "question": f"Question {n} about networks and hardware {n * 7}?",
+                  "options": OPTIONS, "correctAnswer": n % 4, "topic": "Networking" if n % 2 else "Hardware",
+                  "difficulty": "medium"} for n in range(1, 9) if n != 5]
+    questions.append({**questions[0], "id": 20})
+    path = tmp_path / "questions.json"
+    path.write_text(json.dumps({"exam_info": {"total_questions": len(questions), "last_updated": "2025-01-01"},
+                                "questions": questions}))
+    return path
+
+def recomputed(path):
+    data = json.loads(path.read_text())
+    sidecar = read_sidecar(path)
+    return BankStats.from_questions(data["questions"]).to_sidecar(sidecar["bank"], data["exam_info"], sidecar["last_merge"])
+
+def test_numbering_comes_from_the_data(bank_file):
+    numbering = load_stats(bank_file)["numbering"]
+    assert (numbering["lowest"], numbering["highest"], numbering["expected"]) == (1, 8, 8)
+    assert numbering["missing"] == [5] and numbering["duplicates"] == {"1": 2}
+    assert BankStats.from_sidecar(read_sidecar(bank_file)).numbers == BankStats.from_questions(
+        json.loads(bank_file.read_text())["questions"]).numbers
+
+def test_merge_and_patch_update_the_sidecar_incrementally(bank_file, tmp_path):
+    load_stats(bank_file)
+    merge_questions(str(bank_file), backup_store=tmp_path / "backups", new_questions=[
+        {"number": 5, "question": "Which printer part fuses toner onto paper?", "options": ["fuser", "drum", "tray", "belt"],
+         "correctAnswer": 0, "topic": "Printers"},
+        {"number": 2, "question": "Question 2, reworded", "options": OPTIONS, "correctAnswer": [0, 1], "topic": "Security"}])
+    sidecar = read_sidecar(bank_file)
+    assert sidecar == recomputed(bank_file)
+    assert sidecar["numbering"]["missing"] == [] and sidecar["question_types"]["multiple"] == 1
+    assert [q["number"] for q in sidecar["last_merge"]["inserted"]] == [5]
+
+    patches = tmp_path / "patches.json"
+    patches.write_text(json.dumps({"patches": [{"id": "p1", "operation": "replace", "target": "number:3",
+                                                "field": "topic", "old_value": "Networking", "new_value": "Printers"}]}))
+    ok, _ = apply_patch_file(patches, bank_file)
+    assert ok and read_sidecar(bank_file) == recomputed(bank_file)
+    assert read_sidecar(bank_file)["topics"]["Printers"] == 2
+
+def test_migration_and_restore_rebuild_the_sidecar(bank_file, tmp_path):
+    load_stats(bank_file)
+    store = tmp_path / "backups"
+    snapshot = snapshot_bank(bank_file, store_root=store)
+
+    data = json.loads(bank_file.read_text())
+    data["questions"].append({"id": 30, "number": 9, "question": "Legacy?", "options": OPTIONS,
+                              "correct_answer": ["WAN", "MAN"], "topic": "Security"})
+    bank_file.write_text(json.dumps(data))
+    migrate_bank(bank_file, write=True, backup_store=store)
+    assert read_sidecar(bank_file) == recomputed(bank_file)
+    assert read_sidecar(bank_file)["question_types"]["multiple"] == 1
+
+    BackupStore(store).restore(snapshot["snapshot"])
+    assert read_sidecar(bank_file) == recomputed(bank_file)
+    assert read_sidecar(bank_file)["total_questions"] == 8
+
+def test_sidecar_lives_outside_the_bank_glob(bank_file):
+    assert stats_path(bank_file) == bank_file.parent / "stats" / "questions.json"
@@ -0,0 +1,22 @@
+import json
+
+from build_shards import build_shards
+
+def build(tmp_path, stem):
+    bank = tmp_path / "questions.json"
+    bank.write_text(json.dumps({"exam_info": {}, "questions": [
+        {"id": 1, "number": 1, "question": stem, "options": ["a", "b", "c", "d"], "correctAnswer": 0, "topic": "Networking"}]}))
+    output = tmp_path / "shards"
+    manifest = build_shards(bank, output)
+    return {entry['file'] for entry in manifest['topics'] + manifest['chunks']}, output
+
+def on_disk(output):
+    return {f"{p.parent.name}/{p.name}" for p in output.glob("*/*.json")}
+
+def test_previous_generation_is_kept_until_it_is_two_builds_old(tmp_path):
+    first, output = build(tmp_path, "First?")
+    second, _ = build(tmp_path, "Second?")
+    assert on_disk(output) == first | second
+    assert build(tmp_path, "Second?")[0] == second and on_disk(output) == first | second
+    third, _ = build(tmp_path, "Third?")
+    assert on_disk(output) == second | third
@@ -0,0 +1,32 @@
+import pytest
+
+import extract_missing_questions_v2 as extractor
+
+FIELDS = [(1, "Which device forwards packets between networks?", ["Hub", "Switch", "Router", "Repeater"],
+           "A router forwards packets between networks."),
+          (2, "Which component stores data permanently?", ["RAM", "SSD", "CPU", "GPU"], "An SSD keeps data."),
+          (3, "Which tool removes malware?", ["antivirus", "monitor", "keyboard", "mouse"], "")]
+
+def test_build_question_records_classifies_the_batch_in_one_call(monkeypatch):
+    expected = [extractor.build_question_record(*f)["topic"] for f in FIELDS]
+    engine = extractor.get_topic_engine(extractor.TOPIC_ENGINE)
+    calls = []
+    classify_many = engine.classify_many
+    monkeypatch.setattr(engine, "classify_many", lambda texts: calls.append(len(texts)) or classify_many(texts))
+    monkeypatch.setattr(extractor, "determine_topic", lambda text: pytest.fail("classified one record at a time"))
+
+    records = extractor.build_question_records(FIELDS)
+    assert calls == [3]
+    assert [r["topic"] for r in records] == expected and [r["number"] for r in records] == [1, 2, 3]
+    assert extractor.build_question_records([]) == [] and calls == [3]
+
+def test_given_topic_is_used_as_is(monkeypatch):
+    monkeypatch.setattr(extractor, "determine_topic", lambda text: pytest.fail("topic was given"))
+    assert extractor.build_question_record(*FIELDS[0], topic="Printers")["topic"] == "Printers"
+
+def test_extract_questions_maps_absent_numbers_to_none():
+    webtext = "".join(f"{n}. {stem}\n" + "\n".join(options) + f"\nExplanation: {explanation}\n\n"
+                      for n, stem, options, explanation in FIELDS)
+    results = extractor.extract_questions(webtext, [1, 3, 4])
+    assert [n for n, q in results.items() if q] == [1, 3] and results[4] is None
+    assert results[1]["options"] == FIELDS[0][2]
@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import pytest
+
+import html_ingest
+from html_ingest import QuestionPageParser, build_ingested_record, correct_class, ingest_pages, merge_ingested
+
+PAGE = """<html><head><title>Exam</title><script>var x = "1. not a question";</script></head><body>
+<nav><p>99. Menu item</p></nav>
+<p>1. Which port does HTTPS use?</p>
+<ul><li class="incorrect">port 80 TCP</li><li class="correct">port 443 TCP</li>
+<li class="answer not-correct">port 21 TCP</li><li>port 22 TCP</li></ul>
+<p>Explanation: HTTPS uses TCP port 443.</p>
+<p>2. Which two are input devices? (Choose two.)</p>
+<ul><li><span style="color: #ff0000">keyboard</span></li><li>monitor</li><li>speaker</li>
+<li><span style="color:red">mouse</span></li></ul>
+<p>3. Which device forwards packets between networks?</p>
+<ul><li>Hub</li><li>Switch</li><li>Router</li><li>Repeater</li></ul>
+<p>Explanation: A Router forwards packets between networks.</p>
+</body></html>"""
+
+def parse(html):
+    parser = QuestionPageParser()
+    parser.feed(html)
+    parser.close()
+    return {b.block.number: build_ingested_record(b) for b in parser.ready}
+
+@pytest.mark.parametrize("value, expected", [
+    ("correct", True), ("answer-correct", True), ("is_correct option", True), ("Correct", True),
+    ("incorrect", False), ("not-correct", False), ("correctness", False), ("", False),
+])
+def test_correct_class_tokens(value, expected):
+    assert correct_class(value) is expected
+
+def test_marked_options_become_correct_answer_indices():
+    records = parse(PAGE)
+    assert set(records) == {1, 2, 3}
+    assert records[1]["correctAnswer"] == 1 and "correct_answer" not in records[1]
+    assert records[1]["answer_confidence"] == 1.0 and records[1]["needs_review"] is False
+    assert records[2]["correctAnswer"] == [0, 3]
+
+def test_unmarked_block_falls_back_to_ranking():
+    record = parse(PAGE)[3]
+    assert record["options"][record["correctAnswer"]] == "Router"
+
+def test_marked_option_cut_by_option_limit_goes_to_review():
+    html = ("<p>1. Pick one</p><ul><li>a</li><li>b</li><li>c</li><li>d</li>"
+            "<li class='correct'>e</li></ul>")
+    record = parse(html)[1]
+    assert record["needs_review"] is True and "correctAnswer" not in record
+
+def test_ingest_pages_is_independent_of_chunk_size(tmp_path, monkeypatch):
+    page = tmp_path / "page.html"
+    page.write_text(PAGE, encoding="utf-8")
+    whole = asyncio.run(ingest_pages([page]))["extracted_questions"]
+    monkeypatch.setattr(html_ingest, "CHUNK_SIZE", 7)
+    webtext = tmp_path / "webtext.md"
+    chunked = asyncio.run(ingest_pages([page], webtext_out=webtext))["extracted_questions"]
+    assert chunked == whole and len(whole) == 3
+    assert webtext.read_text(encoding="utf-8").startswith("1. Which port does HTTPS use?\n")
+
+def test_failed_page_is_left_out_of_the_webtext(tmp_path, monkeypatch):
+    good, bad = tmp_path / "a.html", tmp_path / "b.html"
+    good.write_text(PAGE, encoding="utf-8")
+    bad.write_text("<p>7. A question cut short</p>" + PAGE, encoding="utf-8")
+    real_feed = html_ingest.QuestionPageParser.feed
+    def feed(parser, data):
+        if "cut short" in data:
+            parser.on_line("7. A question cut short")
+            raise OSError("read failed")
+        real_feed(parser, data)
+    monkeypatch.setattr(html_ingest.QuestionPageParser, "feed", feed)
+    webtext = tmp_path / "webtext.md"
+    result = asyncio.run(ingest_pages([good, bad], webtext_out=webtext))
+    assert result["failed_sources"] == ["b.html"]
+    assert "cut short" not in webtext.read_text(encoding="utf-8")
+
+def test_merge_never_overwrites_a_bank_record(tmp_path):
+    page = tmp_path / "page.html"
+    page.write_text(PAGE, encoding="utf-8")
+    curated = {"id": 3, "number": 3, "question": "Which device forwards packets between networks?",
+               "options": ["Hub", "Switch", "Router", "Repeater", "CPU"], "correctAnswer": 2,
+               "explanation": "Curated.", "topic": "Networking", "difficulty": "medium"}
+    bank = tmp_path / "questions.json"
+    bank.write_text(json.dumps({"exam_info": {"total_questions": 1, "last_updated": "2025-01-01"},
+                                "questions": [curated]}))
+    review = tmp_path / "review.json"
+    extracted = asyncio.run(ingest_pages([page]))["extracted_questions"]
+    assert merge_ingested(extracted, bank, tmp_path, review, tmp_path / "backups") == {"inserted": [1, 2], "review": [3]}
+
+    questions = {q["number"]: q for q in json.loads(bank.read_text())["questions"]}
+    assert questions[3] == curated
+    assert questions[1]["correctAnswer"] == 1 and "source" not in questions[1]
+    assert [q["number"] for q in json.loads(review.read_text())["extracted_questions"]] == [3]
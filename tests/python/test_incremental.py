@@ -0,0 +1,76 @@
+import json
+
+import extract_missing_questions_v2 as extractor
+from extract_missing_questions_v2 import plan_incremental, run_incremental
+
+CURATED = {"id": 1, "number": 1, "question": "Which device forwards packets between networks?",
+           "options": ["Hub", "Switch", "Router", "Repeater", "Bridge", "Modem"], "correctAnswer": 2,
+           "explanation": "Curated explanation.", "topic": "Networking", "difficulty": "medium"}
+
+def block(number, stem, answer="Router"):
+    return (f"{number}. {stem}\nHub\nSwitch\n{answer}\nRepeater\n"
+            f"Explanation: A {answer.lower()} forwards packets between networks.\n")
+
+def setup(tmp_path, blocks):
+    webtext = tmp_path / "webtext.md"
+    webtext.write_text("\n".join(blocks), encoding="utf-8")
+    bank = tmp_path / "questions.json"
+    bank.write_text(json.dumps({"exam_info": {"total_questions": 1, "last_updated": "2025-01-01"},
+                                "questions": [CURATED]}))
+    return webtext, bank
+
+def run(tmp_path, webtext, bank):
+    return run_incremental(webtext, bank, tmp_path / "manifest.json", backup_store=tmp_path / "backups",
+                           review_file=tmp_path / "review.json")
+
+def bank_questions(bank):
+    return {q["number"]: q for q in json.loads(bank.read_text())["questions"]}
+
+def test_plan_incremental():
+    hashes = {1: "a", 2: "b", 3: "c"}
+    assert plan_incremental(hashes, None, [1, 2]) == {"changed": [], "added": [], "removed": [], "missing": [3]}
+    manifest = {"topic_engine": extractor.TOPIC_ENGINE, "blocks": {"1": "a", "2": "x", "4": "d"}}
+    assert plan_incremental(hashes, manifest, [1, 2, 3]) == {"changed": [2], "added": [3], "removed": [4], "missing": []}
+
+def test_topic_engine_change_re_extracts_nothing():
+    manifest = {"topic_engine": "some-other-engine", "blocks": {"1": "a", "2": "b"}}
+    plan = plan_incremental({1: "a", 2: "b"}, manifest, [1, 2])
+    assert not any(plan.values())
+
+def test_baseline_run_only_inserts_missing_numbers(tmp_path):
+    webtext, bank = setup(tmp_path, [block(1, "Which device forwards packets?"), block(2, "Which device routes?")])
+    plan = run(tmp_path, webtext, bank)
+    assert plan["missing"] == [2]
+    questions = bank_questions(bank)
+    assert questions[1] == CURATED
+    assert questions[2]["options"] == ["Hub", "Switch", "Router", "Repeater"]
+
+def test_changed_block_goes_to_review_instead_of_overwriting(tmp_path):
+    webtext, bank = setup(tmp_path, [block(1, "Which device forwards packets?")])
+    run(tmp_path, webtext, bank)
+    before = bank.read_bytes()
+
+    webtext.write_text(block(1, "Which device forwards packets, edited?") + "\n" + block(3, "Which device is new?"),
+                       encoding="utf-8")
+    plan = run(tmp_path, webtext, bank)
+    assert (plan["changed"], plan["added"]) == ([1], [3])
+
+    questions = bank_questions(bank)
+    assert questions[1] == CURATED
+    assert 3 in questions and bank.read_bytes() != before
+    review = json.loads((tmp_path / "review.json").read_text())["extracted_questions"]
+    assert [q["number"] for q in review] == [1]
+    assert review[0]["question"] == "Which device forwards packets, edited?"
+
+    # Unchanged blocks are not extracted again
+    assert not any(run(tmp_path, webtext, bank).values())
+
+def test_extract_source_streams_the_dump_once(tmp_path, monkeypatch):
+    webtext, _ = setup(tmp_path, [block(n, f"Which device forwards packets, case {n}?") for n in (3, 1, 2, 1)])
+    opened = []
+    iter_question_blocks = extractor.iter_question_blocks
+    monkeypatch.setattr(extractor, "iter_question_blocks", lambda path: opened.append(path) or iter_question_blocks(path))
+    result = extractor.extract_source(str(webtext), skip_numbers=[2])
+    assert opened == [str(webtext)]
+    assert [q["number"] for q in result["extracted"]] == [1, 3] and result["failed"] == []
+    assert result["duplicates"] == [1]
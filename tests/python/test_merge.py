@@ -0,0 +1,77 @@
+from merge_missing_questions import upsert_questions
+
+OPTIONS = ["PAN", "WAN", "LAN", "MAN"]
+
+def bank():
+    return [{"id": 1, "number": 1, "question": "One?", "options": OPTIONS, "correctAnswer": 2, "topic": "Networking"},
+            {"id": 2, "number": 2, "question": "Two?", "options": OPTIONS, "correct_answer": "???",
+             "topic": "Hardware", "needs_review": True}]
+
+def test_insert_gets_next_id_and_update_keeps_id_and_position():
+    questions = bank()
+    summary = upsert_questions(questions, [{"id": 99, "number": 3, "question": "Three?", "options": OPTIONS,
+                                            "correctAnswer": 0, "topic": "Security"},
+                                           {"number": 1, "question": "One, reworded?", "options": OPTIONS,
+                                            "correctAnswer": 2, "topic": "Networking"}])
+    assert [q["number"] for q in summary["inserted"]] == [3] and questions[2]["id"] == 3
+    assert summary["updated"] == [questions[0]] and questions[0]["id"] == 1
+    assert questions[0]["question"] == "One, reworded?"
+
+def test_unresolved_record_does_not_replace_valid_answer():
+    questions = bank()
+    original = dict(questions[0])
+    summary = upsert_questions(questions, [{"number": 1, "question": "One?", "options": OPTIONS,
+                                            "correct_answer": "Multiple matching pairs", "needs_review": True}])
+    assert summary["unresolved"] == [questions[0]]
+    assert questions[0] == original
+
+def test_resolved_update_drops_legacy_answer_and_review_flag():
+    questions = bank()
+    upsert_questions(questions, [{"number": 2, "options": OPTIONS, "correctAnswer": 1}])
+    assert questions[1]["correctAnswer"] == 1
+    assert "correct_answer" not in questions[1] and "needs_review" not in questions[1]
+
+def test_legacy_update_drops_invalid_correct_answer():
+    questions = bank()
+    questions[1]["correctAnswer"] = 9
+    upsert_questions(questions, [{"number": 2, "options": OPTIONS, "correct_answer": "still unknown"}])
+    assert "correctAnswer" not in questions[1] and questions[1]["correct_answer"] == "still unknown"
+
+def test_pinned_records_are_left_alone_unless_pins_are_overridden():
+    questions = bank()
+    update = {"number": 1, "question": "Changed?", "options": OPTIONS, "correctAnswer": 0}
+    assert upsert_questions(questions, [update], pins={1})["pinned"] == [questions[0]]
+    assert questions[0]["question"] == "One?"
+    upsert_questions(questions, [update], respect_pins=False, pins={1})
+    assert questions[0]["question"] == "Changed?"
+
+def test_identical_record_is_unchanged():
+    questions = bank()
+    summary = upsert_questions(questions, [{k: v for k, v in questions[0].items() if k != "id"}])
+    assert summary["unchanged"] == [questions[0]] and not summary["updated"]
+
+def test_manual_merge_fills_missing_numbers_and_pins_curated_records(tmp_path):
+    import json
+    from merge_missing_questions import create_corrected_questions, load_pins, merge_questions
+
+    corrected = {q["number"]: q for q in create_corrected_questions()}
+    curated = {"id": 1, "number": 348, "question": "Curated stem", "options": ["a", "b", "c", "d", "e", "f"],
+               "correctAnswer": 5, "explanation": "Curated", "topic": "Operating Systems"}
+    bank_file = tmp_path / "questions.json"
+    bank_file.write_text(json.dumps({"exam_info": {"total_questions": 1, "last_updated": "2025-01-01"},
+                                     "questions": [curated]}))
+
+    merge_questions(str(bank_file), backup_store=tmp_path / "backups")
+    questions = {q["number"]: q for q in json.loads(bank_file.read_text())["questions"]}
+
+    # Pins live beside the bank; its records only gain what the app reads
+    assert questions[348] == curated
+    assert set(questions) == set(corrected) and load_pins(bank_file) == set(corrected)
+    assert "pinned" not in questions[350] and questions[350]["correctAnswer"] == 3
+
+    # A second run has nothing left to do, and automated merges leave pinned records alone
+    before = bank_file.read_bytes()
+    merge_questions(str(bank_file), backup_store=tmp_path / "backups")
+    merge_questions(str(bank_file), backup_store=tmp_path / "backups",
+                    new_questions=[{**questions[350], "question": "Re-extracted stem"}])
+    assert bank_file.read_bytes() == before
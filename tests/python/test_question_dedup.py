@@ -0,0 +1,56 @@
+import pytest
+
+import question_dedup
+from merge_missing_questions import drop_duplicate_questions
+from question_dedup import MinHasher, SignatureStore, match_new_questions, record_shingles, shingle_text
+
+EXISTING = [
+    {"number": 1, "question": "Which network type spans a single building or campus?", "options": ["PAN", "WAN", "LAN", "MAN"]},
+    {"number": 2, "question": "Which component stores the BIOS settings when the computer is off?",
+     "options": ["CMOS", "RAM", "CPU", "GPU"]},
+    {"number": 3, "question": "What is the purpose of a surge suppressor in a power setup?",
+     "options": ["filters spikes", "stores power", "cools the PSU", "speeds up the CPU"]},
+]
+
+@pytest.fixture(params=["numpy", "pure"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(question_dedup, "np", None)
+    return request.param
+
+def test_batch_signatures_match_single_signatures():
+    pytest.importorskip("numpy")
+    hasher = MinHasher()
+    sets = [record_shingles(q) for q in EXISTING] + [set()]
+    assert hasher.signatures(sets) == [hasher.signature(s) for s in sets]
+
+def test_match_new_questions(backend, tmp_path):
+    new = [dict(EXISTING[1]),
+           {**EXISTING[0], "options": ["PAN", "WAN", "LAN", "MAN", "CAN"]},
+           {"number": 9, "question": "Which printer type uses a heated fuser?", "options": ["laser", "inkjet", "thermal", "impact"]}]
+    matches = match_new_questions(EXISTING, new, cache_dir=tmp_path)
+    assert [(i, j) for i, j, _ in matches] == [(0, 1), (1, 0)]
+    assert dict(((i, j), s) for i, j, s in matches)[(1, 0)] == 1.0
+
+def test_store_only_hashes_unseen_records(tmp_path, monkeypatch):
+    pytest.importorskip("numpy")
+    hasher = MinHasher()
+    first = SignatureStore(hasher, tmp_path).signature_matrix([shingle_text(q) for q in EXISTING])
+
+    hashed = []
+    original = MinHasher.signature_matrix
+    monkeypatch.setattr(MinHasher, "signature_matrix", lambda self, sets: hashed.extend(sets) or original(self, sets))
+    texts = [shingle_text(q) for q in EXISTING] + ["a brand new question about printers and toner"]
+    again = SignatureStore(hasher, tmp_path).signature_matrix(texts)
+    assert len(hashed) == 1
+    assert (again[:3] == first).all()
+
+def test_drop_duplicate_questions_skips_exact_copies(tmp_path, monkeypatch):
+    monkeypatch.setattr(question_dedup, "DEFAULT_SIGNATURE_CACHE", tmp_path / "minhash")
+    new = [dict(EXISTING[2], number=30), {"number": 31, "question": "Which tool tests a power supply?",
+                                         "options": ["multimeter", "loopback plug", "toner probe", "crimper"]}]
+    assert [q["number"] for q in drop_duplicate_questions(EXISTING, new)] == [31]
+    if question_dedup.np is not None:
+        assert (tmp_path / "minhash").exists()
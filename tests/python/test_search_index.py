@@ -0,0 +1,26 @@
+import json
+import sys
+
+import search_index
+
+QUESTIONS = [{"id": 124, "number": 124, "question": "Which firewall type filters by port?", "options": ["stateful"]},
+             {"id": 125, "number": 124, "question": "What are two features of protocols?", "options": ["rules"]},
+             {"id": 126, "question": "Which protocol feature is unnumbered?", "options": ["timing"]}]
+
+def search(monkeypatch, capsys, tmp_path, data, query):
+    bank = tmp_path / "questions.json"
+    bank.write_text(json.dumps(data))
+    monkeypatch.setattr(sys, "argv", ["search_index.py", "search", query, "--bank", str(bank),
+                                      "--index", str(tmp_path / "index.json")])
+    search_index.main()
+    return capsys.readouterr().out.splitlines()[1:]
+
+def test_hits_carry_their_bank_position():
+    hits = search_index.SearchIndex.build(QUESTIONS).search("features")
+    assert [(h.number, h.id, h.doc) for h in hits] == [(124, 125, 1)]
+
+def test_duplicated_and_missing_numbers_print_the_matching_record(monkeypatch, capsys, tmp_path):
+    lines = search(monkeypatch, capsys, tmp_path, {"questions": QUESTIONS}, '"features of protocols"')
+    assert len(lines) == 1 and "#124" in lines[0] and "two features of protocols" in lines[0]
+    lines = search(monkeypatch, capsys, tmp_path, QUESTIONS, "unnumbered")
+    assert len(lines) == 1 and "#-" in lines[0] and "unnumbered" in lines[0]
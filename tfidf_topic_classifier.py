@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+TF-IDF nearest-centroid topic classifier trained on the labeled question bank (needs NumPy)
+"""
+import hashlib
+import json
+import re
+from collections import Counter
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional engine; the keyword classifier has no dependencies
+    np = None
+
+from topic_classifier import DEFAULT_TOPIC
+
+DEFAULT_QUESTIONS_FILE = Path(__file__).resolve().parent / "src" / "data" / "questions.json"
+DEFAULT_MODEL_FILE = Path(__file__).resolve().parent / "topic_model.npz"
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("The tfidf topic engine needs NumPy (pip install numpy)")
+
+def record_text(question: Dict[str, Any]) -> str:
+    """Training text for one record: question + options + explanation"""
+    return " ".join([question.get('question', ''), " ".join(question.get('options', [])), question.get('explanation', '')])
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+class TfidfTopicClassifier:
+    """Sparse TF-IDF vectors scored against per-topic centroids with one matrix multiply per batch"""
+
+    uses_explanation = True
+
+    def __init__(self, vocabulary: Dict[str, int], idf, centroids, topics: List[str],
+                 source_hash: str = "", default_topic: str = DEFAULT_TOPIC):
+        require_numpy()
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.centroids = centroids          # (topics, vocabulary), rows L2-normalised
+        self.topics = topics
+        self.source_hash = source_hash
+        self.default_topic = default_topic
+
+    def _vectorize(self, texts: Iterable[str], vocabulary: Dict[str, int], idf=None):
+        """CSR triplet (indptr, indices, data) of sublinear TF(-IDF) rows"""
+        indptr = [0]
+        indices: List[int] = []
+        counts: List[int] = []
+        for text in texts:
+            for token, count in Counter(tokenize(text)).items():
+                column = vocabulary.get(token)
+                if column is not None:
+                    indices.append(column)
+                    counts.append(count)
+            indptr.append(len(indices))
+
+        indptr_arr = np.asarray(indptr, dtype=np.int64)
+        indices_arr = np.asarray(indices, dtype=np.int64)
+        data = 1.0 + np.log(np.asarray(counts, dtype=np.float64))
+        if idf is not None:
+            data *= idf[indices_arr]
+
+        # L2-normalise each row in place
+        row_ids = np.repeat(np.arange(len(indptr_arr) - 1), np.diff(indptr_arr))
+        norms = np.zeros(len(indptr_arr) - 1)
+        np.add.at(norms, row_ids, data * data)
+        norms = np.sqrt(norms)
+        norms[norms == 0] = 1.0
+        data /= norms[row_ids]
+        return indptr_arr, indices_arr, data, row_ids
+
+    def scores(self, texts: Iterable[str]):
+        """Cosine similarity of every text to every topic centroid, shape (texts, topics)"""
+        indptr, indices, data, row_ids = self._vectorize(texts, self.vocabulary, self.idf)
+        # Sparse (n, V) x dense (V, T): gather centroid columns for each stored entry and sum per row
+        contributions = data[:, None] * self.centroids.T[indices]
+        result = np.zeros((len(indptr) - 1, len(self.topics)))
+        np.add.at(result, row_ids, contributions)
+        return result
+
+    def classify_many(self, texts: Iterable[str]) -> List[str]:
+        scores = self.scores(texts)
+        best = scores.argmax(axis=1)
+        return [self.topics[i] if scores[row, i] > 0 else self.default_topic for row, i in enumerate(best)]
+
+    def classify(self, content: str) -> str:
+        return self.classify_many([content])[0]
+
+    @classmethod
+    def fit(cls, texts: List[str], labels: List[str], topics: Optional[List[str]] = None,
+            source_hash: str = "") -> "TfidfTopicClassifier":
+        """Fit vocabulary, IDF weights and per-topic centroids"""
+        require_numpy()
+        topics = list(topics) if topics else sorted(set(labels))
+
+        document_frequency: Dict[str, int] = {}
+        for text in texts:
+            for token in set(tokenize(text)):
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+        vocabulary = {token: i for i, token in enumerate(sorted(document_frequency))}
+
+        n = len(texts)
+        df = np.array([document_frequency[t] for t in sorted(document_frequency)], dtype=np.float64)
+        idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+
+        model = cls(vocabulary, idf, np.zeros((len(topics), len(vocabulary))), topics, source_hash)
+        indptr, indices, data, row_ids = model._vectorize(texts, vocabulary, idf)
+
+        topic_index = {topic: i for i, topic in enumerate(topics)}
+        label_ids = np.array([topic_index.get(label, -1) for label in labels])
+        keep = label_ids[row_ids] >= 0
+        centroids = np.zeros((len(topics), len(vocabulary)))
+        np.add.at(centroids, (label_ids[row_ids][keep], indices[keep]), data[keep])
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        model.centroids = centroids / norms
+        return model
+
+    def save(self, model_file) -> None:
+        vocabulary = sorted(self.vocabulary, key=self.vocabulary.get)
+        np.savez_compressed(
+            model_file,
+            vocabulary=np.array(vocabulary),
+            idf=self.idf,
+            centroids=self.centroids,
+            topics=np.array(self.topics),
+            source_hash=np.array(self.source_hash),
+        )
+
+    @classmethod
+    def load(cls, model_file) -> "TfidfTopicClassifier":
+        require_numpy()
+        with np.load(model_file, allow_pickle=False) as saved:
+            vocabulary = {str(token): i for i, token in enumerate(saved['vocabulary'])}
+            return cls(vocabulary, saved['idf'], saved['centroids'],
+                       [str(t) for t in saved['topics']], str(saved['source_hash']))
+
+def file_hash(path) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def load_training_data(questions_file) -> Tuple[List[str], List[str], List[str]]:
+    """Texts, labels and the topic list from a labeled bank"""
+    with open(questions_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    questions = [q for q in data['questions'] if q.get('topic')]
+    topics = data.get('exam_info', {}).get('topics') or sorted({q['topic'] for q in questions})
+    return [record_text(q) for q in questions], [q['topic'] for q in questions], topics
+
+def train_model(questions_file=DEFAULT_QUESTIONS_FILE, model_file=DEFAULT_MODEL_FILE) -> TfidfTopicClassifier:
+    texts, labels, topics = load_training_data(questions_file)
+    model = TfidfTopicClassifier.fit(texts, labels, topics, source_hash=file_hash(questions_file))
+    model.save(model_file)
+    return model
+
+def load_or_train(questions_file=DEFAULT_QUESTIONS_FILE, model_file=DEFAULT_MODEL_FILE) -> TfidfTopicClassifier:
+    """Load the saved model, retraining only when it is missing or the labeled bank has changed"""
+    require_numpy()
+    if Path(model_file).exists():
+        model = TfidfTopicClassifier.load(model_file)
+        if not Path(questions_file).exists() or model.source_hash == file_hash(questions_file):
+            return model
+    return train_model(questions_file, model_file)
+
+if __name__ == "__main__":
+    import sys
+    questions_file = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_QUESTIONS_FILE
+    model_file = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_MODEL_FILE
+    model = train_model(questions_file, model_file)
+    print(f"Trained on {questions_file}: {len(model.vocabulary)} terms, {len(model.topics)} topics")
+    print(f"Model saved to: {model_file}")
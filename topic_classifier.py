@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Keyword topic classifier compiled into a single word-boundary regex
+"""
+import re
+from typing import List, Dict, Iterable, Optional
+
+DEFAULT_TOPIC = "General IT"
+
+# Order matters: on equal scores the topic listed first wins
+TOPIC_KEYWORDS: Dict[str, List[str]] = {
+    "Hardware": ["motherboard", "cpu", "processor", "ram", "memory", "hard drive", "ssd", "hdd", "gpu", "graphics", "pci", "sata", "usb", "power supply", "cooling", "fan", "heat sink", "raid"],
+    "Hardware Safety": ["esd", "electrostatic", "grounded", "static", "safety", "shock", "electrical"],
+    "Networking": ["network", "router", "switch", "tcp", "ip", "ethernet", "wifi", "wireless", "lan", "wan", "man", "pan", "dns", "dhcp", "ping", "tracert", "subnet", "cable", "dsl"],
+    "Operating Systems": ["windows", "linux", "macos", "boot", "bios", "uefi", "registry", "file system", "ntfs", "fat32", "kernel", "driver", "service", "acpi", "power state", "bootmgr", "winload"],
+    "Security": ["password", "encryption", "firewall", "antivirus", "malware", "authentication", "authorization", "certificate", "vpn", "security", "attack"],
+    "Troubleshooting": ["troubleshoot", "problem", "issue", "error", "debug", "diagnose", "fix", "repair", "symptom", "solution", "stages"],
+    "Mobile Devices": ["mobile", "tablet", "smartphone", "ios", "android", "cellular", "bluetooth", "wifi calling", "app", "touch"],
+    "Printers": ["printer", "print", "toner", "ink", "paper", "laser", "inkjet", "scanner", "fax"],
+    "Cloud Computing": ["cloud", "saas", "paas", "iaas", "virtual", "remote", "online", "internet"],
+    "Command Line": ["command", "cmd", "terminal", "shell", "cli", "tracert", "ping", "ipconfig", "netstat"]
+}
+
+def _trie_alternation(keywords: Iterable[str]) -> str:
+    """Alternation regex factored as a character trie, so the engine never retries shared prefixes"""
+    trie: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def emit(node: Dict[str, dict]) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional: the longest keyword is tried first, shorter ones on backtrack
+        return '(?:' + body + ')?' if '' in node else body
+
+    return emit(trie)
+
+def _word_pattern(keywords: Iterable[str]) -> str:
+    return rf'(?<!\w)(?:{_trie_alternation(keywords)})(?!\w)'
+
+class KeywordTopicClassifier:
+    """Scores topics by how many of their keywords occur as whole words, scanning each text once"""
+
+    def __init__(self, topic_keywords: Optional[Dict[str, List[str]]] = None, default_topic: str = DEFAULT_TOPIC):
+        self.topic_keywords = topic_keywords if topic_keywords is not None else TOPIC_KEYWORDS
+        self.default_topic = default_topic
+        self.topics = list(self.topic_keywords)
+
+        keywords = {k for words in self.topic_keywords.values() for k in words}
+        self.pattern = re.compile(_word_pattern(keywords))
+
+        # Topic indices credited by each keyword (a keyword may belong to several topics)
+        self.keyword_topics: Dict[str, List[int]] = {}
+        for i, words in enumerate(self.topic_keywords.values()):
+            for k in words:
+                self.keyword_topics.setdefault(k, []).append(i)
+
+        # A match on "wifi calling" also means "wifi" occurred as a whole word
+        self.implied: Dict[str, List[str]] = {}
+        for k in keywords:
+            words = k.split()
+            spans = {" ".join(words[i:j]) for i in range(len(words)) for j in range(i + 1, len(words) + 1)}
+            self.implied[k] = [k] + sorted((spans & keywords) - {k})
+
+    def scores(self, content: str) -> List[int]:
+        """Number of distinct keywords found for each topic, in table order"""
+        found = set()
+        for match in self.pattern.finditer(content.lower()):
+            found.update(self.implied[match.group(0)])
+
+        scores = [0] * len(self.topics)
+        for k in found:
+            for i in self.keyword_topics[k]:
+                scores[i] += 1
+        return scores
+
+    def classify(self, content: str) -> str:
+        scores = self.scores(content)
+        best = max(scores) if scores else 0
+        if best == 0:
+            return self.default_topic
+        return self.topics[scores.index(best)]
+
+    def classify_many(self, texts: Iterable[str]) -> List[str]:
+        """Classify a batch of texts with the shared compiled matcher"""
+        classify = self.classify
+        return [classify(text) for text in texts]
+
+_default_classifier: Optional[KeywordTopicClassifier] = None
+
+def get_default_classifier() -> KeywordTopicClassifier:
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = KeywordTopicClassifier()
+    return _default_classifier
+
+def classify_topic(content: str) -> str:
+    return get_default_classifier().classify(content)
+
+def classify_many(texts: Iterable[str]) -> List[str]:
+    return get_default_classifier().classify_many(texts)
+
+TOPIC_ENGINES = ("keyword", "tfidf")
+
+_engines: Dict[str, object] = {}
+
+def get_topic_engine(name: str = "keyword"):
+    """Classifier for an engine name; each engine exposes classify() and classify_many()"""
+    if name not in TOPIC_ENGINES:
+        raise ValueError(f"Unknown topic engine '{name}' (choose from {', '.join(TOPIC_ENGINES)})")
+    if name == "keyword":
+        return get_default_classifier()
+    if name not in _engines:
+        # Imported lazily so the keyword engine never needs NumPy
+        from tfidf_topic_classifier import load_or_train
+        _engines[name] = load_or_train()
+    return _engines[name]
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Question block parsing for webtext.md: a single-pass index and a streaming reader
+"""
+import mmap
+import re
+from typing import List, Dict, Tuple, Iterable, Iterator, NamedTuple, Optional
+
+from instrumentation import count
+
+# Same numbered-line rule the extractor and the analysis script have always used
+QUESTION_START_RE = re.compile(r'^(\d+)\.\s+')
+
+class QuestionBlock(NamedTuple):
+    """One parsed question block as it appears in the source"""
+    number: int
+    stem: str
+    options: List[str]
+    explanation: str
+    lines: List[str]
+    start_byte: int
+    end_byte: int
+
+class NumberingTracker:
+    """Collects question numbers in source order and spots duplicates and out-of-order entries"""
+
+    def __init__(self):
+        self.numbers: List[int] = []
+        self.seen = set()
+        self.duplicates: List[int] = []
+        self.out_of_order: List[Tuple[int, int]] = []
+
+    def add(self, number: int) -> bool:
+        """Record a number; returns True the first time it is seen"""
+        first = number not in self.seen
+        if first:
+            self.seen.add(number)
+        elif number not in self.duplicates:
+            self.duplicates.append(number)
+        if self.numbers and number <= self.numbers[-1]:
+            self.out_of_order.append((self.numbers[-1], number))
+        self.numbers.append(number)
+        return first
+
+    def report(self):
+        """Print the numbering diagnostics analyze_webtext_questions has always shown, plus ordering problems"""
+        print(f"Total question entries found: {len(self.numbers)}")
+        if not self.numbers:
+            return
+        print(f"Question numbers range: {min(self.numbers)} - {max(self.numbers)}")
+        print(f"Unique questions: {len(self.seen)}")
+        if self.duplicates:
+            print(f"Duplicate question numbers: {sorted(self.duplicates)}")
+        if self.out_of_order:
+            pairs = ", ".join(f"{prev}->{num}" for prev, num in self.out_of_order)
+            print(f"Out-of-order question numbers: {pairs}")
+
+def split_question_block(question_lines: List[str]) -> Tuple[str, List[str], str]:
+    """Split the lines of one block (first line is the numbered stem) into stem, options and explanation"""
+
+    # Parse the question
+    match = QUESTION_START_RE.match(question_lines[0])
+    question_text = question_lines[0][match.end():] if match else question_lines[0]
+
+    # Clean the question text
+    question_text = re.sub(r'\s+', ' ', question_text).strip()
+
+    # Find options and explanation
+    options = []
+    explanation = ""
+
+    i = 1
+    while i < len(question_lines):
+        line = question_lines[i].strip()
+
+        if not line:
+            i += 1
+            continue
+
+        # Check for explanation
+        if line.lower().startswith('explanation:'):
+            explanation = line[12:].strip()
+            # Continue reading explanation lines
+            i += 1
+            while i < len(question_lines):
+                next_line = question_lines[i].strip()
+                if not next_line or next_line.lower().startswith('other case'):
+                    break
+                explanation += " " + next_line
+                i += 1
+            break
+
+        # Skip certain lines
+        if (line.lower().startswith('other case') or
+            line.lower().startswith('case') or
+            line.startswith('(') and line.endswith(')') or
+            len(line) < 3):
+            i += 1
+            continue
+
+        # This could be an option
+        # Simple heuristic: lines that are not too long and don't end with colon
+        if len(line) < 150 and not line.endswith(':') and not line.lower().startswith('explanation'):
+            options.append(line)
+
+        i += 1
+
+    return question_text, options, explanation.strip()
+
+class QuestionBlockIndex:
+    """Table of question number -> (start_line, end_line) and byte offsets, built in one scan"""
+
+    def __init__(self, webtext_content: str):
+        self.lines = webtext_content.split('\n')
+        # Every numbered line in source order: (number, start_line, end_line, start_byte, end_byte)
+        self.entries: List[Tuple[int, int, int, int, int]] = []
+        # First occurrence of each number, which is the block extract_single_question picks
+        self.blocks: Dict[int, Tuple[int, int, int, int, int]] = {}
+        self.numbering = NumberingTracker()
+        self._build()
+
+    def _build(self):
+        starts = []
+        offset = 0
+        for i, line in enumerate(self.lines):
+            match = QUESTION_START_RE.match(line)
+            if match:
+                starts.append((int(match.group(1)), i, offset))
+            offset += len(line.encode('utf-8')) + 1
+        total_bytes = max(offset - 1, 0)
+        count("regex_calls", len(self.lines))
+        count("questions_scanned", len(starts))
+
+        for pos, (number, start_line, start_byte) in enumerate(starts):
+            if pos + 1 < len(starts):
+                end_line, end_byte = starts[pos + 1][1], starts[pos + 1][2]
+            else:
+                end_line, end_byte = len(self.lines), total_bytes
+            entry = (number, start_line, end_line, start_byte, end_byte)
+            self.entries.append(entry)
+            if self.numbering.add(number):
+                self.blocks[number] = entry
+
+    @property
+    def duplicates(self) -> List[int]:
+        return sorted(self.numbering.duplicates)
+
+    @property
+    def out_of_order(self) -> List[Tuple[int, int]]:
+        return self.numbering.out_of_order
+
+    def __contains__(self, question_number: int) -> bool:
+        return question_number in self.blocks
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def numbers(self) -> List[int]:
+        """All question numbers found, in source order (duplicates included)"""
+        return list(self.numbering.numbers)
+
+    def block_lines(self, question_number: int) -> Optional[List[str]]:
+        """Lines of the first block for question_number, or None if it is not in the text"""
+        entry = self.blocks.get(question_number)
+        if entry is None:
+            return None
+        return self.lines[entry[1]:entry[2]]
+
+    def blocks_for(self, numbers: Iterable[int]) -> Dict[int, Optional[List[str]]]:
+        """Slice the blocks for a batch of numbers straight out of the table"""
+        return {number: self.block_lines(number) for number in numbers}
+
+    def report(self):
+        self.numbering.report()
+
+def build_question_index(webtext_content: str) -> QuestionBlockIndex:
+    """Scan webtext once and return the question block index"""
+    return QuestionBlockIndex(webtext_content)
+
+def _decode_line(raw: bytes) -> str:
+    if raw.endswith(b'\n'):
+        raw = raw[:-1]
+    if raw.endswith(b'\r'):
+        raw = raw[:-1]
+    return raw.decode('utf-8')
+
+def iter_source_lines(webtext_file: str) -> Iterator[Tuple[str, int, int]]:
+    """Yield (line, start_byte, end_byte) for each line, reading through mmap where the file allows it"""
+    with open(webtext_file, 'rb') as f:
+        try:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files and pipes cannot be mapped; fall back to buffered reads
+            source = None
+
+        offset = 0
+        if source is None:
+            for raw in f:
+                yield _decode_line(raw), offset, offset + len(raw)
+                offset += len(raw)
+            count("bytes_read", offset)
+            return
+
+        with source:
+            while True:
+                raw = source.readline()
+                if not raw:
+                    break
+                yield _decode_line(raw), offset, offset + len(raw)
+                offset += len(raw)
+        count("bytes_read", offset)
+
+def iter_question_blocks(webtext_file: str) -> Iterator[QuestionBlock]:
+    """Stream question blocks from webtext_file, holding only the current block in memory"""
+    number = None
+    lines: List[str] = []
+    start_byte = end_byte = 0
+    line_count = blocks = 0
+
+    for line, line_start, line_end in iter_source_lines(webtext_file):
+        line_count += 1
+        match = QUESTION_START_RE.match(line)
+        if match:
+            if number is not None:
+                blocks += 1
+                yield QuestionBlock(number, *split_question_block(lines), lines, start_byte, line_start)
+            number = int(match.group(1))
+            lines = [line]
+            start_byte = line_start
+        elif number is not None:
+            lines.append(line)
+        end_byte = line_end
+
+    if number is not None:
+        blocks += 1
+        yield QuestionBlock(number, *split_question_block(lines), lines, start_byte, end_byte)
+    count("regex_calls", line_count)
+    count("questions_scanned", blocks)